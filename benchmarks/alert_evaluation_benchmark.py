@@ -0,0 +1,93 @@
+"""
+Measure the per-tick evaluation time of the target price alert engine against
+scanning every target.
+
+Usage (in-process, needs no services):
+    python -m benchmarks.alert_evaluation_benchmark --coins 100000 --targeted 0.1
+"""
+
+import argparse
+import random
+import time
+from src.services.alert_engine import AlertEngine
+
+
+def scan_all(
+    targets: list[tuple[str, float]],
+    tracked: dict[str, float],
+    tick: dict[str, float],
+) -> int:
+    crossed: int = 0
+    for coin_id, target_price in targets:
+        previous: float = tracked[coin_id]
+        low, high = sorted((previous, tick.get(coin_id, previous)))
+        if low < target_price <= high:
+            crossed += 1
+    tracked.update(tick)
+    return crossed
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    return sorted(samples)[max(0, int(len(samples) * fraction) - 1)] * 1000
+
+
+def main(
+    coins: int, targeted: float, tick_share: float, ticks: int, volatility: float
+) -> None:
+    coin_ids: list[str] = [f"coin-{i}" for i in range(coins)]
+    prices: dict[str, float] = {id: random.uniform(0.01, 100000) for id in coin_ids}
+    targets: list[tuple[str, float]] = [
+        (id, prices[id] * random.uniform(0.99, 1.01))
+        for id in random.sample(coin_ids, int(coins * targeted))
+    ]
+    engine = AlertEngine(cache=object())
+    start: float = time.perf_counter()
+    engine.load(targets)
+    print(
+        f"Loaded the targets of {engine.stats['coins']} of {coins} coins in "
+        f"{(time.perf_counter() - start) * 1000:.1f} ms"
+    )
+    engine.evaluate(prices)
+    tracked: dict[str, float] = dict(prices)
+
+    evaluated: list[float] = []
+    scanned: list[float] = []
+    crossed: int = 0
+    for _ in range(ticks):
+        tick: dict[str, float] = {
+            id: prices[id] * (1 + random.gauss(0, volatility))
+            for id in random.sample(coin_ids, int(coins * tick_share))
+        }
+        prices.update(tick)
+        start = time.perf_counter()
+        scan_crossed: int = scan_all(targets, tracked, tick)
+        scanned.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        events: list[dict] = engine.evaluate(tick)
+        evaluated.append(time.perf_counter() - start)
+        assert len(events) == scan_crossed
+        crossed += len(events)
+
+    print(f"{ticks} ticks, {crossed / ticks:.0f} crossings per tick")
+    for name, samples in (("engine", evaluated), ("full scan", scanned)):
+        print(
+            f"{name:>9}: p50 {percentile(samples, 0.5):7.2f} ms, "
+            f"p99 {percentile(samples, 0.99):7.2f} ms per tick"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--coins", type=int, default=100000)
+    parser.add_argument(
+        "--targeted", type=float, default=0.1, help="Share of coins with a target"
+    )
+    parser.add_argument(
+        "--tick-share", type=float, default=1.0, help="Share of coins in each tick"
+    )
+    parser.add_argument("--ticks", type=int, default=50)
+    parser.add_argument(
+        "--volatility", type=float, default=0.002, help="Std dev of a tick's move"
+    )
+    args = parser.parse_args()
+    main(args.coins, args.targeted, args.tick_share, args.ticks, args.volatility)
@@ -0,0 +1,84 @@
+"""
+Compare coin import throughput of POST /coins/ (one coin per request) with
+POST /coins/bulk.
+
+Coins are taken from the CoinGecko coin list (one coin per symbol) and deleted
+again after each run.
+
+Usage (needs the API running, e.g. via docker compose):
+    python -m benchmarks.bulk_import_benchmark --coins 1000 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import time
+import httpx
+from src.coingecko.coingecko_coins_api import CoinGeckoAPI
+
+
+async def pick_coins(count: int) -> list[dict[str, str]]:
+    coin_list: list = await CoinGeckoAPI().get_coin_list()
+    by_symbol: dict[str, dict] = {}
+    for coin in coin_list:
+        by_symbol.setdefault(coin["symbol"], coin)
+    return [
+        {"id": coin["id"], "symbol": coin["symbol"], "name": coin["name"]}
+        for coin in list(by_symbol.values())[:count]
+    ]
+
+
+async def delete_coins(
+    client: httpx.AsyncClient, coins: list[dict], concurrency: int
+) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def delete(coin: dict) -> None:
+        async with semaphore:
+            await client.delete(f"/coins/{coin['id']}")
+
+    await asyncio.gather(*(delete(coin) for coin in coins))
+
+
+async def import_single(
+    client: httpx.AsyncClient, coins: list[dict], concurrency: int
+) -> int:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def create(coin: dict) -> bool:
+        async with semaphore:
+            response: httpx.Response = await client.post("/coins/", json=coin)
+            return response.status_code == 201
+
+    return sum(await asyncio.gather(*(create(coin) for coin in coins)))
+
+
+async def import_bulk(
+    client: httpx.AsyncClient, coins: list[dict], concurrency: int
+) -> int:
+    response: httpx.Response = await client.post("/coins/bulk", json=coins)
+    return response.json()["created"]
+
+
+async def main(base_url: str, count: int, concurrency: int) -> None:
+    coins: list[dict] = await pick_coins(count)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        for name, importer in (("single", import_single), ("bulk", import_bulk)):
+            await delete_coins(client, coins, concurrency)
+            start: float = time.perf_counter()
+            created: int = await importer(client, coins, concurrency)
+            elapsed: float = time.perf_counter() - start
+            print(
+                f"{name:>6}: {created} coins in {elapsed:.2f} s "
+                f"({created / elapsed:.0f} rows/s)"
+            )
+        await delete_coins(client, coins, concurrency)
+    await CoinGeckoAPI.close_shared_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--coins", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.coins, args.concurrency))
@@ -0,0 +1,59 @@
+"""
+Measure CoinGecko traffic caused by concurrent POST /coins/ requests for coins
+that are not cached yet.
+
+The selected coins are removed from the Redis coin cache before the run, so
+every create needs an upstream lookup. Upstream requests and bytes are read
+from GET /health/stats, so run the API with a single worker.
+
+Usage (needs the API running, e.g. via docker compose):
+    python -m benchmarks.coin_lookup_batching_benchmark --coins 200
+"""
+
+import argparse
+import asyncio
+import time
+import httpx
+from src.coingecko.coingecko_coins_api import CoinGeckoAPI
+from src.redis_cache.redis_cache import RedisCache
+
+
+async def upstream_stats(client: httpx.AsyncClient) -> dict[str, int]:
+    response: httpx.Response = await client.get("/health/stats")
+    return response.json()["coingecko_upstream"]
+
+
+async def main(base_url: str, count: int) -> None:
+    coin_list: list = await CoinGeckoAPI().get_coin_list()
+    coins: list[dict] = [
+        {"id": coin["id"], "symbol": coin["symbol"], "name": coin["name"]}
+        for coin in coin_list[:count]
+    ]
+    await RedisCache().client.delete(*(coin["id"] for coin in coins))
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        before: dict[str, int] = await upstream_stats(client)
+        start: float = time.perf_counter()
+        responses: list[httpx.Response] = await asyncio.gather(
+            *(client.post("/coins/", json=coin) for coin in coins)
+        )
+        seconds: float = time.perf_counter() - start
+        after: dict[str, int] = await upstream_stats(client)
+        await asyncio.gather(*(client.delete(f"/coins/{coin['id']}") for coin in coins))
+
+    created: int = sum(response.status_code == 201 for response in responses)
+    requests: int = after["requests"] - before["requests"]
+    kilobytes: float = (after["bytes"] - before["bytes"]) / 1024
+    print(
+        f"{created}/{len(coins)} coins created in {seconds:.2f}s: "
+        f"{requests} upstream requests ({requests / seconds:.1f}/s), "
+        f"{kilobytes:.1f} KiB of responses ({kilobytes / len(coins):.2f} KiB/coin)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--coins", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.coins))
@@ -0,0 +1,58 @@
+"""
+Measure how concurrent coin data update triggers are deduplicated into jobs.
+
+Sends a burst of concurrent `POST /coins/update-coins/` requests, reports how
+many jobs they started and how long the triggers took, then polls the job
+until it finishes and reports its duration and write throughput.
+
+Usage (needs the API running, e.g. via docker compose):
+    python -m benchmarks.coin_refresh_jobs_benchmark --triggers 10
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+
+
+async def trigger(client: httpx.AsyncClient, latencies: list[float]) -> dict:
+    start: float = time.perf_counter()
+    response: httpx.Response = await client.post("/coins/update-coins/")
+    latencies.append(time.perf_counter() - start)
+    response.raise_for_status()
+    return response.json()
+
+
+async def main(base_url: str, triggers: int, poll_interval: float) -> None:
+    latencies: list[float] = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        responses: list[dict] = await asyncio.gather(
+            *(trigger(client, latencies) for _ in range(triggers))
+        )
+        job_ids: set[str] = {response["job_id"] for response in responses}
+        print(
+            f"{triggers} concurrent triggers -> {len(job_ids)} job(s), "
+            f"median {statistics.median(latencies) * 1000:.1f} ms, "
+            f"max {max(latencies) * 1000:.1f} ms per trigger"
+        )
+        for job_id in job_ids:
+            while True:
+                job: dict = (await client.get(f"/coins/update-coins/{job_id}")).json()
+                if job["status"] in ("succeeded", "failed"):
+                    break
+                await asyncio.sleep(poll_interval)
+            print(
+                f"job {job_id}: {job['status']} after {job['attempts']} attempt(s), "
+                f"{job['processed']}/{job['total']} coins written at "
+                f"{job['coins_per_second']:,.0f} coins/s"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--triggers", type=int, default=10)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.triggers, args.poll_interval))
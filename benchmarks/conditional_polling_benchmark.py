@@ -0,0 +1,62 @@
+"""
+Simulate dashboards polling GET /coins/ and GET /coins/{coin_id} and report
+latency and database connection checkouts per poll.
+
+Each route is polled once with plain requests and once with If-None-Match set
+to the last ETag. Database usage is read from the pool counters of
+GET /health/stats, so run the API with a single worker.
+
+Usage (needs the API running, e.g. via docker compose):
+    python -m benchmarks.conditional_polling_benchmark --coin-id bitcoin --polls 1000
+"""
+
+import argparse
+import asyncio
+import time
+import httpx
+
+
+async def database_checkouts(client: httpx.AsyncClient) -> int:
+    response: httpx.Response = await client.get("/health/stats")
+    return response.json()["database_pool"]["acquire_count"]
+
+
+async def poll(
+    client: httpx.AsyncClient, path: str, polls: int, conditional: bool
+) -> None:
+    etag: str | None = None
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    checkouts_before: int = await database_checkouts(client)
+    for _ in range(polls):
+        headers: dict[str, str] = {"If-None-Match": etag} if etag else {}
+        start: float = time.perf_counter()
+        response: httpx.Response = await client.get(path, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if conditional:
+            etag = response.headers.get("etag")
+    checkouts: int = await database_checkouts(client) - checkouts_before - 1
+    latencies.sort()
+    print(
+        f"{path:>20} {'conditional' if conditional else 'plain':>11}: "
+        f"p50 {latencies[len(latencies) // 2] * 1000:6.2f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:6.2f} ms, "
+        f"{checkouts / polls:.3f} DB checkouts/poll, statuses {statuses}"
+    )
+
+
+async def main(base_url: str, coin_id: str, polls: int) -> None:
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for path in ("/coins/", f"/coins/{coin_id}"):
+            for conditional in (False, True):
+                await poll(client, path, polls, conditional)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--coin-id", default="bitcoin")
+    parser.add_argument("--polls", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.coin_id, args.polls))
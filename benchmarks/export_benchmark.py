@@ -0,0 +1,101 @@
+"""
+Compare throughput and peak memory of exporting the coin table as one JSON
+body (the former GET /coins/ approach) with the chunked NDJSON/CSV stream of
+GET /coins/export.
+
+By default synthetic rows are encoded in-process so the numbers are
+reproducible without a database. With --base-url the running API is streamed
+instead; pass --pid to also report the peak RSS of the server process.
+
+Usage:
+    python -m benchmarks.export_benchmark --rows 500000
+    python -m benchmarks.export_benchmark --base-url http://localhost:8000 --pid 1234
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from collections import namedtuple
+from collections.abc import Callable, Iterator
+import httpx
+from src.schemas.coin import CoinBase
+from src.services.coin_export_service import CoinExportService
+
+CoinRow = namedtuple("CoinRow", ["id", "symbol", "name", "target_price"])
+BATCH_SIZE: int = 1000
+
+
+def generate_rows(count: int) -> Iterator[list[CoinRow]]:
+    for start in range(0, count, BATCH_SIZE):
+        yield [
+            CoinRow(f"coin-{i}", f"c{i}", f"Coin number {i}", i * 0.5)
+            for i in range(start, min(start + BATCH_SIZE, count))
+        ]
+
+
+def export_single_body(count: int) -> int:
+    coins: list[CoinBase] = [
+        CoinBase.model_validate(row._asdict())
+        for rows in generate_rows(count)
+        for row in rows
+    ]
+    body: bytes = (
+        b"[" + b",".join(coin.model_dump_json().encode() for coin in coins) + b"]"
+    )
+    return len(body)
+
+
+def export_stream(encoder: Callable[[list[CoinRow]], bytes]) -> Callable[[int], int]:
+    def run(count: int) -> int:
+        return sum(len(encoder(rows)) for rows in generate_rows(count))
+
+    return run
+
+
+def measure(name: str, run: Callable[[int], int], count: int) -> None:
+    tracemalloc.start()
+    start: float = time.perf_counter()
+    size: int = run(count)
+    elapsed: float = time.perf_counter() - start
+    peak: int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(
+        f"{name:>12}: {count / elapsed:10.0f} rows/s | {size / 1e6:8.1f} MB output "
+        f"| peak memory {peak / 1e6:8.1f} MB"
+    )
+
+
+def read_peak_rss(pid: int) -> str:
+    with open(f"/proc/{pid}/status") as status:
+        return next(line for line in status if line.startswith("VmHWM")).strip()
+
+
+async def stream_api(base_url: str, format: str, pid: int | None) -> None:
+    rows: int = 0
+    start: float = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        async with client.stream(
+            "GET", "/coins/export", params={"format": format}
+        ) as r:
+            async for line in r.aiter_lines():
+                rows += bool(line)
+    elapsed: float = time.perf_counter() - start
+    print(f"{format:>6}: {rows} rows in {elapsed:.2f} s ({rows / elapsed:.0f} rows/s)")
+    if pid:
+        print(f"server {read_peak_rss(pid)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--base-url")
+    parser.add_argument("--pid", type=int)
+    args = parser.parse_args()
+    if args.base_url:
+        for format in CoinExportService.MEDIA_TYPES:
+            asyncio.run(stream_api(args.base_url, format, args.pid))
+    else:
+        measure("single body", export_single_body, args.rows)
+        measure("ndjson", export_stream(CoinExportService.encode_ndjson), args.rows)
+        measure("csv", export_stream(CoinExportService.encode_csv), args.rows)
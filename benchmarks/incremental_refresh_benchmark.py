@@ -0,0 +1,61 @@
+"""
+Compare a full coin cache refresh with diff-based refreshes of a coin list in
+which only a few coins changed.
+
+Uses a synthetic coin list and the Redis database configured in .env; the
+benchmark coins and fingerprints are removed afterwards.
+
+Usage (needs a running Redis, configured by REDIS_HOST/REDIS_PORT/REDIS_DB):
+    python -m benchmarks.incremental_refresh_benchmark --coins 15000 --changed 50
+"""
+
+import argparse
+import asyncio
+import time
+from src.redis_cache.redis_cache import RedisCache
+from src.services.periodic_coin_data_updater import PeriodicCoinDataUpdater
+
+
+def make_coins(count: int, renamed: int = 0) -> list[dict[str, str]]:
+    return [
+        {
+            "id": f"benchmark-coin-{i}",
+            "symbol": f"bc{i}",
+            "name": f"Benchmark Coin {i}{' v2' if i < renamed else ''}",
+        }
+        for i in range(count)
+    ]
+
+
+async def measure(name: str, updater: PeriodicCoinDataUpdater, coins: list) -> None:
+    start: float = time.perf_counter()
+    stats: dict[str, float] = await updater.apply_coin_list(coins)
+    print(
+        f"{name:>22}: {time.perf_counter() - start:7.3f} s, "
+        f"{stats['written']:.0f} coins written, {stats['removed']:.0f} removed"
+    )
+
+
+async def main(count: int, changed: int) -> None:
+    updater = PeriodicCoinDataUpdater()
+    cache: RedisCache = updater.cache
+    await cache.client.delete(
+        cache.COIN_LIST_DIGEST_KEY, cache.COIN_LIST_FINGERPRINTS_KEY
+    )
+    await measure("full refresh", updater, make_coins(count))
+    await measure("unchanged list", updater, make_coins(count))
+    await measure(
+        f"{changed} renamed, 1 removed", updater, make_coins(count - 1, changed)
+    )
+    await cache.delete_coins([coin["id"] for coin in make_coins(count)])
+    await cache.client.delete(
+        cache.COIN_LIST_DIGEST_KEY, cache.COIN_LIST_FINGERPRINTS_KEY
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--coins", type=int, default=15000)
+    parser.add_argument("--changed", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.coins, args.changed))
@@ -0,0 +1,87 @@
+"""
+Measure live price fan-out throughput and memory per connected client.
+
+Usage (in-process, needs no services):
+    python -m benchmarks.live_prices_benchmark --clients 10000 --coins 1000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+from unittest.mock import MagicMock
+from src.services.live_price_broadcaster import KEEP_ALIVE, LivePriceBroadcaster
+
+
+async def consume(
+    broadcaster: LivePriceBroadcaster, coin_ids: list[str], received: list[int]
+) -> None:
+    subscription = broadcaster.subscribe(coin_ids)
+    try:
+        while True:
+            chunk: bytes = await subscription.next(broadcaster.keep_alive)
+            if chunk != KEEP_ALIVE:
+                received[0] += chunk.count(b"event: price")
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+async def main(clients: int, coins: int, coins_per_client: int, ticks: int) -> None:
+    broadcaster = LivePriceBroadcaster(cache=MagicMock(), keep_alive=60)
+    coin_ids: list[str] = [f"coin-{i}" for i in range(coins)]
+    received: list[int] = [0]
+
+    tracemalloc.start()
+    before: int = tracemalloc.get_traced_memory()[0]
+    consumers: list[asyncio.Task] = [
+        asyncio.create_task(
+            consume(broadcaster, random.sample(coin_ids, coins_per_client), received)
+        )
+        for _ in range(clients)
+    ]
+    await asyncio.sleep(0)
+    per_client: float = (tracemalloc.get_traced_memory()[0] - before) / clients
+    tracemalloc.stop()
+    print(
+        f"{clients} clients following {coins_per_client} of {coins} coins: "
+        f"{per_client / 1024:.2f} KiB per client, "
+        f"{per_client * 10000 / 1024 / 1024:.1f} MiB per 10k clients"
+    )
+
+    broadcast_seconds: float = 0.0
+    delivered: int = 0
+    start: float = time.perf_counter()
+    for tick in range(ticks):
+        prices: dict[str, dict] = {
+            id: {"usd": random.uniform(1, 100000), "last_updated_at": 1700000000 + tick}
+            for id in coin_ids
+        }
+        tick_start: float = time.perf_counter()
+        queued: int = broadcaster.broadcast(prices)
+        broadcast_seconds += time.perf_counter() - tick_start
+        # Let every client drain its queue before the next tick
+        delivered += queued
+        while received[0] < delivered:
+            await asyncio.sleep(0)
+    elapsed: float = time.perf_counter() - start
+    print(
+        f"{ticks} ticks: {received[0]} messages delivered, "
+        f"{received[0] / elapsed:,.0f} messages/s end to end, "
+        f"{broadcaster.stats['messages'] / broadcast_seconds:,.0f} messages/s queued, "
+        f"{broadcast_seconds / ticks * 1000:.1f} ms broadcast per tick, "
+        f"{broadcaster.stats['coalesced']} coalesced"
+    )
+    for consumer in consumers:
+        consumer.cancel()
+    await asyncio.gather(*consumers, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--coins", type=int, default=1000)
+    parser.add_argument("--coins-per-client", type=int, default=10)
+    parser.add_argument("--ticks", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.coins, args.coins_per_client, args.ticks))
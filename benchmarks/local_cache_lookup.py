@@ -0,0 +1,38 @@
+"""
+Measure hot-key coin lookups with and without the in-process L1 cache.
+
+Usage (needs a running Redis, configured by REDIS_HOST/REDIS_PORT/REDIS_DB):
+    python -m benchmarks.local_cache_lookup --lookups 20000
+"""
+
+import argparse
+import asyncio
+import time
+from src.redis_cache.local_cache import LocalCache
+from src.redis_cache.redis_cache import RedisCache
+
+
+async def measure(name: str, cache: RedisCache, lookups: int) -> None:
+    start: float = time.perf_counter()
+    for _ in range(lookups):
+        await cache.get_coin_from_cache("benchmark-hot-coin")
+    elapsed: float = time.perf_counter() - start
+    print(f"{name:>10}: {elapsed / lookups * 1_000_000:8.2f} us per lookup")
+
+
+async def main(lookups: int) -> None:
+    cache = RedisCache()
+    await cache.set_coin_cache("benchmark-hot-coin", "hot", "Hot Coin")
+    cache.local_cache = LocalCache(max_entries=0, ttl=0)
+    await measure("redis only", cache, lookups)
+    cache.local_cache = LocalCache(max_entries=10000, ttl=60)
+    await measure("with L1", cache, lookups)
+    await cache.client.delete("benchmark-hot-coin")
+    await RedisCache.close_pools()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.lookups))
@@ -0,0 +1,127 @@
+"""
+Measure the per-request cost of the Prometheus instrumentation.
+
+Calls an application with one trivial route directly through ASGI, once with
+plain routes and once with `MetricsRoute`, so the difference is the cost of
+the request metrics alone. Also times the SQLAlchemy query event handlers and
+the Redis command wrapper per call.
+
+Usage (in-process, needs no services):
+    python -m benchmarks.metrics_overhead_benchmark --requests 20000
+"""
+
+import argparse
+import asyncio
+import time
+import types
+from unittest.mock import AsyncMock, patch
+from fastapi import APIRouter, FastAPI
+from fastapi.routing import APIRoute
+from src.metrics import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_FLIGHT,
+    InstrumentedRedis,
+    MetricsRoute,
+    _after_cursor_execute,
+    _before_cursor_execute,
+)
+
+
+def build_app(route_class: type[APIRoute]) -> FastAPI:
+    router = APIRouter(prefix="/coins", route_class=route_class)
+
+    @router.get("/{coin_id}")
+    async def get_coin(coin_id: str):
+        return {"id": coin_id}
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+async def call(app: FastAPI, path: str) -> None:
+    scope: dict = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        pass
+
+    await app(scope, receive, send)
+
+
+async def per_request(app: FastAPI, requests: int) -> float:
+    for i in range(1000):
+        await call(app, f"/coins/coin-{i}")
+    start: float = time.perf_counter()
+    for i in range(requests):
+        await call(app, f"/coins/coin-{i}")
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+async def main(requests: int, rounds: int) -> None:
+    plain: FastAPI = build_app(APIRoute)
+    instrumented: FastAPI = build_app(MetricsRoute)
+    # Interleaved rounds, keeping the fastest of each, to cancel out noise
+    plain_us: float = float("inf")
+    instrumented_us: float = float("inf")
+    for _ in range(rounds):
+        plain_us = min(plain_us, await per_request(plain, requests))
+        instrumented_us = min(
+            instrumented_us, await per_request(instrumented, requests)
+        )
+    print(f"plain routes:   {plain_us:7.2f} us per request")
+    print(f"MetricsRoute:   {instrumented_us:7.2f} us per request")
+    print(f"request metrics overhead: {instrumented_us - plain_us:5.2f} us per request")
+
+    in_flight = HTTP_REQUESTS_IN_FLIGHT.labels("GET", "/benchmark")
+    duration = HTTP_REQUEST_DURATION.labels("GET", "/benchmark", "200")
+    start: float = time.perf_counter()
+    for _ in range(requests):
+        in_flight.inc()
+        in_flight.dec()
+        duration.observe(0.001)
+    updates_us: float = (time.perf_counter() - start) / requests * 1_000_000
+    print(f"request metric updates:   {updates_us:5.2f} us per request")
+
+    context = types.SimpleNamespace()
+    start = time.perf_counter()
+    for _ in range(requests):
+        _before_cursor_execute(None, None, "SELECT 1", None, context, False)
+        _after_cursor_execute(None, None, "SELECT 1", None, context, False)
+    query_us: float = (time.perf_counter() - start) / requests * 1_000_000
+    print(f"query events overhead:    {query_us:5.2f} us per query")
+
+    client = InstrumentedRedis()
+    with patch("redis.asyncio.Redis.execute_command", AsyncMock(return_value=None)):
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.execute_command("GET", "bitcoin")
+        wrapped_us: float = (time.perf_counter() - start) / requests * 1_000_000
+        start = time.perf_counter()
+        for _ in range(requests):
+            await super(InstrumentedRedis, client).execute_command("GET", "bitcoin")
+        bare_us: float = (time.perf_counter() - start) / requests * 1_000_000
+    print(f"Redis command overhead:   {wrapped_us - bare_us:5.2f} us per command")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rounds))
@@ -0,0 +1,94 @@
+"""
+Load synthetic price ticks into the price history, roll them up and measure
+history range queries at every resolution.
+
+Ticks are written with COPY into the partitioned price_history table and
+removed again at the end.
+
+Usage (needs Postgres migrated to the latest revision, configured in .env):
+    python -m benchmarks.price_history_benchmark --coins 20 --days 30
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+from src.database_utils.connection import DatabaseConnection
+from src.services.price_history_service import PriceHistoryService
+
+TABLES: tuple[str, ...] = (
+    "price_history",
+    "price_ohlc_1m",
+    "price_ohlc_1h",
+    "price_ohlc_1d",
+)
+
+
+async def load_ticks(
+    history: PriceHistoryService, coins: int, days: int, now: datetime
+) -> None:
+    engine = DatabaseConnection.get_shared().engine
+    start: float = time.perf_counter()
+    written: int = 0
+    for day in range(days, -1, -1):
+        day_start: datetime = (now - timedelta(days=day)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        ticks: list[tuple[str, datetime, float]] = [
+            (f"benchmark-coin-{coin}", day_start + timedelta(minutes=minute), price)
+            for coin in range(coins)
+            for minute, price in enumerate(
+                100 + random.gauss(0, 1) for _ in range(24 * 60)
+            )
+            if day_start + timedelta(minutes=minute) < now
+        ]
+        async with engine.connect() as connection:
+            await history.ensure_partitions(connection, day_start)
+            await history.record_prices(connection, ticks)
+            await connection.commit()
+        written += len(ticks)
+    seconds: float = time.perf_counter() - start
+    print(f"COPY of {written} ticks: {seconds:.2f} s ({written / seconds:.0f} rows/s)")
+
+
+async def main(coins: int, days: int) -> None:
+    # Keep every loaded day of raw ticks, to roll all of them up
+    history = PriceHistoryService(raw_retention_days=days + 1)
+    now: datetime = datetime.now(timezone.utc)
+    await load_ticks(history, coins, days, now)
+
+    start: float = time.perf_counter()
+    await history.run_maintenance()
+    print(f"Rollups: {time.perf_counter() - start:.2f} s")
+
+    database = DatabaseConnection.get_shared()
+    for span in (timedelta(hours=6), timedelta(days=7), timedelta(days=days)):
+        resolution: str = history.choose_resolution(now - span, now, now)
+        async with database.async_session() as session:
+            start = time.perf_counter()
+            for coin in range(coins):
+                points: list[dict] = await history.get_history(
+                    session, f"benchmark-coin-{coin}", now - span, now, resolution
+                )
+            seconds: float = (time.perf_counter() - start) / coins
+        print(
+            f"{str(span):>18} at {resolution:>3}: {len(points)} points, "
+            f"{seconds * 1000:.2f} ms per query"
+        )
+
+    async with database.engine.begin() as connection:
+        for table in TABLES:
+            await connection.execute(
+                text(f"DELETE FROM {table} WHERE coin_id LIKE 'benchmark-coin-%'")
+            )
+    await DatabaseConnection.close_shared()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--coins", type=int, default=20)
+    parser.add_argument("--days", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.coins, args.days))
@@ -0,0 +1,34 @@
+"""
+Run price ingestion ticks for all coins in the coin table and report duration,
+upstream requests and coins/second per tick.
+
+Usage (needs Postgres, Redis and access to the CoinGecko API, configured in .env):
+    python -m benchmarks.price_ingestion_benchmark --ticks 3
+"""
+
+import argparse
+import asyncio
+from src.coingecko.coingecko_coins_api import CoinGeckoAPI
+from src.database_utils.connection import DatabaseConnection
+from src.services.price_ingestion_service import PriceIngestionService
+
+
+async def main(ticks: int) -> None:
+    service = PriceIngestionService()
+    for tick in range(ticks):
+        requests: int = CoinGeckoAPI.upstream_stats["requests"]
+        stats: dict[str, float] = await service.ingest_prices()
+        print(
+            f"tick {tick + 1}: {stats['priced']:.0f}/{stats['coins']:.0f} coins priced "
+            f"in {stats['seconds']:.2f} s ({stats['coins_per_second']:.0f} coins/s) "
+            f"with {CoinGeckoAPI.upstream_stats['requests'] - requests} upstream requests"
+        )
+    await DatabaseConnection.close_shared()
+    await CoinGeckoAPI.close_shared_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ticks", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.ticks))
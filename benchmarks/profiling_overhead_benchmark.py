@@ -0,0 +1,123 @@
+"""
+Measure the cost of the slow query log and of request profiling.
+
+Times the slow query log's cursor event handlers per fast query, and the
+normalization of a slow one. Then calls an application with one route that
+awaits a 10 ms sleep directly through ASGI, with profiling disabled, enabled
+but not selected, and selected by the `X-Profile` header, with storing the
+profile left out.
+
+Usage (in-process, needs no services):
+    python -m benchmarks.profiling_overhead_benchmark --requests 300
+"""
+
+import argparse
+import asyncio
+import time
+import types
+from unittest.mock import AsyncMock, patch
+from fastapi import FastAPI
+from src.database_utils.slow_query_log import SlowQueryLog
+from src.profiling import RequestProfiler
+
+STATEMENT: str = (
+    "SELECT coins.id, coins.symbol, coins.name FROM coins "
+    "WHERE coins.id IN ($1::VARCHAR, $2::VARCHAR, $3::VARCHAR) LIMIT $4"
+)
+
+
+def build_app(**profiler_options) -> RequestProfiler:
+    app = FastAPI()
+
+    @app.get("/coins/{coin_id}")
+    async def get_coin(coin_id: str):
+        await asyncio.sleep(0.01)
+        return {"id": coin_id}
+
+    return RequestProfiler(app, **profiler_options)
+
+
+async def call(app: RequestProfiler, path: str, headers: list) -> None:
+    scope: dict = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        pass
+
+    await app(scope, receive, send)
+
+
+async def per_request(app: RequestProfiler, requests: int, headers: list) -> float:
+    start: float = time.perf_counter()
+    for i in range(requests):
+        await call(app, f"/coins/coin-{i}", headers)
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+def time_slow_query_log(queries: int) -> None:
+    log = SlowQueryLog(threshold_ms=100)
+    context = types.SimpleNamespace()
+    start: float = time.perf_counter()
+    for _ in range(queries):
+        log._before_cursor_execute(None, None, STATEMENT, None, context, False)
+        log._after_cursor_execute(None, None, STATEMENT, None, context, False)
+    fast_us: float = (time.perf_counter() - start) / queries * 1_000_000
+    print(f"fast query events:        {fast_us:7.2f} us per query")
+
+    start = time.perf_counter()
+    for _ in range(queries):
+        SlowQueryLog.fingerprint(SlowQueryLog.normalize(STATEMENT))
+    slow_us: float = (time.perf_counter() - start) / queries * 1_000_000
+    print(f"slow query fingerprint:   {slow_us:7.2f} us per slow query")
+
+
+async def main(requests: int, rounds: int) -> None:
+    time_slow_query_log(requests * 100)
+
+    disabled: RequestProfiler = build_app(enabled=False)
+    enabled: RequestProfiler = build_app(enabled=True)
+    header: list = [(b"x-profile", b"1")]
+    results: dict[str, float] = {}
+    with (
+        patch("src.redis_cache.redis_cache.RedisCache", return_value=AsyncMock()),
+        patch("src.profiling.logger"),
+    ):
+        # Interleaved rounds, keeping the fastest of each, to cancel out noise
+        for _ in range(rounds):
+            for name, app, headers in (
+                ("profiling disabled", disabled, []),
+                ("enabled, not selected", enabled, []),
+                ("profiled request", enabled, header),
+            ):
+                results[name] = min(
+                    results.get(name, float("inf")),
+                    await per_request(app, requests, headers),
+                )
+    for name, us in results.items():
+        print(f"{name + ':':25} {us:8.1f} us per request")
+    print(
+        f"samples per profiled request: {RequestProfiler.stats['samples'] / RequestProfiler.stats['profiled']:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.rounds))
@@ -0,0 +1,96 @@
+"""
+Measure event-loop latency while many coroutines read coins from Redis.
+
+Compares the former blocking `redis.Redis` client with the asyncio `RedisCache`.
+A heartbeat coroutine sleeps for 1 ms in a loop; the time it oversleeps is the
+latency every other request on the worker would see.
+
+Usage (needs a running Redis, configured by REDIS_HOST/REDIS_PORT/REDIS_DB):
+    python -m benchmarks.redis_event_loop_latency --requests 5000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import redis
+from src.redis_cache.redis_cache import RedisCache
+
+HEARTBEAT_INTERVAL: float = 0.001
+
+
+async def heartbeat(stop_event: asyncio.Event, lags: list[float]) -> None:
+    while not stop_event.is_set():
+        start: float = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        lags.append(time.perf_counter() - start - HEARTBEAT_INTERVAL)
+
+
+async def run_blocking(ids: list[str], concurrency: int) -> None:
+    client = redis.Redis(
+        host=os.getenv("REDIS_HOST", "localhost"),
+        port=int(os.getenv("REDIS_PORT", 6379)),
+        db=int(os.getenv("REDIS_DB", 0)),
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def get(id: str) -> None:
+        async with semaphore:
+            client.hgetall(id)
+
+    await asyncio.gather(*(get(id) for id in ids))
+    client.close()
+
+
+async def run_async(ids: list[str], concurrency: int) -> None:
+    cache = RedisCache()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def get(id: str) -> None:
+        async with semaphore:
+            await cache.get_coin_from_cache(id)
+
+    await asyncio.gather(*(get(id) for id in ids))
+
+
+async def measure(name: str, runner, ids: list[str], concurrency: int) -> None:
+    stop_event = asyncio.Event()
+    lags: list[float] = []
+    heartbeat_task = asyncio.create_task(heartbeat(stop_event, lags))
+    start: float = time.perf_counter()
+    await runner(ids, concurrency)
+    elapsed: float = time.perf_counter() - start
+    stop_event.set()
+    await heartbeat_task
+    lags.sort()
+    p99: float = lags[int(len(lags) * 0.99) - 1] if lags else 0.0
+    print(
+        f"{name:>8}: {len(ids) / elapsed:10.0f} GET/s | loop lag "
+        f"median {statistics.median(lags or [0]) * 1000:7.2f} ms, "
+        f"p99 {p99 * 1000:7.2f} ms, max {max(lags or [0]) * 1000:7.2f} ms "
+        f"({len(lags)} heartbeats)"
+    )
+
+
+async def main(requests: int, concurrency: int) -> None:
+    cache = RedisCache()
+    ids: list[str] = [f"benchmark-coin-{i}" for i in range(requests)]
+    await cache.set_coins_cache(
+        [
+            {"id": id, "symbol": f"b{i}", "name": f"Bench {i}"}
+            for i, id in enumerate(ids)
+        ]
+    )
+    await measure("blocking", run_blocking, ids, concurrency)
+    await measure("asyncio", run_async, ids, concurrency)
+    await cache.client.delete(*ids)
+    await RedisCache.close_pools()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,52 @@
+"""
+Measure build time, memory footprint and query latency of the coin search index
+over the full CoinGecko coin list.
+
+Usage (needs access to the CoinGecko API):
+    python -m benchmarks.search_index_benchmark --queries 10000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from src.coingecko.coingecko_coins_api import CoinGeckoAPI
+from src.services.coin_search_index import CoinSearchIndex
+
+
+async def main(queries: int) -> None:
+    coin_list: list = await CoinGeckoAPI().get_coin_list()
+    await CoinGeckoAPI.close_shared_client()
+
+    start: float = time.perf_counter()
+    index = CoinSearchIndex(coin_list)
+    build_seconds: float = time.perf_counter() - start
+    print(
+        f"Indexed {len(index)} coins in {build_seconds * 1000:.1f} ms, "
+        f"{index.memory_bytes() / 1024 / 1024:.1f} MiB"
+    )
+
+    samples: list[str] = []
+    for _ in range(queries):
+        coin: dict = random.choice(coin_list)
+        text: str = random.choice((coin["symbol"], coin["name"]))
+        samples.append(text[: random.randint(1, len(text))])
+    latencies: list[float] = []
+    for query in samples:
+        start = time.perf_counter()
+        index.search(query)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    print(
+        f"{queries} prefix queries: "
+        f"p50 {latencies[len(latencies) // 2] * 1_000_000:.1f} us, "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1_000_000:.1f} us, "
+        f"max {latencies[-1] * 1_000_000:.1f} us"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(main(args.queries))
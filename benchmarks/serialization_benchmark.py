@@ -0,0 +1,96 @@
+"""
+Compare the cost of encoding coin pages through Pydantic with the orjson row path.
+
+Usage (in-process, needs no services):
+    python -m benchmarks.serialization_benchmark --coins 1000 --requests 500
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections.abc import Callable
+import httpx
+from fastapi import FastAPI, Response
+from fastapi.encoders import jsonable_encoder
+from src.models.coin import Coin as SQLAlchemyCoin
+from src.schemas.coin import CoinBase, CoinPage
+from src.services.coin_serializer import CoinSerializer
+
+
+def measure(name: str, encode: Callable[[], object], repeat: int) -> float:
+    start: float = time.perf_counter()
+    for _ in range(repeat):
+        encode()
+    per_page: float = (time.perf_counter() - start) / repeat
+    print(f"{name:>32}: {per_page * 1000:8.3f} ms per page")
+    return per_page
+
+
+async def requests_per_second(app: FastAPI, path: str, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        start: float = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get(path)
+            response.raise_for_status()
+        return requests / (time.perf_counter() - start)
+
+
+def main(coins: int, repeat: int, requests: int) -> None:
+    rows: list[tuple] = [
+        (f"coin-{i}", f"c{i}", f"Coin {i}", i * 1.5 if i % 2 else None)
+        for i in range(coins)
+    ]
+    objects: list[SQLAlchemyCoin] = [
+        SQLAlchemyCoin(**dict(zip(CoinSerializer.FIELDS, row))) for row in rows
+    ]
+    print(f"Encoding pages of {coins} coins:")
+    baseline: float = measure(
+        "ORM -> jsonable_encoder -> json",
+        lambda: json.dumps(
+            jsonable_encoder(
+                CoinPage(items=[CoinBase.model_validate(coin) for coin in objects])
+            )
+        ),
+        repeat,
+    )
+    measure(
+        "ORM -> CoinPage.model_dump_json",
+        lambda: CoinPage(items=objects, next_cursor=None).model_dump_json(),
+        repeat,
+    )
+    cold = CoinSerializer(max_fragments=0, validate=False)
+    measure("rows -> orjson", lambda: cold.page(rows, None), repeat)
+    warm = CoinSerializer(max_fragments=coins, validate=False)
+    warm.page(rows, None)
+    fast: float = measure(
+        "rows -> cached fragments", lambda: warm.page(rows, None), repeat
+    )
+    print(f"Cached fragments are {baseline / fast:.1f}x faster than the baseline")
+
+    app = FastAPI()
+
+    @app.get("/pydantic", response_model=CoinPage)
+    async def pydantic_page():
+        return CoinPage(items=objects, next_cursor=None)
+
+    @app.get("/fast")
+    async def fast_page():
+        return Response(warm.page(rows, None), media_type="application/json")
+
+    print(f"Requests/second of a {coins}-coin page over ASGI:")
+    for name, path in (("response_model", "/pydantic"), ("pre-serialized", "/fast")):
+        rate: float = asyncio.run(requests_per_second(app, path, requests))
+        print(f"{name:>32}: {rate:8.0f} requests/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--coins", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    main(args.coins, args.repeat, args.requests)
@@ -0,0 +1,126 @@
+"""
+Measure request throughput of the API run with 1, 2, 4 and 8 Uvicorn workers.
+
+Each worker count starts its own server with APP_MODE=production, so the
+database and Redis configured in `.env` must be reachable. The load comes from
+several client processes, so the client is not the bottleneck before the
+server is.
+
+Usage (needs PostgreSQL and Redis, e.g. via docker compose):
+    python -m benchmarks.worker_scaling_benchmark --workers 1 2 4 8 --duration 10
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+import httpx
+
+
+async def load(base_url: str, path: str, concurrency: int, duration: float) -> int:
+    done: int = 0
+    deadline: float = time.perf_counter() + duration
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        nonlocal done
+        while time.perf_counter() < deadline:
+            response: httpx.Response = await client.get(path)
+            if response.status_code == 200:
+                done += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+    return done
+
+
+def load_process(base_url: str, path: str, concurrency: int, duration: float) -> int:
+    return asyncio.run(load(base_url, path, concurrency, duration))
+
+
+def wait_until_live(base_url: str, timeout: float = 60) -> None:
+    deadline: float = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health/liveness").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"Server at {base_url} did not start within {timeout}s")
+
+
+def measure(
+    workers: int, port: int, path: str, clients: int, concurrency: int, duration: float
+) -> float:
+    base_url: str = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:create_app",
+            "--factory",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ],
+        env={**os.environ, "APP_MODE": "production"},
+    )
+    try:
+        wait_until_live(base_url)
+        # Let every worker finish its startup before measuring
+        time.sleep(2)
+        with multiprocessing.Pool(clients) as pool:
+            done: list[int] = pool.starmap(
+                load_process, [(base_url, path, concurrency, duration)] * clients
+            )
+    finally:
+        server.terminate()
+        server.wait()
+    return sum(done) / duration
+
+
+def main(
+    worker_counts: list[int],
+    port: int,
+    path: str,
+    clients: int,
+    concurrency: int,
+    duration: float,
+) -> None:
+    baseline: float | None = None
+    for workers in worker_counts:
+        throughput: float = measure(workers, port, path, clients, concurrency, duration)
+        baseline = baseline or throughput
+        print(
+            f"{workers} workers: {throughput:10,.0f} requests/s "
+            f"({throughput / baseline:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--path", default="/coins/?limit=100")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+    main(
+        args.workers,
+        args.port,
+        args.path,
+        args.clients,
+        args.concurrency,
+        args.duration,
+    )
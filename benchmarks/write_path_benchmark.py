@@ -0,0 +1,65 @@
+"""
+Measure request latency of the coin write routes (create, update, delete).
+
+Run it once against a build before and once after a change to compare. The
+coins are created with ids already present in the Redis coin cache, so the
+CoinGecko API is not part of the measurement.
+
+Usage (needs the API running, e.g. via docker compose):
+    python -m benchmarks.write_path_benchmark --coins 500
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+from src.redis_cache.redis_cache import RedisCache
+
+
+async def timed(latencies: list[float], request) -> httpx.Response:
+    start: float = time.perf_counter()
+    response: httpx.Response = await request
+    latencies.append(time.perf_counter() - start)
+    return response
+
+
+def report(name: str, latencies: list[float]) -> None:
+    latencies.sort()
+    print(
+        f"{name:>7}: median {statistics.median(latencies) * 1000:7.2f} ms, "
+        f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:7.2f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:7.2f} ms"
+    )
+
+
+async def main(base_url: str, count: int) -> None:
+    coins: list[dict[str, str]] = [
+        {"id": f"benchmark-coin-{i}", "symbol": f"bench{i}", "name": f"Bench {i}"}
+        for i in range(count)
+    ]
+    cache = RedisCache()
+    await cache.set_coins_cache(coins)
+    latencies: dict[str, list[float]] = {"create": [], "update": [], "delete": []}
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for coin in coins:
+            await timed(latencies["create"], client.post("/coins/", json=coin))
+        for i, coin in enumerate(coins):
+            await timed(
+                latencies["update"],
+                client.put(f"/coins/{coin['id']}", json={"target_price": i}),
+            )
+        for coin in coins:
+            await timed(latencies["delete"], client.delete(f"/coins/{coin['id']}"))
+    for name, values in latencies.items():
+        report(name, values)
+    await cache.client.delete(*(coin["id"] for coin in coins))
+    await RedisCache.close_pools()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--coins", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.coins))
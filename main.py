@@ -1,24 +1,52 @@
+from src.boot import BootTimer, mark_boot_started
+
+mark_boot_started()
+
 import asyncio
-import unittest
-from fastapi import FastAPI
+import os
 from src.logger import setup_logging, logger
 from src.database_utils.connection import DatabaseConnection
-from src.database_utils.operations import DatabaseOperations
-from src.api.routes.health_routes import router as health_router
-from src.api.routes.coin_routes import router as coin_router
-from src.alembic.alembic_migration import run_alembic_migrations
 from src.services.uvicorn_service import run_uvicorn
 
 setup_logging()
 
-app = FastAPI()
+APP_MODE: str = os.getenv("APP_MODE", "development").lower()
+
+
+def create_app():
+    """
+    Build the FastAPI application. FastAPI, the routes and everything they
+    import are only loaded here, so production boot checks run before paying
+    for them.
+    """
+    from fastapi import FastAPI
+    from src.api.routes.health_routes import router as health_router
+    from src.api.routes.coin_routes import router as coin_router
+    from src.api.routes.metrics_routes import router as metrics_router
+    from src.lifespan import lifespan
+    from src.profiling import RequestProfiler
 
-app.include_router(health_router)
-app.include_router(coin_router)
+    app = FastAPI(lifespan=lifespan)
+    app.add_middleware(BootTimer)
+    app.add_middleware(RequestProfiler)
+    app.include_router(health_router)
+    app.include_router(coin_router)
+    app.include_router(metrics_router)
+    return app
+
+
+def __getattr__(name: str):
+    # `main.app` is built on first access, for `from main import app`
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 async def main():
     # This script is adjusted just for demonstration purposes
+    from src.database_utils.operations import DatabaseOperations
+    from src.alembic.alembic_migration import run_alembic_migrations
 
     db_connection = DatabaseConnection()
     db_ops = DatabaseOperations(db_connection)
@@ -57,8 +85,33 @@ async def main():
     logger.info("Database setup and migrations completed successfully!")
 
 
+async def prepare_production() -> bool:
+    """
+    Wait for PostgreSQL and bring the schema to head, keeping the data.
+    """
+    from src.alembic.alembic_migration import ensure_schema_at_head
+
+    db_connection = DatabaseConnection()
+    try:
+        if not await db_connection.wait_for_postgres(
+            timeout=float(os.getenv("POSTGRES_READY_TIMEOUT", 60)),
+            db_name=db_connection.dbname,
+        ):
+            return False
+        conn = await db_connection.create_direct_connection(db_connection.dbname)
+        try:
+            await ensure_schema_at_head(conn)
+        finally:
+            await conn.close()
+        return True
+    finally:
+        await db_connection.engine.dispose()
+
+
 def run_tests():
     # Just a sample of unit tests
+    import unittest
+
     loader = unittest.TestLoader()
     tests: unittest.TestSuite = loader.discover("tests")
     testRunner = unittest.TextTestRunner()
@@ -66,6 +119,10 @@ def run_tests():
 
 
 if __name__ == "__main__":
-    run_tests()
-    asyncio.run(main())
+    if APP_MODE == "production":
+        if not asyncio.run(prepare_production()):
+            raise SystemExit("PostgreSQL server is not available.")
+    else:
+        run_tests()
+        asyncio.run(main())
     run_uvicorn()
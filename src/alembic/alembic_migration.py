@@ -1,42 +1,52 @@
 import asyncio
-import os
-from alembic.config import Config
-from alembic import command
+import asyncpg
 from src.logger import logger
 
 
 async def run_alembic_migrations():
-    """Run Alembic migrations asynchronously."""
+    """Upgrade the database to the latest migration in src/alembic/versions."""
+    # Alembic is only imported when migrations actually run
+    from alembic.config import Config
+    from alembic import command
+
     logger.info("Running Alembic migrations...")
     alembic_cfg = Config("alembic.ini")
+    await asyncio.to_thread(command.upgrade, alembic_cfg, "head")
+    logger.info("Alembic migrations completed successfully.")
 
-    # Check if migrations directory exists, create it if it doesn't
-    migrations_dir = "src/alembic/versions"
-    os.makedirs(migrations_dir, exist_ok=True)
 
-    try:
-        # For a new database, first initialize the database with the current model
-        # without creating a migration file
-        logger.info("Initializing database schema...")
-        await asyncio.to_thread(command.stamp, alembic_cfg, "head")
-
-        # Create a migration file for future changes
-        logger.info("Generating migration file...")
-        await asyncio.to_thread(
-            command.revision,
-            alembic_cfg,
-            autogenerate=True,
-            message="Auto-generated migration",
-        )
-
-        # Run the migration to apply any pending changes
-        logger.info("Running migration...")
-        await asyncio.to_thread(command.upgrade, alembic_cfg, "head")
-
-    except Exception as e:
-        logger.error(f"Error during Alembic migrations: {e}")
-        # If something goes wrong, a simpler approach - just create the tables directly
-        logger.info("Falling back to basic migration...")
-        await asyncio.to_thread(command.upgrade, alembic_cfg, "head")
+def get_head_revisions() -> set[str]:
+    """Return the head revisions of src/alembic/versions, without touching the database."""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
 
-    logger.info("Alembic migrations completed successfully.")
+    return set(ScriptDirectory.from_config(Config("alembic.ini")).get_heads())
+
+
+async def get_current_revisions(conn: asyncpg.Connection) -> set[str]:
+    """Return the revisions the database is stamped with, empty if it never was."""
+    try:
+        rows = await conn.fetch("SELECT version_num FROM alembic_version")
+    except asyncpg.UndefinedTableError:
+        return set()
+    return {row["version_num"] for row in rows}
+
+
+async def ensure_schema_at_head(conn: asyncpg.Connection) -> bool:
+    """
+    Check that the database schema is at the latest migration and apply the
+    pending ones if it is not.
+
+    Returns True when migrations were applied.
+    """
+    heads: set[str] = await asyncio.to_thread(get_head_revisions)
+    current: set[str] = await get_current_revisions(conn)
+    if current == heads:
+        logger.info(f"Database schema is at head {', '.join(sorted(heads))}")
+        return False
+    logger.info(
+        f"Database schema is at {', '.join(sorted(current)) or 'no revision'}, "
+        f"upgrading to {', '.join(sorted(heads))}"
+    )
+    await run_alembic_migrations()
+    return True
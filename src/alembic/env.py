@@ -4,6 +4,7 @@ from alembic import context
 from sqlalchemy import pool
 from sqlalchemy.ext.asyncio import async_engine_from_config
 from src.models.coin import Base
+import src.models.price_history  # registers the price history tables
 from src.database_utils.connection import DatabaseConnection
 from dotenv import load_dotenv
 
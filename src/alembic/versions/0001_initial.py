@@ -0,0 +1,35 @@
+"""Create the coin table
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "coin",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("symbol", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("target_price", sa.Float(), nullable=True),
+        sa.Column("current_price", sa.Float(), nullable=True),
+        sa.Column("price_updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("symbol"),
+    )
+    op.execute("CREATE INDEX ix_coin_name_lower ON coin (lower(name) text_pattern_ops)")
+
+
+def downgrade():
+    op.drop_table("coin")
@@ -0,0 +1,56 @@
+"""Create the partitioned price history and OHLC rollup tables
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+OHLC_COLUMNS = """
+    coin_id varchar NOT NULL,
+    bucket timestamptz NOT NULL,
+    open double precision NOT NULL,
+    high double precision NOT NULL,
+    low double precision NOT NULL,
+    close double precision NOT NULL,
+    PRIMARY KEY (coin_id, bucket)
+"""
+
+
+def upgrade():
+    # Raw ticks, one partition per day; partitions are created ahead of time
+    # and dropped after their retention by PriceHistoryService
+    op.execute("""
+        CREATE TABLE price_history (
+            coin_id varchar NOT NULL,
+            ts timestamptz NOT NULL,
+            price double precision NOT NULL
+        ) PARTITION BY RANGE (ts)
+        """)
+    op.execute("CREATE INDEX ix_price_history_ts ON price_history USING brin (ts)")
+    op.execute(
+        "CREATE INDEX ix_price_history_coin_id_ts ON price_history (coin_id, ts)"
+    )
+
+    op.execute(
+        f"CREATE TABLE price_ohlc_1m ({OHLC_COLUMNS}) PARTITION BY RANGE (bucket)"
+    )
+    op.execute(
+        f"CREATE TABLE price_ohlc_1h ({OHLC_COLUMNS}) PARTITION BY RANGE (bucket)"
+    )
+    op.execute(f"CREATE TABLE price_ohlc_1d ({OHLC_COLUMNS})")
+    for table in ("price_ohlc_1m", "price_ohlc_1h", "price_ohlc_1d"):
+        op.execute(f"CREATE INDEX ix_{table}_bucket ON {table} USING brin (bucket)")
+
+
+def downgrade():
+    for table in ("price_ohlc_1d", "price_ohlc_1h", "price_ohlc_1m", "price_history"):
+        op.execute(f"DROP TABLE {table}")
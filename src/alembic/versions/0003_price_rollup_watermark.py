@@ -0,0 +1,40 @@
+"""Roll up price ticks by the time they were recorded
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Ticks carry CoinGecko's update time, often older than the latest rollup
+    # bucket, so the rollups find new ticks by when they were recorded
+    op.execute(
+        "ALTER TABLE price_history "
+        "ADD COLUMN recorded_at timestamptz NOT NULL DEFAULT now()"
+    )
+    op.execute(
+        "CREATE INDEX ix_price_history_recorded_at "
+        "ON price_history USING brin (recorded_at)"
+    )
+    op.execute("""
+        CREATE TABLE price_rollup_watermark (
+            name varchar PRIMARY KEY,
+            recorded_at timestamptz NOT NULL
+        )
+        """)
+
+
+def downgrade():
+    op.execute("DROP TABLE price_rollup_watermark")
+    op.execute("DROP INDEX ix_price_history_recorded_at")
+    op.execute("ALTER TABLE price_history DROP COLUMN recorded_at")
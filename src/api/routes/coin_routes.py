@@ -1,61 +1,265 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, status
-from fastapi.responses import JSONResponse
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.future import select
+import os
+import httpx
+from datetime import datetime, timedelta, timezone
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Depends,
+    Header,
+    Query,
+    status,
+)
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.models.coin import Coin as SQLAlchemyCoin
-from src.schemas.coin import CoinBase, CoinCreate, CoinUpdate
+from src.schemas.coin import (
+    CoinBase,
+    CoinBulkItemResult,
+    CoinBulkResult,
+    CoinCreate,
+    CoinPage,
+    CoinPrice,
+    CoinPriceHistory,
+    CoinRefreshJob,
+    CoinSearchResult,
+    CoinUpdate,
+)
 from src.services.coin_update_service import CoinUpdateService
+from src.metrics import MetricsRoute
 from src.logger import logger
 from src.services.periodic_coin_data_updater import PeriodicCoinDataUpdater
 from src.services.coin_service import CoinService
+from src.services.coin_export_service import CoinExportService
+from src.services.coin_serializer import CoinSerializer
+from src.services.coin_refresh_queue import CoinRefreshQueue
+from src.services.price_ingestion_service import PriceIngestionService
+from src.services.live_price_broadcaster import LivePriceBroadcaster
+from src.redis_cache.response_cache import ResponseCache
 from src.dependencies import get_db
 
-router = APIRouter(prefix="/coins", tags=["coins"])
+router = APIRouter(prefix="/coins", tags=["coins"], route_class=MetricsRoute)
 coin_update_service = CoinUpdateService()
 periodic_updater = PeriodicCoinDataUpdater()
+coin_refresh_queue = CoinRefreshQueue(periodic_updater, periodic_updater.cache.client)
+coin_export_service = CoinExportService()
+coin_serializer = CoinSerializer()
+price_ingestion_service = PriceIngestionService()
+live_price_broadcaster = LivePriceBroadcaster(price_ingestion_service.cache)
+response_cache = ResponseCache()
+BULK_IMPORT_MAX_COINS: int = int(os.getenv("BULK_IMPORT_MAX_COINS", 5000))
+COINS_PAGE_SIZE: int = int(os.getenv("COINS_PAGE_SIZE", 100))
+COINS_MAX_PAGE_SIZE: int = int(os.getenv("COINS_MAX_PAGE_SIZE", 1000))
+SEARCH_MAX_RESULTS: int = int(os.getenv("SEARCH_MAX_RESULTS", 100))
+LIVE_PRICES_MAX_COINS: int = int(os.getenv("LIVE_PRICES_MAX_COINS", 100))
+
+
+def conditional_response(etag: str, body: str, if_none_match: str | None) -> Response:
+    """
+    Answer 304 when the client already holds this ETag, the full body otherwise.
+    """
+    headers: dict[str, str] = {"ETag": etag, "Cache-Control": "no-cache"}
+    client_etags: set[str] = {
+        tag.strip().removeprefix("W/") for tag in (if_none_match or "").split(",")
+    }
+    if etag in client_etags or "*" in client_etags:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.post(
     "/",
     response_model=CoinBase,
     status_code=status.HTTP_201_CREATED,
-    responses={201: {"description": "Coin created successfully"}},
+    responses={
+        201: {"description": "Coin created successfully"},
+        503: {"description": "CoinGecko API unavailable"},
+    },
 )
 async def create_coin(coin: CoinCreate, session: AsyncSession = Depends(get_db)):
-    await CoinService.handle_coin_already_exists(session, coin.id)
     try:
         updated_coin_data: CoinUpdate = await coin_update_service.update_coin_data(coin)
-        new_coin = SQLAlchemyCoin(**updated_coin_data.dict())
-        session.add(new_coin)
-        await session.commit()
-        await session.refresh(new_coin)
-        logger.info(f"Coin with id {coin.id} created successfully")
-        return new_coin
     except ValueError as e:
+        # An existing coin takes precedence over failed validation
+        await CoinService.handle_coin_already_exists(session, coin.id)
         logger.error(f"Validation error: {str(e)}")
         raise HTTPException(status_code=404, detail=str(e))
-    except IntegrityError:
-        await session.rollback()
+    except httpx.HTTPError as e:
+        await CoinService.handle_coin_already_exists(session, coin.id)
+        logger.error(f"CoinGecko lookup of {coin.id} failed: {e}")
+        raise HTTPException(status_code=503, detail="CoinGecko API is unavailable")
+    new_coin = await CoinService.create_coin(session, updated_coin_data.model_dump())
+    if new_coin is None:
         logger.error(f"Coin with id {coin.id} already exists")
         raise HTTPException(status_code=400, detail="Coin with this ID already exists")
+    await response_cache.invalidate_coins([coin.id])
+    logger.info(f"Coin with id {coin.id} created successfully")
+    return new_coin
+
+
+@router.post(
+    "/bulk",
+    response_model=CoinBulkResult,
+    responses={
+        200: {"description": "Per-coin import report"},
+        400: {"description": "Too many coins in one request"},
+    },
+)
+async def create_coins_bulk(
+    coins: list[CoinCreate], session: AsyncSession = Depends(get_db)
+):
+    if len(coins) > BULK_IMPORT_MAX_COINS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BULK_IMPORT_MAX_COINS} coins can be imported at once",
+        )
+    unique_coins: dict[str, CoinCreate] = {}
+    for coin in coins:
+        unique_coins.setdefault(coin.id, coin)
+    valid_coins, not_found, upstream_errors = (
+        await coin_update_service.update_coins_data(list(unique_coins.values()))
+    )
+    inserted: set[str] = await CoinService.insert_coins(
+        session, [coin.model_dump() for coin in valid_coins]
+    )
+
+    results: dict[str, CoinBulkItemResult] = {
+        id: CoinBulkItemResult(
+            id=id, status="not_found", detail="Coin ID not found in CoinGecko API"
+        )
+        for id in not_found
+    }
+    results.update(
+        {
+            id: CoinBulkItemResult(
+                id=id,
+                status="upstream_error",
+                detail="CoinGecko API unavailable, retry later",
+            )
+            for id in upstream_errors
+        }
+    )
+    results.update(
+        {
+            coin.id: (
+                CoinBulkItemResult(id=coin.id, status="created")
+                if coin.id in inserted
+                else CoinBulkItemResult(
+                    id=coin.id,
+                    status="already_exists",
+                    detail="Coin with this ID or symbol already exists",
+                )
+            )
+            for coin in valid_coins
+        }
+    )
+    items: list[CoinBulkItemResult] = [
+        (
+            results.pop(coin.id)
+            if coin.id in results
+            else CoinBulkItemResult(
+                id=coin.id, status="duplicate", detail="Coin ID repeated in request"
+            )
+        )
+        for coin in coins
+    ]
+    if inserted:
+        await response_cache.invalidate_coins(list(inserted))
+    logger.info(f"Bulk import created {len(inserted)} of {len(coins)} coins")
+    return CoinBulkResult(
+        created=len(inserted), failed=len(coins) - len(inserted), items=items
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"description": "All coins as NDJSON or CSV"}},
+)
+async def export_coins(format: str = Query(default="ndjson", pattern="^(ndjson|csv)$")):
+    logger.info(f"Coin export as {format} started")
+    return StreamingResponse(
+        coin_export_service.stream(format),
+        media_type=CoinExportService.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="coins.{format}"'},
+    )
+
+
+@router.get(
+    "/search",
+    response_model=list[CoinSearchResult],
+    responses={503: {"description": "Search index is not built yet"}},
+)
+async def search_coins(
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=20, ge=1, le=SEARCH_MAX_RESULTS),
+):
+    search_index = periodic_updater.search_index
+    if search_index is None:
+        raise HTTPException(
+            status_code=503, detail="Search index is not built yet, try again later"
+        )
+    return search_index.search(q, limit)
+
+
+@router.get(
+    "/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/event-stream": {}}},
+        400: {"description": "No or too many coin ids"},
+    },
+)
+async def stream_prices(
+    ids: str = Query(description="Comma-separated ids of the coins to follow"),
+):
+    coin_ids: list[str] = list(
+        dict.fromkeys(id.strip() for id in ids.split(",") if id.strip())
+    )
+    if not coin_ids or len(coin_ids) > LIVE_PRICES_MAX_COINS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Give between 1 and {LIVE_PRICES_MAX_COINS} coin ids",
+        )
+    return StreamingResponse(
+        live_price_broadcaster.stream(coin_ids),
+        media_type="text/event-stream",
+        # Keep reverse proxies from buffering the events
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get(
     "/{coin_id}",
     response_model=CoinBase,
-    responses={404: {"description": "Coin not found"}},
+    responses={
+        304: {"description": "Coin not modified since the given ETag"},
+        404: {"description": "Coin not found"},
+    },
 )
-async def get_coin(coin_id: str, session: AsyncSession = Depends(get_db)):
+async def get_coin(
+    coin_id: str,
+    if_none_match: str | None = Header(default=None),
+    session: AsyncSession = Depends(get_db),
+):
+    cached, generation = await response_cache.get_coin(coin_id)
+    if cached:
+        return conditional_response(*cached, if_none_match)
     coin = await CoinService.handle_coin_not_found(session, coin_id)
+    body: str = coin_serializer.coin(
+        (coin.id, coin.symbol, coin.name, coin.target_price)
+    ).decode()
+    etag: str = await response_cache.set_coin(coin_id, body, generation)
     logger.info(f"Coin with id {coin_id} retrieved successfully")
-    return coin
+    return conditional_response(etag, body, if_none_match)
 
 
 @router.put(
     "/{coin_id}",
     response_model=CoinBase,
-    responses={404: {"description": "Coin not found"}},
+    responses={
+        404: {"description": "Coin not found"},
+        503: {"description": "CoinGecko API unavailable"},
+    },
 )
 async def update_coin(
     coin_id: str, coin: CoinUpdate, session: AsyncSession = Depends(get_db)
@@ -68,17 +272,83 @@ async def update_coin(
             detail="Coin ID mismatch. Coin ID in URL must match Coin ID in request body",
         )
 
-    existing_coin: SQLAlchemyCoin = await CoinService.handle_coin_not_found(
-        session, coin.id
+    try:
+        updated_coin_data: CoinUpdate = await coin_update_service.update_coin_data(coin)
+    except ValueError as e:
+        # A missing coin takes precedence over failed validation
+        await CoinService.handle_coin_not_found(session, coin_id)
+        logger.error(f"Validation error: {str(e)}")
+        raise HTTPException(status_code=404, detail=str(e))
+    except httpx.HTTPError as e:
+        await CoinService.handle_coin_not_found(session, coin_id)
+        logger.error(f"CoinGecko lookup of {coin_id} failed: {e}")
+        raise HTTPException(status_code=503, detail="CoinGecko API is unavailable")
+    updated_coin = await CoinService.update_coin(
+        session, coin_id, updated_coin_data.model_dump(exclude_unset=True)
     )
-    updated_coin_data: CoinUpdate = await coin_update_service.update_coin_data(coin)
-    update_data = updated_coin_data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(existing_coin, key, value)
-    await session.commit()
-    await session.refresh(existing_coin)
+    if updated_coin is None:
+        logger.error(f"Coin with id {coin_id} not found")
+        raise HTTPException(status_code=404, detail="Coin with this ID not found")
+    await response_cache.invalidate_coins([coin_id])
     logger.info(f"Coin with id {coin_id} updated successfully")
-    return existing_coin
+    return updated_coin
+
+
+@router.get(
+    "/{coin_id}/price",
+    response_model=CoinPrice,
+    responses={404: {"description": "Coin not found or not priced yet"}},
+)
+async def get_coin_price(coin_id: str, session: AsyncSession = Depends(get_db)):
+    price: dict | None = await price_ingestion_service.cache.get_coin_price(coin_id)
+    if price:
+        return CoinPrice(
+            id=coin_id,
+            usd=price["usd"],
+            updated_at=PriceIngestionService.updated_at(price),
+        )
+    # Redis may have been flushed since the last tick
+    coin = await CoinService.handle_coin_not_found(session, coin_id)
+    if coin.current_price is None:
+        raise HTTPException(
+            status_code=404, detail="No price ingested for this coin yet"
+        )
+    return CoinPrice(
+        id=coin_id, usd=coin.current_price, updated_at=coin.price_updated_at
+    )
+
+
+@router.get(
+    "/{coin_id}/history",
+    response_model=CoinPriceHistory,
+    responses={400: {"description": "Invalid range or too many points"}},
+)
+async def get_coin_history(
+    coin_id: str,
+    start: datetime | None = Query(default=None, alias="from"),
+    end: datetime | None = Query(default=None, alias="to"),
+    resolution: str = Query(default="auto", pattern="^(auto|raw|1m|1h|1d)$"),
+    session: AsyncSession = Depends(get_db),
+):
+    history = price_ingestion_service.history
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=1)
+    if start.tzinfo is None or end.tzinfo is None:
+        raise HTTPException(status_code=400, detail="from and to need a timezone")
+    if start >= end:
+        raise HTTPException(status_code=400, detail="from must be before to")
+    if resolution == "auto":
+        resolution = history.choose_resolution(start, end)
+    elif history.count_points(start, end, resolution) > history.max_points:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range has more than {history.max_points} points at {resolution}, "
+            "use a coarser resolution",
+        )
+    points: list[dict] = await history.get_history(
+        session, coin_id, start, end, resolution
+    )
+    return CoinPriceHistory(id=coin_id, resolution=resolution, points=points)
 
 
 @router.delete(
@@ -89,25 +359,88 @@ async def update_coin(
     },
 )
 async def delete_coin(coin_id: str, session: AsyncSession = Depends(get_db)):
-    coin = await CoinService.handle_coin_not_found(session, coin_id)
-    await session.delete(coin)
-    await session.commit()
+    if not await CoinService.delete_coin(session, coin_id):
+        logger.error(f"Coin with id {coin_id} not found")
+        raise HTTPException(status_code=404, detail="Coin with this ID not found")
+    await response_cache.invalidate_coins([coin_id])
     logger.info(f"Coin with id {coin_id} deleted successfully")
     return {"message": "Coin deleted successfully"}
 
 
-@router.get("/", response_model=list[CoinBase])
-async def list_coins(session: AsyncSession = Depends(get_db)):
-    result = await session.execute(select(SQLAlchemyCoin))
-    coins = result.scalars().all()
+@router.get(
+    "/",
+    response_model=CoinPage,
+    responses={
+        304: {"description": "Page not modified since the given ETag"},
+        400: {"description": "Invalid cursor"},
+    },
+)
+async def list_coins(
+    limit: int = Query(default=COINS_PAGE_SIZE, ge=1, le=COINS_MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    symbol: str | None = None,
+    name_prefix: str | None = None,
+    has_target_price: bool | None = None,
+    if_none_match: str | None = Header(default=None),
+    session: AsyncSession = Depends(get_db),
+):
+    query: str = ResponseCache.list_query(
+        limit=limit,
+        cursor=cursor,
+        symbol=symbol,
+        name_prefix=name_prefix,
+        has_target_price=has_target_price,
+    )
+    cached, generation = await response_cache.get_list(query)
+    if cached:
+        return conditional_response(*cached, if_none_match)
+    after_id: str | None = CoinService.decode_cursor(cursor) if cursor else None
+    # One extra row tells whether another page follows
+    coins: list[Row] = await CoinService.list_coins(
+        session, limit + 1, after_id, symbol, name_prefix, has_target_price
+    )
+    next_cursor: str | None = (
+        CoinService.encode_cursor(coins[limit - 1].id) if len(coins) > limit else None
+    )
+    body: str = coin_serializer.page(coins[:limit], next_cursor).decode()
+    etag: str = await response_cache.set_list(query, body, generation)
     logger.info("List of coins retrieved successfully")
-    return coins
+    return conditional_response(etag, body, if_none_match)
 
 
 @router.post(
-    "/update-coins/", responses={200: {"description": "Coin data update triggered"}}
+    "/update-coins/",
+    responses={
+        200: {"description": "Coin data update queued or already in progress"},
+        503: {"description": "Coin data update queue unavailable"},
+    },
+)
+async def trigger_coin_update(idempotency_key: str | None = Header(default=None)):
+    job_id, created = await coin_refresh_queue.enqueue(idempotency_key)
+    if job_id is None:
+        raise HTTPException(
+            status_code=503, detail="Coin data update queue is unavailable"
+        )
+    if created:
+        logger.info(f"Manual coin data update queued as job {job_id}")
+        message: str = "Coin data update triggered"
+    else:
+        logger.info(f"Manual coin data update joined job {job_id}")
+        message = "Coin data update already in progress"
+    return {
+        "message": message,
+        "job_id": job_id,
+        "status_url": f"{router.prefix}/update-coins/{job_id}",
+    }
+
+
+@router.get(
+    "/update-coins/{job_id}",
+    response_model=CoinRefreshJob,
+    responses={404: {"description": "Job not found or expired"}},
 )
-async def trigger_coin_update(background_tasks: BackgroundTasks):
-    background_tasks.add_task(periodic_updater.fetch_and_cache_coin_data)
-    logger.info("Manual coin data update triggered")
-    return {"message": "Coin data update triggered"}
+async def get_coin_update_job(job_id: str):
+    job: dict | None = await coin_refresh_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
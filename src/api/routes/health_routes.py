@@ -1,18 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.boot import BootTimer
+from src.coingecko.coingecko_coins_api import CoinGeckoAPI
+from src.coingecko.request_scheduler import RequestScheduler
 from src.database_utils.connection import DatabaseConnection
 from src.redis_cache.redis_cache import RedisCache
+from src.dependencies import get_db
+from src.lifespan import leader_election
+from src.api.routes.coin_routes import (
+    coin_refresh_queue,
+    coin_serializer,
+    coin_update_service,
+    live_price_broadcaster,
+    periodic_updater,
+    price_ingestion_service,
+)
+from src.metrics import MetricsRoute
+from src.profiling import RequestProfiler
 from src.logger import logger
 
-router = APIRouter(prefix="/health", tags=["health"])
-
-
-async def get_db():
-    """Database session dependency"""
-    db_connection = DatabaseConnection()
-    async with db_connection.async_session() as session:
-        yield session
+router = APIRouter(prefix="/health", tags=["health"], route_class=MetricsRoute)
 
 
 @router.get("/", status_code=status.HTTP_200_OK)
@@ -36,7 +46,7 @@ async def readiness_check(session: AsyncSession = Depends(get_db)):
 
     # Check database connection
     try:
-        await session.execute("SELECT 1")
+        await session.execute(text("SELECT 1"))
         health_status["database"] = True
     except Exception as e:
         logger.error(f"Database health check failed: {e}")
@@ -45,7 +55,7 @@ async def readiness_check(session: AsyncSession = Depends(get_db)):
     # Check Redis connection
     try:
         redis_cache = RedisCache()
-        redis_cache.client.ping()
+        await redis_cache.client.ping()
         health_status["redis"] = True
     except Exception as e:
         logger.error(f"Redis health check failed: {e}")
@@ -60,6 +70,88 @@ async def readiness_check(session: AsyncSession = Depends(get_db)):
     return health_status
 
 
+@router.get("/stats", status_code=status.HTTP_200_OK)
+async def stats():
+    """
+    Returns runtime statistics of the shared resources of this worker
+    """
+    search_index = periodic_updater.search_index
+    slow_query_log = DatabaseConnection.get_shared().slow_query_log
+    return {
+        "boot": BootTimer.stats,
+        "leader": {"is_leader": leader_election.is_leader, **leader_election.stats},
+        "database_pool": DatabaseConnection.get_shared().pool_status(),
+        "slow_queries": {"fingerprints": len(slow_query_log), **slow_query_log.stats},
+        "coin_lookup_single_flight": coin_update_service.single_flight.stats,
+        "coin_local_cache": {
+            "entries": len(coin_update_service.redis_cache.local_cache),
+            **coin_update_service.redis_cache.local_cache.stats,
+        },
+        "coin_json_fragments": {
+            "entries": len(coin_serializer),
+            **coin_serializer.stats,
+        },
+        "coingecko_scheduler": RequestScheduler.get_shared().stats,
+        "coingecko_upstream": CoinGeckoAPI.upstream_stats,
+        "coin_lookup_batcher": coin_update_service.coin_lookup_batcher.stats,
+        "coin_search_index": (
+            {"coins": len(search_index), "memory_bytes": search_index.memory_bytes()}
+            if search_index
+            else None
+        ),
+        "price_ingestion_last_tick": price_ingestion_service.last_tick,
+        "price_alerts": price_ingestion_service.alerts.stats,
+        "coin_refresh_jobs": coin_refresh_queue.stats,
+        "live_prices": {
+            "clients": live_price_broadcaster.clients,
+            **live_price_broadcaster.stats,
+        },
+        "request_profiles": RequestProfiler.stats,
+    }
+
+
+@router.get("/slow-queries", status_code=status.HTTP_200_OK)
+async def slow_queries(limit: int = Query(20, ge=1, le=500)):
+    """
+    Returns the SQL statements of this worker slower than the threshold,
+    grouped by fingerprint, with the most total time first
+    """
+    slow_query_log = DatabaseConnection.get_shared().slow_query_log
+    return {
+        "threshold_ms": slow_query_log.threshold * 1000,
+        "queries": slow_query_log.top(limit),
+    }
+
+
+@router.get("/profiles", status_code=status.HTTP_200_OK)
+async def list_profiles():
+    """
+    Returns the latest stored request profiles, newest first
+    """
+    return await RedisCache().list_profiles()
+
+
+@router.get(
+    "/profiles/{profile_id}",
+    status_code=status.HTTP_200_OK,
+    response_class=PlainTextResponse,
+)
+async def get_profile(profile_id: str):
+    """
+    Returns a request profile as folded stacks, as read by flamegraph.pl and
+    speedscope
+    """
+    folded: str | None = await RedisCache().get_profile(profile_id)
+    if folded is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found"
+        )
+    return PlainTextResponse(
+        folded,
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'},
+    )
+
+
 @router.get("/liveness", status_code=status.HTTP_200_OK)
 async def liveness_check():
     """
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Response
+from src.metrics import render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus metrics of the API, the database pool, Redis, CoinGecko and
+    the coin data refreshes.
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
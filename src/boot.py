@@ -0,0 +1,99 @@
+import asyncio
+import os
+import time
+from src.logger import logger
+
+# Wall-clock start of the process, kept in the environment so it survives
+# uvicorn importing main.py a second time
+BOOT_STARTED_AT_ENV: str = "COINTRACK_BOOT_STARTED_AT"
+
+
+def mark_boot_started() -> None:
+    os.environ.setdefault(BOOT_STARTED_AT_ENV, str(time.time()))
+
+
+def seconds_since_boot() -> float | None:
+    started_at: str | None = os.getenv(BOOT_STARTED_AT_ENV)
+    return round(time.time() - float(started_at), 3) if started_at else None
+
+
+class BootTimer:
+    """
+    ASGI middleware recording how long after the process started the first
+    request was answered.
+
+    Once that is known it only passes requests through.
+    """
+
+    stats: dict[str, float | None] = {
+        "ready_seconds": None,
+        "first_request_seconds": None,
+    }
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.stats["first_request_seconds"] is not None:
+            return await self.app(scope, receive, send)
+        await self.app(scope, receive, send)
+        if self.stats["first_request_seconds"] is None:
+            self.stats["first_request_seconds"] = seconds_since_boot()
+            logger.info(
+                f"First request served {self.stats['first_request_seconds']} s "
+                "after the process started"
+            )
+
+    @classmethod
+    def mark_ready(cls) -> None:
+        cls.stats["ready_seconds"] = seconds_since_boot()
+        logger.info(
+            f"Ready to serve {cls.stats['ready_seconds']} s after the process started"
+        )
+
+
+async def warm_up_pools(timeout: float = 10) -> None:
+    """
+    Open the pooled database, Redis and CoinGecko connections before the first
+    request needs them.
+
+    Failures are only logged, the pools then fill up on demand as before.
+    """
+    # main.py imports this module before anything else to start the boot
+    # clock, so the drivers and clients are only loaded once warming up
+    from sqlalchemy import text
+    from src.coingecko.coingecko_coins_api import CoinGeckoAPI
+    from src.coingecko.request_scheduler import RequestScheduler
+    from src.database_utils.connection import DatabaseConnection
+    from src.redis_cache.redis_cache import RedisCache
+
+    start: float = time.perf_counter()
+    database: DatabaseConnection = DatabaseConnection.get_shared()
+    redis_cache = RedisCache()
+    connections: int = database.engine.pool.size()
+
+    async def check_out_database() -> None:
+        async with database.engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    try:
+        results: list = await asyncio.wait_for(
+            asyncio.gather(
+                # Concurrent checkouts each open their own connection
+                *(check_out_database() for _ in range(connections)),
+                *(redis_cache.client.ping() for _ in range(connections)),
+                CoinGeckoAPI(priority=RequestScheduler.BACKGROUND).ping(),
+                return_exceptions=True,
+            ),
+            timeout,
+        )
+    except asyncio.TimeoutError:
+        logger.error(f"Pool warm-up did not finish within {timeout} s")
+        return
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error(f"Pool warm-up failed: {result}")
+    logger.info(
+        f"Warmed up {connections} database and Redis connections in "
+        f"{time.perf_counter() - start:.2f} s"
+    )
@@ -0,0 +1,88 @@
+import asyncio
+import os
+from src.coingecko.coingecko_coins_api import CoinGeckoAPI
+from src.logger import logger
+
+
+class CoinLookupBatcher:
+    """
+    Collect coin lookups for different ids over a short window and resolve
+    them with one multi-id CoinGecko request.
+
+    Ids missing from the batched response, for example coins without market
+    data, are looked up one by one so the result matches a single lookup. When
+    the batched request fails, every lookup in it fails with its error instead,
+    as looking each id up would only send more requests to a failing or rate
+    limiting upstream.
+    """
+
+    def __init__(
+        self,
+        api: CoinGeckoAPI,
+        window: float = float(os.getenv("COIN_LOOKUP_BATCH_WINDOW_MS", 5)) / 1000,
+        max_batch_size: int = CoinGeckoAPI.MARKETS_PAGE_SIZE,
+    ):
+        self.api: CoinGeckoAPI = api
+        self.window: float = window
+        self.max_batch_size: int = max_batch_size
+        self._pending: dict[str, list[asyncio.Future]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        # Keeps running batches referenced until they finish
+        self._batches: set[asyncio.Task] = set()
+        self.stats: dict[str, int] = {
+            "lookups": 0,
+            "batches": 0,
+            "batched_ids": 0,
+            "fallback_lookups": 0,
+        }
+
+    async def load(self, coin_id: str) -> dict:
+        """
+        Return the CoinGecko data of a coin, or an empty dict if it is unknown.
+        """
+        self.stats["lookups"] += 1
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.setdefault(coin_id, []).append(future)
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending: dict[str, list[asyncio.Future]] = self._pending
+        self._pending = {}
+        if pending:
+            task: asyncio.Task = asyncio.create_task(self._resolve(pending))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _resolve(self, pending: dict[str, list[asyncio.Future]]) -> None:
+        self.stats["batches"] += 1
+        self.stats["batched_ids"] += len(pending)
+        try:
+            found: dict[str, dict] = await self.api.get_coins_info(list(pending))
+            missing: list[str] = [id for id in pending if id not in found]
+            if missing:
+                self.stats["fallback_lookups"] += len(missing)
+                results: list[dict] = await asyncio.gather(
+                    *(self.api.get_coin_info(id) for id in missing)
+                )
+                found.update(
+                    (id, result) for id, result in zip(missing, results) if result
+                )
+        except Exception as e:
+            logger.error(f"Error resolving a batch of {len(pending)} coin lookups: {e}")
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        for id, futures in pending.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(dict(found.get(id, {})))
@@ -1,36 +1,295 @@
-import requests
+import asyncio
+import os
+import time
+import httpx
+import orjson
+from dotenv import load_dotenv
+from src.coingecko.request_scheduler import RequestScheduler
+from src.metrics import (
+    COINGECKO_RATE_LIMITED,
+    COINGECKO_REQUEST_DURATION,
+    COINGECKO_RESPONSES,
+)
 from src.logger import logger
 
+load_dotenv()
+
 
 class CoinGeckoAPI:
     BASE_URL = "https://api.coingecko.com/api/v3"
+    # Maximum number of ids accepted by one /coins/markets request
+    MARKETS_PAGE_SIZE = 250
+    # Ids per /simple/price request, bounded by the URL length
+    SIMPLE_PRICE_PAGE_SIZE = int(os.getenv("COINGECKO_SIMPLE_PRICE_PAGE_SIZE", 250))
+    # Statuses worth retrying after a backoff
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    # Leave out the market data, tickers and descriptions of /coins/{id}
+    COIN_INFO_PARAMS = {
+        "localization": "false",
+        "tickers": "false",
+        "market_data": "false",
+        "community_data": "false",
+        "developer_data": "false",
+    }
+    # Requests sent and response bytes received by this process
+    upstream_stats: dict[str, int] = {"requests": 0, "bytes": 0}
+    _shared_client: httpx.AsyncClient | None = None
+    _shared_semaphore: asyncio.Semaphore | None = None
 
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(
+        self,
+        client: httpx.AsyncClient | None = None,
+        priority: int = RequestScheduler.INTERACTIVE,
+        scheduler: RequestScheduler | None = None,
+    ):
+        self._client: httpx.AsyncClient | None = client
+        self._semaphore: asyncio.Semaphore | None = (
+            self.create_semaphore() if client else None
+        )
+        self.priority: int = priority
+        self._scheduler: RequestScheduler | None = scheduler
 
-    def get_coin_info(self, coin_id: str) -> dict:
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client or self.get_shared_client()
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore:
+            return self._semaphore
+        self.get_shared_client()
+        return self._shared_semaphore
+
+    @property
+    def scheduler(self) -> RequestScheduler:
+        return self._scheduler or RequestScheduler.get_shared()
+
+    @staticmethod
+    def create_semaphore() -> asyncio.Semaphore:
+        """
+        Create the semaphore capping the number of in-flight requests.
+        """
+        return asyncio.Semaphore(int(os.getenv("COINGECKO_MAX_IN_FLIGHT", 10)))
+
+    @classmethod
+    def create_client(cls) -> httpx.AsyncClient:
+        """
+        Create an HTTP client with a keep-alive connection pool and request timeouts.
+        """
+        return httpx.AsyncClient(
+            base_url=cls.BASE_URL,
+            timeout=httpx.Timeout(
+                float(os.getenv("COINGECKO_READ_TIMEOUT", 10)),
+                connect=float(os.getenv("COINGECKO_CONNECT_TIMEOUT", 5)),
+            ),
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("COINGECKO_MAX_CONNECTIONS", 20)),
+                max_keepalive_connections=int(
+                    os.getenv("COINGECKO_MAX_KEEPALIVE_CONNECTIONS", 10)
+                ),
+            ),
+        )
+
+    @classmethod
+    def get_shared_client(cls) -> httpx.AsyncClient:
+        """
+        Return the process-wide HTTP client, creating it on first use.
+
+        All instances using the shared client also share its in-flight cap.
+        """
+        if cls._shared_client is None or cls._shared_client.is_closed:
+            cls._shared_client = cls.create_client()
+            cls._shared_semaphore = cls.create_semaphore()
+        return cls._shared_client
+
+    @classmethod
+    async def close_shared_client(cls) -> None:
+        """
+        Close the process-wide HTTP client and its pooled connections.
+        """
+        if cls._shared_client is None:
+            return
+        await cls._shared_client.aclose()
+        cls._shared_client = None
+        logger.info("Closed shared CoinGecko HTTP client")
+
+    async def _get_json(
+        self, path: str, params: dict | None = None, endpoint: str | None = None
+    ) -> dict | list:
+        """
+        Send a GET request, limited by the rate limit scheduler and the in-flight
+        cap, and decode the JSON body.
+
+        Rate limited and failed upstream responses are retried with backoff.
+        `endpoint` names the path in metrics when it contains an id.
+        """
+        endpoint = endpoint or path
+        for attempt in range(self.scheduler.max_retries + 1):
+            await self.scheduler.acquire(self.priority)
+            async with self.semaphore:
+                start: float = time.perf_counter()
+                try:
+                    response: httpx.Response = await self.client.get(
+                        path, params=params
+                    )
+                except httpx.HTTPError:
+                    COINGECKO_RESPONSES.labels(endpoint, "error").inc()
+                    raise
+                finally:
+                    COINGECKO_REQUEST_DURATION.labels(endpoint).observe(
+                        time.perf_counter() - start
+                    )
+            COINGECKO_RESPONSES.labels(endpoint, str(response.status_code)).inc()
+            if response.status_code == 429:
+                COINGECKO_RATE_LIMITED.inc()
+            self.upstream_stats["requests"] += 1
+            self.upstream_stats["bytes"] += len(response.content)
+            if (
+                response.status_code not in self.RETRY_STATUSES
+                or attempt == self.scheduler.max_retries
+            ):
+                break
+            delay: float = self.scheduler.retry_delay(
+                attempt, response.headers.get("Retry-After")
+            )
+            logger.warning(
+                f"CoinGecko API returned {response.status_code} for {path}, "
+                f"retrying in {delay:.1f}s"
+            )
+            if response.status_code == 429:
+                # The scheduler holds back every queued request until then
+                await self.scheduler.rate_limit_hit(delay)
+            else:
+                await asyncio.sleep(delay)
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    async def ping(self) -> bool:
+        """
+        Open a pooled connection to CoinGecko through its cheapest endpoint.
+        """
+        try:
+            await self._get_json("/ping")
+            return True
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+            logger.error(f"Error pinging CoinGecko API: {e}")
+            return False
+
+    async def get_coin_info(self, coin_id: str) -> dict:
         """
         Fetch basic information about a cryptocurrency from CoinGecko API.
+
+        Returns an empty dict if CoinGecko does not know the coin, and raises
+        the error of a failed request.
         """
-        url: str = f"{self.BASE_URL}/coins/{coin_id}"
         try:
-            response: requests.Response = self.session.get(url)
-            response.raise_for_status()
+            data: dict = await self._get_json(
+                f"/coins/{coin_id}", self.COIN_INFO_PARAMS, "/coins/{id}"
+            )
             logger.info(f"Fetched data for {coin_id} from CoinGecko API.")
-            return response.json()
-        except requests.RequestException as e:
+            return data
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                logger.info(f"Coin {coin_id} not found in CoinGecko API.")
+                return {}
+            logger.error(f"Error fetching data from CoinGecko API: {e}")
+            raise
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
             logger.error(f"Error fetching data from CoinGecko API: {e}")
+            raise
+
+    async def get_coins_info(self, coin_ids: list[str]) -> dict[str, dict]:
+        """
+        Fetch basic information about many cryptocurrencies, up to
+        MARKETS_PAGE_SIZE ids per request, with the requests sent concurrently.
+
+        Ids unknown to CoinGecko, or without market data, are left out of the
+        result. Raises the error of a failed request, as leaving its ids out
+        would report them as unknown.
+        """
+        chunks: list[list[str]] = [
+            coin_ids[i : i + self.MARKETS_PAGE_SIZE]
+            for i in range(0, len(coin_ids), self.MARKETS_PAGE_SIZE)
+        ]
+        pages: list[list] = await asyncio.gather(
+            *(self._get_markets_page(chunk) for chunk in chunks)
+        )
+        return {coin["id"]: coin for page in pages for coin in page}
+
+    async def _get_markets_page(self, coin_ids: list[str]) -> list:
+        params: dict[str, str | int] = {
+            "vs_currency": "usd",
+            "ids": ",".join(coin_ids),
+            "per_page": self.MARKETS_PAGE_SIZE,
+        }
+        try:
+            data: list = await self._get_json("/coins/markets", params)
+            logger.info(f"Fetched data for {len(data)} coins from CoinGecko API.")
+            return data
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+            logger.error(f"Error fetching coin markets from CoinGecko API: {e}")
+            raise
+
+    async def get_prices(self, coin_ids: list[str]) -> dict[str, dict]:
+        """
+        Fetch the USD price and its update time of many cryptocurrencies, up to
+        SIMPLE_PRICE_PAGE_SIZE ids per request, with the requests sent concurrently.
+
+        Ids without a price are left out of the result.
+        """
+        chunks: list[list[str]] = [
+            coin_ids[i : i + self.SIMPLE_PRICE_PAGE_SIZE]
+            for i in range(0, len(coin_ids), self.SIMPLE_PRICE_PAGE_SIZE)
+        ]
+        pages: list[dict] = await asyncio.gather(
+            *(self._get_simple_price_page(chunk) for chunk in chunks)
+        )
+        return {
+            id: price
+            for page in pages
+            for id, price in page.items()
+            if price.get("usd") is not None
+        }
+
+    async def _get_simple_price_page(self, coin_ids: list[str]) -> dict:
+        params: dict[str, str] = {
+            "ids": ",".join(coin_ids),
+            "vs_currencies": "usd",
+            "include_last_updated_at": "true",
+        }
+        try:
+            return await self._get_json("/simple/price", params)
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+            logger.error(f"Error fetching prices from CoinGecko API: {e}")
             return {}
 
-    def get_coin_list(self) -> list:
+    async def get_coin_list(self) -> list:
         """
         Fetch a list of all available cryptocurrencies from CoinGecko API.
         """
-        url: str = f"{self.BASE_URL}/coins/list"
         try:
-            response: requests.Response = self.session.get(url)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
+            return await self._get_json("/coins/list")
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
             logger.error(f"Error fetching coin list from CoinGecko API: {e}")
             return []
+
+
+class CoinGeckoSyncAPI:
+    """
+    Blocking wrapper around CoinGeckoAPI for scripts without an event loop.
+
+    Every call runs in an event loop of its own, so it gets its own HTTP client
+    and a scheduler limiting its rate locally: the shared scheduler keeps Redis
+    connections bound to the loop that first used them.
+    """
+
+    def get_coin_info(self, coin_id: str) -> dict:
+        return asyncio.run(self._call("get_coin_info", coin_id))
+
+    def get_coin_list(self) -> list:
+        return asyncio.run(self._call("get_coin_list"))
+
+    async def _call(self, method: str, *args) -> dict | list:
+        async with CoinGeckoAPI.create_client() as client:
+            api = CoinGeckoAPI(client, scheduler=RequestScheduler())
+            return await getattr(api, method)(*args)
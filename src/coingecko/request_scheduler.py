@@ -0,0 +1,198 @@
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from src.redis_cache.redis_cache import RedisCache
+from src.logger import logger
+
+
+class RequestScheduler:
+    """
+    Hand out permits for CoinGecko requests within a shared rate limit.
+
+    The budget is a token bucket in Redis, so all workers draw from the same
+    quota. Requests waiting in this worker are served by priority, interactive
+    lookups before background refreshes, and FIFO within a priority. A 429
+    pauses the bucket for every worker until its Retry-After has passed.
+    """
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+    PRIORITY_NAMES: dict[int, str] = {
+        INTERACTIVE: "interactive",
+        BACKGROUND: "background",
+    }
+    BUCKET_KEY = "rate-limit:coingecko"
+    _shared: "RequestScheduler | None" = None
+
+    def __init__(
+        self,
+        redis_cache: RedisCache | None = None,
+        requests_per_minute: float = float(
+            os.getenv("COINGECKO_REQUESTS_PER_MINUTE", 30)
+        ),
+        burst: int = int(os.getenv("COINGECKO_BURST", 5)),
+        max_retries: int = int(os.getenv("COINGECKO_MAX_RETRIES", 3)),
+        backoff_base: float = float(os.getenv("COINGECKO_BACKOFF_BASE", 1)),
+        backoff_max: float = float(os.getenv("COINGECKO_BACKOFF_MAX", 60)),
+    ):
+        self.redis_cache: RedisCache | None = redis_cache
+        self.rate: float = requests_per_minute / 60
+        self.burst: int = burst
+        self.max_retries: int = max_retries
+        self.backoff_base: float = backoff_base
+        self.backoff_max: float = backoff_max
+        # Entries are (priority, sequence, enqueued_at, future)
+        self._queue: list[tuple[int, int, float, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._dispatcher: asyncio.Task | None = None
+        # Local fallback for a 429 while Redis is unavailable
+        self._blocked_until: float = 0.0
+        self._granted: dict[int, int] = {
+            priority: 0 for priority in self.PRIORITY_NAMES
+        }
+        self._wait_total: dict[int, float] = {
+            priority: 0.0 for priority in self.PRIORITY_NAMES
+        }
+        self._wait_max: dict[int, float] = {
+            priority: 0.0 for priority in self.PRIORITY_NAMES
+        }
+        self.throttled: int = 0
+        self.rate_limited: int = 0
+        self.retries: int = 0
+
+    @classmethod
+    def get_shared(cls) -> "RequestScheduler":
+        """
+        Return the process-wide scheduler, creating it on first use.
+        """
+        if cls._shared is None:
+            cls._shared = cls(RedisCache())
+        return cls._shared
+
+    @property
+    def stats(self) -> dict[str, dict[str, float] | int]:
+        queued: dict[int, int] = {priority: 0 for priority in self.PRIORITY_NAMES}
+        for priority, _, _, future in self._queue:
+            if not future.done():
+                queued[priority] += 1
+        by_priority: dict[str, dict[str, float]] = {}
+        for priority, name in self.PRIORITY_NAMES.items():
+            granted: int = self._granted[priority]
+            by_priority[name] = {
+                "queued": queued[priority],
+                "granted": granted,
+                "wait_avg_ms": (
+                    round(self._wait_total[priority] / granted * 1000, 3)
+                    if granted
+                    else 0.0
+                ),
+                "wait_max_ms": round(self._wait_max[priority] * 1000, 3),
+            }
+        return {
+            **by_priority,
+            "throttled": self.throttled,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+        }
+
+    async def acquire(self, priority: int = INTERACTIVE) -> None:
+        """
+        Wait until a request of the given priority may be sent.
+        """
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._queue, (priority, next(self._sequence), time.monotonic(), future)
+        )
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+
+    async def _dispatch(self) -> None:
+        """
+        Grant queued requests one token at a time until the queue is empty.
+        """
+        while self._queue:
+            if self._queue[0][3].done():
+                # The waiter was cancelled
+                heapq.heappop(self._queue)
+                continue
+            wait: float = await self._take_token()
+            if wait:
+                self.throttled += 1
+                await asyncio.sleep(wait)
+                continue
+            # Higher priority requests may have arrived while taking the token
+            while self._queue:
+                priority, _, enqueued_at, future = heapq.heappop(self._queue)
+                if not future.done():
+                    waited: float = time.monotonic() - enqueued_at
+                    self._granted[priority] += 1
+                    self._wait_total[priority] += waited
+                    self._wait_max[priority] = max(self._wait_max[priority], waited)
+                    future.set_result(None)
+                    break
+
+    async def _take_token(self) -> float:
+        """
+        Take a token from the shared bucket, returning the seconds to wait if
+        none is available.
+        """
+        blocked: float = self._blocked_until - time.monotonic()
+        if blocked > 0:
+            return blocked
+        if self.redis_cache is None or self.rate <= 0:
+            return 0.0
+        wait_ms: int = await self.redis_cache.take_token(
+            self.BUCKET_KEY, self.rate, self.burst
+        )
+        return wait_ms / 1000
+
+    async def rate_limit_hit(self, retry_after: float) -> None:
+        """
+        Pause all requests, in every worker, for `retry_after` seconds.
+        """
+        self.rate_limited += 1
+        self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+        if self.redis_cache is not None:
+            await self.redis_cache.block_bucket(
+                self.BUCKET_KEY, int(retry_after * 1000)
+            )
+
+    def retry_delay(self, attempt: int, retry_after: str | None = None) -> float:
+        """
+        Seconds to wait before retrying a failed request.
+
+        Uses the upstream Retry-After header when present, otherwise exponential
+        backoff with full jitter so retries from many callers spread out.
+        """
+        self.retries += 1
+        delay: float | None = self.parse_retry_after(retry_after)
+        if delay is not None:
+            # A little jitter keeps the workers from retrying in lockstep
+            return min(delay, self.backoff_max) + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    @staticmethod
+    def parse_retry_after(value: str | None) -> float | None:
+        """
+        Parse a Retry-After header given either in seconds or as an HTTP date.
+        """
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at: datetime = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring invalid Retry-After header: {value}")
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -1,17 +1,47 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-import subprocess
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from collections.abc import Callable
 import time
 import os
 import asyncio
 import asyncpg
 from dotenv import load_dotenv
+from src.database_utils.slow_query_log import SlowQueryLog
 from src.logger import logger
 
 load_dotenv()
 
 
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that records how long callers wait to acquire a connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.acquire_count: int = 0
+        self.acquire_wait_total: float = 0.0
+        self.acquire_wait_max: float = 0.0
+        # Called with every wait, set when the engine is instrumented
+        self.on_wait: Callable[[float], None] | None = None
+
+    def connect(self):
+        start: float = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            waited: float = time.perf_counter() - start
+            self.acquire_count += 1
+            self.acquire_wait_total += waited
+            self.acquire_wait_max = max(self.acquire_wait_max, waited)
+            if self.on_wait is not None:
+                self.on_wait(waited)
+
+
 class DatabaseConnection:
+    _shared: "DatabaseConnection | None" = None
+
     def __init__(self):
         """Initialize the database manager, ensuring all required environment variables are set."""
         self.user: str = self._get_env_variable("POSTGRES_USER")
@@ -22,10 +52,65 @@ class DatabaseConnection:
         self.database_url: str = (
             f"postgresql+asyncpg://{self.user}:{self.password}@{self.host}:{self.port}/{self.dbname}"
         )
-        self.engine = create_async_engine(self.database_url, echo=True)
+        self.engine = create_async_engine(
+            self.database_url,
+            poolclass=TimedAsyncQueuePool,
+            pool_size=int(os.getenv("DB_POOL_SIZE", 5)),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", 10)),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", 30)),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", 1800)),
+            pool_pre_ping=os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+        )
         self.async_session: sessionmaker = sessionmaker(
             self.engine, expire_on_commit=False, class_=AsyncSession
         )
+        self.slow_query_log: SlowQueryLog = SlowQueryLog()
+        self.slow_query_log.instrument(self.engine)
+
+    @classmethod
+    def get_shared(cls) -> "DatabaseConnection":
+        """
+        Return the process-wide connection, creating its engine on first use.
+        """
+        if cls._shared is None:
+            # main.py imports this module at the top, while src.metrics loads
+            # FastAPI and prometheus_client, which it defers to create_app
+            from src.metrics import instrument_engine
+
+            cls._shared = cls()
+            pool: TimedAsyncQueuePool = cls._shared.engine.pool
+            instrument_engine(cls._shared.engine, pool.size() + pool._max_overflow)
+            logger.info("Created shared database engine")
+        return cls._shared
+
+    @classmethod
+    async def close_shared(cls) -> None:
+        """
+        Dispose the process-wide engine and close all pooled connections.
+        """
+        if cls._shared is None:
+            return
+        await cls._shared.engine.dispose()
+        cls._shared = None
+        logger.info("Disposed shared database engine")
+
+    def pool_status(self) -> dict[str, int | float]:
+        """
+        Return a snapshot of the connection pool usage.
+        """
+        pool: TimedAsyncQueuePool = self.engine.pool
+        acquire_count: int = pool.acquire_count
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "acquire_count": acquire_count,
+            "acquire_wait_avg_ms": (
+                pool.acquire_wait_total / acquire_count * 1000 if acquire_count else 0.0
+            ),
+            "acquire_wait_max_ms": pool.acquire_wait_max * 1000,
+        }
 
     def _get_env_variable(self, var_name: str) -> str:
         """Retrieve an environment variable, raising an error if it is not set."""
@@ -93,22 +178,36 @@ class DatabaseConnection:
             logger.error(f"Error terminating connections to database '{db_name}': {e}")
             raise
 
-    async def wait_for_postgres(self, timeout: int, delay: int = 5) -> bool:
-        start_time: float = time.time()
+    async def wait_for_postgres(
+        self,
+        timeout: float,
+        db_name: str = "postgres",
+        initial_delay: float = 0.1,
+        max_delay: float = 2.0,
+    ) -> bool:
+        """
+        Wait until PostgreSQL accepts a connection to `db_name`, retrying with
+        exponential backoff between `initial_delay` and `max_delay` seconds.
+        """
+        deadline: float = time.monotonic() + timeout
+        delay: float = initial_delay
         logger.info(f"Waiting for PostgreSQL server at {self.host}:{self.port}...")
-        while time.time() - start_time < timeout:
-            if (
-                subprocess.run(
-                    ["nc", "-zv", self.host, self.port],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                ).returncode
-                == 0
-            ):
+        while True:
+            remaining: float = deadline - time.monotonic()
+            try:
+                conn = await asyncio.wait_for(
+                    self.create_direct_connection(db_name), max(remaining, 0.1)
+                )
+                await conn.close()
                 logger.info("PostgreSQL server is up!")
                 return True
-            await asyncio.sleep(delay)
-        logger.error(
-            f"PostgreSQL server did not become available after {timeout} seconds."
-        )
-        return False
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as e:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.error(
+                        f"PostgreSQL server did not become available after {timeout} seconds: {e}"
+                    )
+                    return False
+                logger.debug(f"PostgreSQL server not ready yet: {e}")
+                await asyncio.sleep(min(delay, remaining))
+                delay = min(delay * 2, max_delay)
@@ -0,0 +1,123 @@
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src.logger import logger
+
+# Literals and bind parameters, replaced by ? in fingerprints
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND_PARAMETER = re.compile(r"\$\d+|%\([^)]*\)s|(?<!:):\w+")
+# IN (?, ?, ?) and multi-row VALUES differ only by how many coins they touch
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:::\w+)?(?:\s*,\s*\?(?:::\w+)?)*\s*\)")
+_REPEATED_ROWS = re.compile(r"(\([^()]*\))(?:\s*,\s*\([^()]*\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class SlowQueryLog:
+    """
+    Record the SQL statements slower than a threshold, grouped by fingerprint.
+
+    Statements are timed by cursor events, and only the slow ones are
+    normalized and logged, so fast queries cost two clock reads. Statements
+    differing only by literals, bind parameters or list lengths share a
+    fingerprint. The most recently seen `max_fingerprints` are kept.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 100)),
+        max_fingerprints: int = int(os.getenv("SLOW_QUERY_MAX_FINGERPRINTS", 500)),
+    ):
+        self.threshold: float = threshold_ms / 1000
+        self.max_fingerprints: int = max_fingerprints
+        self._queries: OrderedDict[str, dict] = OrderedDict()
+        self.stats: dict[str, int] = {"recorded": 0, "evicted": 0}
+
+    @staticmethod
+    def normalize(statement: str) -> str:
+        """
+        Return the statement with literals and parameters replaced by ?.
+        """
+        statement = _STRING_LITERAL.sub("?", statement)
+        statement = _BIND_PARAMETER.sub("?", statement)
+        statement = _NUMBER_LITERAL.sub("?", statement)
+        statement = _PLACEHOLDER_LIST.sub("(...)", statement)
+        statement = _REPEATED_ROWS.sub(r"\1, ...", statement)
+        return _WHITESPACE.sub(" ", statement).strip()
+
+    @staticmethod
+    def fingerprint(normalized: str) -> str:
+        return hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()
+
+    def record(self, statement: str, seconds: float) -> None:
+        """
+        Count a statement that took `seconds`, if it is slow.
+        """
+        if seconds < self.threshold:
+            return
+        normalized: str = self.normalize(statement)
+        fingerprint: str = self.fingerprint(normalized)
+        duration_ms: float = seconds * 1000
+        query: dict | None = self._queries.get(fingerprint)
+        if query is None:
+            query = self._queries[fingerprint] = {
+                "fingerprint": fingerprint,
+                "statement": normalized,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+            }
+            if len(self._queries) > self.max_fingerprints:
+                self._queries.popitem(last=False)
+                self.stats["evicted"] += 1
+        else:
+            self._queries.move_to_end(fingerprint)
+        query["count"] += 1
+        query["total_ms"] += duration_ms
+        query["max_ms"] = max(query["max_ms"], duration_ms)
+        query["last_ms"] = duration_ms
+        query["last_seen"] = time.time()
+        self.stats["recorded"] += 1
+        logger.warning(
+            f"Slow query {fingerprint} took {duration_ms:.1f} ms: {normalized[:500]}"
+        )
+
+    def top(self, limit: int = 20) -> list[dict]:
+        """
+        Return the slow query fingerprints with the most total time first.
+        """
+        queries: list[dict] = sorted(
+            self._queries.values(), key=lambda query: query["total_ms"], reverse=True
+        )
+        return [
+            {**query, "mean_ms": query["total_ms"] / query["count"]}
+            for query in queries[:limit]
+        ]
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        context._slow_query_started_at = time.perf_counter()
+
+    def _after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        self.record(statement, time.perf_counter() - context._slow_query_started_at)
+
+    def instrument(self, engine: AsyncEngine) -> None:
+        """
+        Time every statement executed by the engine.
+        """
+        event.listen(
+            engine.sync_engine, "before_cursor_execute", self._before_cursor_execute
+        )
+        event.listen(
+            engine.sync_engine, "after_cursor_execute", self._after_cursor_execute
+        )
@@ -8,7 +8,7 @@ from src.logger import logger
 
 # Závislost pro získání databázové relace
 async def get_db() -> AsyncSession:
-    db_connection = DatabaseConnection()
+    db_connection: DatabaseConnection = DatabaseConnection.get_shared()
     async with db_connection.async_session() as session:
         yield session
 
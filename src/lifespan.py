@@ -0,0 +1,70 @@
+import asyncio
+import os
+from collections.abc import Coroutine
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from src.database_utils.connection import DatabaseConnection
+from src.redis_cache.redis_cache import RedisCache
+from src.coingecko.coingecko_coins_api import CoinGeckoAPI
+from src.api.routes.coin_routes import (
+    coin_refresh_queue,
+    live_price_broadcaster,
+    periodic_updater,
+    price_ingestion_service,
+)
+from src.boot import BootTimer, warm_up_pools
+from src.metrics import mark_worker_stopped
+from src.services.leader_election import LeaderElection
+from src.logger import logger
+
+leader_election = LeaderElection(RedisCache().client)
+
+
+def leader_jobs() -> list[Coroutine]:
+    """
+    Background jobs that must run in a single worker.
+    """
+    jobs: list[Coroutine] = [coin_refresh_queue.consume()]
+    if price_ingestion_service.interval > 0:
+        jobs.append(price_ingestion_service.periodic_task())
+        jobs.append(price_ingestion_service.history.maintenance_task())
+    if periodic_updater.interval > 0:
+        jobs.append(periodic_updater.periodic_task())
+    return jobs
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create the shared resources of a worker on startup and release them on shutdown.
+    """
+    DatabaseConnection.get_shared()
+    if os.getenv("WARM_UP_POOLS", "true").lower() == "true":
+        await warm_up_pools()
+    invalidation_listener: asyncio.Task = asyncio.create_task(
+        RedisCache().listen_for_invalidations()
+    )
+    background_tasks: list[asyncio.Task] = [
+        invalidation_listener,
+        asyncio.create_task(live_price_broadcaster.listen()),
+        # Every worker follows the coin list refreshed by the leader
+        asyncio.create_task(periodic_updater.search_index_sync_task()),
+    ]
+    leader_election.start(leader_jobs)
+    logger.info("Application startup complete")
+    BootTimer.mark_ready()
+    try:
+        yield
+    finally:
+        await price_ingestion_service.stop()
+        await price_ingestion_service.history.stop()
+        await periodic_updater.stop()
+        await leader_election.stop()
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+        await DatabaseConnection.close_shared()
+        await RedisCache.close_pools()
+        await CoinGeckoAPI.close_shared_client()
+        mark_worker_stopped()
+        logger.info("Application shutdown complete")
@@ -0,0 +1,252 @@
+import os
+import time
+import redis.asyncio as aioredis
+from redis.asyncio.client import Pipeline
+from fastapi.routing import APIRoute
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# With several workers, set PROMETHEUS_MULTIPROC_DIR to an empty directory
+# before the start so /metrics of any worker reports the sum of all of them
+MULTIPROCESS: bool = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+# Redis and most queries answer in well under the default 5 ms bucket
+FAST_BUCKETS: tuple[float, ...] = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "cointrack_http_request_duration_seconds",
+    "Time to answer a request, until its last body chunk was sent",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "cointrack_http_requests_in_flight",
+    "Requests being answered",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+DB_QUERY_DURATION = Histogram(
+    "cointrack_db_query_duration_seconds",
+    "Time to execute a SQL statement, by its first keyword",
+    ["operation"],
+    buckets=FAST_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "cointrack_db_pool_checked_out_connections",
+    "Database connections checked out of the pool",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CAPACITY = Gauge(
+    "cointrack_db_pool_capacity_connections",
+    "Most connections the pool opens, pool size plus overflow",
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = Histogram(
+    "cointrack_db_pool_wait_seconds",
+    "Time to acquire a connection from the pool",
+    buckets=FAST_BUCKETS,
+)
+REDIS_COMMAND_DURATION = Histogram(
+    "cointrack_redis_command_duration_seconds",
+    "Round trip of a Redis command or pipeline",
+    ["command"],
+    buckets=FAST_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    "cointrack_cache_lookups_total",
+    "Coin and response cache lookups by cache layer",
+    ["cache", "result"],
+)
+COINGECKO_REQUEST_DURATION = Histogram(
+    "cointrack_coingecko_request_duration_seconds",
+    "Round trip of a CoinGecko request",
+    ["endpoint"],
+)
+COINGECKO_RESPONSES = Counter(
+    "cointrack_coingecko_responses_total",
+    "CoinGecko responses by status code",
+    ["endpoint", "status"],
+)
+COINGECKO_RATE_LIMITED = Counter(
+    "cointrack_coingecko_rate_limited_total",
+    "CoinGecko responses with status 429",
+)
+COIN_REFRESH_DURATION = Histogram(
+    "cointrack_coin_refresh_duration_seconds",
+    "Duration of a coin data refresh run",
+    ["result"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+COIN_REFRESH_COINS = Counter(
+    "cointrack_coin_refresh_coins_total",
+    "Coins added, modified, removed and written by coin data refreshes",
+    ["change"],
+)
+COIN_LIST_SIZE = Gauge(
+    "cointrack_coin_list_coins",
+    "Coins in the last applied coin list",
+    multiprocess_mode="mostrecent",
+)
+
+
+class MetricsRoute(APIRoute):
+    """
+    API route recording the latency and in-flight count of its requests under
+    its path template, so /coins/{coin_id} is one series for all coins.
+
+    Only routes are instrumented, the template being known without matching
+    the path again. The labelled series are looked up once per method and
+    status and then reused.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._in_flight: dict[str, Gauge] = {}
+        self._durations: dict[tuple[str, int], Histogram] = {}
+
+    async def handle(self, scope, receive, send):
+        method: str = scope["method"]
+        in_flight = self._in_flight.get(method)
+        if in_flight is None:
+            in_flight = self._in_flight[method] = HTTP_REQUESTS_IN_FLIGHT.labels(
+                method, self.path_format
+            )
+        status_code: int = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        start: float = time.perf_counter()
+        try:
+            await super().handle(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            duration = self._durations.get((method, status_code))
+            if duration is None:
+                duration = self._durations[(method, status_code)] = (
+                    HTTP_REQUEST_DURATION.labels(
+                        method, self.path_format, str(status_code)
+                    )
+                )
+            duration.observe(time.perf_counter() - start)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    words: list[str] = statement.lstrip()[:16].split(None, 1)
+    operation: str = words[0].upper() if words else "EMPTY"
+    DB_QUERY_DURATION.labels(operation).observe(
+        time.perf_counter() - context._query_started_at
+    )
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_POOL_CHECKED_OUT.inc()
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    DB_POOL_CHECKED_OUT.dec()
+
+
+def instrument_engine(engine: AsyncEngine, capacity: int) -> None:
+    """
+    Record the query times and pool usage of the engine serving requests,
+    whose pool opens up to `capacity` connections.
+    """
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine.pool, "checkout", _on_checkout)
+    event.listen(engine.sync_engine.pool, "checkin", _on_checkin)
+    if hasattr(engine.sync_engine.pool, "on_wait"):
+        engine.sync_engine.pool.on_wait = DB_POOL_WAIT.observe
+    DB_POOL_CAPACITY.set(capacity)
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        start: float = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            REDIS_COMMAND_DURATION.labels(
+                "MULTI" if self.is_transaction else "PIPELINE"
+            ).observe(time.perf_counter() - start)
+
+
+class InstrumentedRedis(aioredis.Redis):
+    """
+    Redis client recording the round trip of every command, script call and
+    pipeline.
+    """
+
+    _durations: dict[str, Histogram] = {}
+
+    async def execute_command(self, *args, **options):
+        start: float = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            command: str = args[0]
+            duration = self._durations.get(command)
+            if duration is None:
+                duration = self._durations[command] = REDIS_COMMAND_DURATION.labels(
+                    command
+                )
+            duration.observe(time.perf_counter() - start)
+
+    def pipeline(
+        self, transaction: bool = True, shard_hint: str | None = None
+    ) -> InstrumentedPipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    Return the metrics in the Prometheus text format and their content type.
+    """
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_stopped() -> None:
+    """
+    Drop the live gauges of this worker from the multiprocess metrics.
+    """
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
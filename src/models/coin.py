@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Float, String
+from sqlalchemy import Column, DateTime, Float, Index, String, func
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -10,3 +10,15 @@ class Coin(Base):
     symbol: str = Column(String, unique=True, nullable=False)
     name: str = Column(String, nullable=False)
     target_price: float = Column(Float, nullable=True)
+    # Last USD price written by the price ingestion service
+    current_price: float = Column(Float, nullable=True)
+    price_updated_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Serves case-insensitive name prefix filters (LIKE 'abc%')
+        Index(
+            "ix_coin_name_lower",
+            func.lower(name).label("name_lower"),
+            postgresql_ops={"name_lower": "text_pattern_ops"},
+        ),
+    )
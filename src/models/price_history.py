@@ -0,0 +1,46 @@
+from sqlalchemy import Column, DateTime, Float, String, Table, func
+from src.models.coin import Base
+
+# Partitioned tables, created by migration 0002; mapped as tables because the
+# raw ticks have no primary key
+
+price_history = Table(
+    "price_history",
+    Base.metadata,
+    Column("coin_id", String, nullable=False),
+    Column("ts", DateTime(timezone=True), nullable=False),
+    Column("price", Float, nullable=False),
+    # Set by Postgres, the rollups pick up ticks by when they were recorded
+    Column(
+        "recorded_at",
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    ),
+)
+
+# Ticks recorded before `recorded_at` are rolled up, created by migration 0003
+price_rollup_watermark = Table(
+    "price_rollup_watermark",
+    Base.metadata,
+    Column("name", String, primary_key=True),
+    Column("recorded_at", DateTime(timezone=True), nullable=False),
+)
+
+
+def ohlc_table(name: str) -> Table:
+    return Table(
+        name,
+        Base.metadata,
+        Column("coin_id", String, primary_key=True),
+        Column("bucket", DateTime(timezone=True), primary_key=True),
+        Column("open", Float, nullable=False),
+        Column("high", Float, nullable=False),
+        Column("low", Float, nullable=False),
+        Column("close", Float, nullable=False),
+    )
+
+
+price_ohlc_1m = ohlc_table("price_ohlc_1m")
+price_ohlc_1h = ohlc_table("price_ohlc_1h")
+price_ohlc_1d = ohlc_table("price_ohlc_1d")
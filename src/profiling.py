@@ -0,0 +1,196 @@
+import functools
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from types import CodeType, FrameType
+from src.logger import logger
+from src.redis_cache.redis_cache import RedisCache
+
+PROFILE_HEADER: bytes = b"x-profile"
+PROFILE_ID_HEADER: bytes = b"x-profile-id"
+
+
+@functools.lru_cache(maxsize=4096)
+def frame_label(code: CodeType) -> str:
+    """
+    Name a function in a folded stack, by qualified name and where it starts.
+    """
+    filename: str = code.co_filename
+    for marker in ("site-packages" + os.sep, os.getcwd() + os.sep):
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+            break
+    # ; separates the frames of a folded stack
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class StackSampler:
+    """
+    Sample the stack of one coroutine from a thread, every `interval` seconds.
+
+    While the coroutine runs, its frames are read from the event loop thread.
+    While it is suspended, its chain of awaited coroutines is followed down to
+    what it waits for, so time spent waiting on the database or Redis shows up
+    too. Stacks are counted in the folded format flame graph tools read.
+    """
+
+    def __init__(self, coro, interval: float):
+        self.coro = coro
+        self.interval: float = interval
+        self.loop_thread_id: int = threading.get_ident()
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            stack: tuple[str, ...] | None = self.sample()
+            if stack:
+                self.samples[stack] += 1
+
+    def sample(self) -> tuple[str, ...] | None:
+        root: FrameType | None = self.coro.cr_frame
+        if root is None:
+            return None
+        frame: FrameType | None = sys._current_frames().get(self.loop_thread_id)
+        if self.coro.cr_running:
+            running: list[str] = []
+            while frame is not None:
+                running.append(frame_label(frame.f_code))
+                if frame is root:
+                    return tuple(reversed(running))
+                frame = frame.f_back
+        # Suspended, or resumed between the two reads above
+        suspended: list[str] = []
+        awaited = self.coro
+        while True:
+            frame = getattr(awaited, "cr_frame", None) or getattr(
+                awaited, "ag_frame", None
+            )
+            if frame is None:
+                break
+            suspended.append(frame_label(frame.f_code))
+            awaited = getattr(awaited, "cr_await", None) or getattr(
+                awaited, "ag_await", None
+            )
+        if awaited is not None:
+            suspended.append(f"[awaiting {type(awaited).__name__}]")
+        return tuple(suspended)
+
+    def folded(self) -> str:
+        """
+        Return the samples as one `frame;frame;frame count` line per stack.
+        """
+        return "".join(
+            f"{';'.join(stack)} {count}\n"
+            for stack, count in self.samples.most_common()
+        )
+
+
+class RequestProfiler:
+    """
+    ASGI middleware capturing a sampled stack profile of selected requests.
+
+    When enabled, requests sent with an `X-Profile` header, and a random
+    `sample_rate` share of all others, are profiled. The profile is stored in
+    Redis for `ttl` seconds in the folded flame graph format and its id is
+    returned in the `X-Profile-Id` response header. Other requests are passed
+    through untouched.
+    """
+
+    stats: dict[str, int] = {"profiled": 0, "samples": 0}
+
+    def __init__(
+        self,
+        app,
+        enabled: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true",
+        sample_rate: float = float(os.getenv("PROFILE_SAMPLE_RATE", 0)),
+        interval_ms: float = float(os.getenv("PROFILE_INTERVAL_MS", 5)),
+        ttl: int = int(os.getenv("PROFILE_TTL", 3600)),
+    ):
+        self.app = app
+        self.enabled: bool = enabled
+        self.sample_rate: float = sample_rate
+        self.interval: float = interval_ms / 1000
+        self.ttl: int = ttl
+
+    def _selected(self, scope) -> bool:
+        if scope["type"] != "http":
+            return False
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        return any(name == PROFILE_HEADER for name, _ in scope["headers"])
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or not self._selected(scope):
+            return await self.app(scope, receive, send)
+
+        profile_id: str = uuid.uuid4().hex
+        status_code: int = 500
+
+        async def send_with_profile_id(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (PROFILE_ID_HEADER, profile_id.encode()),
+                    ],
+                }
+            await send(message)
+
+        coro = self.app(scope, receive, send_with_profile_id)
+        sampler = StackSampler(coro, self.interval)
+        start: float = time.perf_counter()
+        sampler.start()
+        try:
+            await coro
+        finally:
+            sampler.stop()
+            duration_ms: float = (time.perf_counter() - start) * 1000
+            await self._store(
+                profile_id,
+                sampler,
+                {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "duration_ms": round(duration_ms, 3),
+                },
+            )
+
+    async def _store(self, profile_id: str, sampler: StackSampler, info: dict) -> None:
+        samples: int = sampler.samples.total()
+        self.stats["profiled"] += 1
+        self.stats["samples"] += samples
+        await RedisCache().set_profile(
+            profile_id,
+            sampler.folded(),
+            {
+                "id": profile_id,
+                **info,
+                "samples": samples,
+                "interval_ms": self.interval * 1000,
+                "created_at": time.time(),
+            },
+            self.ttl,
+        )
+        logger.info(
+            f"Profiled {info['method']} {info['path']} in {info['duration_ms']} ms "
+            f"with {samples} samples as {profile_id}"
+        )
@@ -0,0 +1,66 @@
+import time
+from collections import OrderedDict
+
+
+class LocalCache:
+    """
+    Bounded in-process LRU cache whose entries expire after a fixed TTL.
+
+    Every invalidation bumps `generation`; values read from Redis are only stored
+    if no invalidation happened since the read started, so a concurrent update
+    can never be overwritten by the stale value it invalidated.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries: int = max_entries
+        self.ttl: float = ttl
+        self.generation: int = 0
+        self._entries: OrderedDict[str, tuple[float, dict[str, str]]] = OrderedDict()
+        self.stats: dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> dict[str, str] | None:
+        entry: tuple[float, dict[str, str]] | None = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return dict(value)
+
+    def put(self, key: str, value: dict[str, str], generation: int) -> None:
+        """
+        Store a value read while the cache was at `generation`.
+        """
+        if generation != self.generation or not self.max_entries:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, dict(value))
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def invalidate(self, keys: list[str]) -> None:
+        self.generation += 1
+        self.stats["invalidations"] += len(keys)
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self.stats["invalidations"] += len(self._entries)
+        self._entries.clear()
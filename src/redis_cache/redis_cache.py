@@ -1,66 +1,596 @@
+import asyncio
 import redis
+import redis.asyncio as aioredis
+import orjson
 import os
+import time
 from dotenv import load_dotenv
+from src.redis_cache.local_cache import LocalCache
+from src.metrics import CACHE_LOOKUPS, InstrumentedRedis
 from src.logger import logger
 
 load_dotenv()
 
+LOCAL_CACHE_HITS = CACHE_LOOKUPS.labels("local", "hit")
+LOCAL_CACHE_MISSES = CACHE_LOOKUPS.labels("local", "miss")
+REDIS_CACHE_HITS = CACHE_LOOKUPS.labels("redis", "hit")
+REDIS_CACHE_MISSES = CACHE_LOOKUPS.labels("redis", "miss")
+
+
+RELEASE_LOCK_SCRIPT: str = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Token bucket refilled at ARGV[1] tokens per second up to ARGV[2] tokens, using
+# the Redis clock so all workers agree. Returns 0 when a token was taken,
+# otherwise the milliseconds to wait before trying again.
+TAKE_TOKEN_SCRIPT: str = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at', 'blocked_until')
+local blocked_until = tonumber(state[3]) or 0
+if blocked_until > now then
+    return blocked_until - now
+end
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - updated_at) * rate / 1000)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + 1000)
+return wait
+"""
+
+# Stop handing out tokens of a bucket for ARGV[1] milliseconds
+BLOCK_BUCKET_SCRIPT: str = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local blocked_until = now + tonumber(ARGV[1])
+local current = tonumber(redis.call('HGET', KEYS[1], 'blocked_until')) or 0
+if blocked_until > current then
+    redis.call('HSET', KEYS[1], 'blocked_until', blocked_until)
+end
+if redis.call('PTTL', KEYS[1]) < tonumber(ARGV[1]) then
+    redis.call('PEXPIRE', KEYS[1], tonumber(ARGV[1]))
+end
+return 1
+"""
+
+# Add the alerts in ARGV[3..] to the stream KEYS[1], skipping those whose dedup
+# key KEYS[i] (matching ARGV[i + 1]) is already set. Dedup keys expire after
+# ARGV[1] seconds and the stream is trimmed to about ARGV[2] entries. Returns
+# the number of alerts added.
+ADD_ALERTS_SCRIPT: str = """
+local added = 0
+for i = 2, #KEYS do
+    if redis.call('SET', KEYS[i], 1, 'NX', 'EX', ARGV[1]) then
+        redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[2], '*', 'alert', ARGV[i + 1])
+        added = added + 1
+    end
+end
+return added
+"""
+
 
 class RedisCache:
+    # Fingerprints of the last coin list applied to the cache
+    COIN_LIST_FINGERPRINTS_KEY = "coin-list:fingerprints"
+    COIN_LIST_DIGEST_KEY = "coin-list:digest"
+    # Coin list the search index is built from, shared by all workers
+    COIN_LIST_SNAPSHOT_KEY = "coin-list:snapshot"
+    COIN_LIST_SNAPSHOT_DIGEST_KEY = "coin-list:snapshot-digest"
+    # Hash of the current price of every tracked coin, by coin id
+    COIN_PRICES_KEY = "coin-prices"
+    # Stream of target price alerts and prefix of their dedup keys
+    ALERTS_STREAM_KEY = "alerts:target-price"
+    ALERT_DEDUP_PREFIX = "alerts:sent:"
+    # Alerts added per script call, to keep each call short
+    ALERTS_BATCH_SIZE = 500
+    # Prefix of the stored request profiles and the list of the latest ones
+    PROFILES_PREFIX = "profiles:"
+    PROFILES_RECENT_KEY = "profiles:recent"
+    PROFILES_RECENT_MAX = 100
+    _pools: dict[tuple[str, int, int], aioredis.ConnectionPool] = {}
+    _local_caches: dict[tuple[str, int, int], LocalCache] = {}
+
     def __init__(self, db_index: int = int(os.getenv("REDIS_DB", 0))):
         host: str = os.getenv("REDIS_HOST", "localhost")
         port: int = int(os.getenv("REDIS_PORT", 6379))
         db: int = db_index
-        self.client = redis.Redis(host=host, port=port, db=db)
+        self.client = InstrumentedRedis(connection_pool=self._get_pool(host, port, db))
+        self.local_cache: LocalCache = self._get_local_cache(host, port, db)
+        self.invalidation_channel: str = f"cointrack:coin-cache-invalidation:{db}"
+        self.price_updates_channel: str = f"cointrack:coin-prices:{db}"
+        self._release_lock_script = self.client.register_script(RELEASE_LOCK_SCRIPT)
+        self._take_token_script = self.client.register_script(TAKE_TOKEN_SCRIPT)
+        self._block_bucket_script = self.client.register_script(BLOCK_BUCKET_SCRIPT)
+        self._add_alerts_script = self.client.register_script(ADD_ALERTS_SCRIPT)
+
+    @classmethod
+    def _get_pool(cls, host: str, port: int, db: int) -> aioredis.ConnectionPool:
+        """
+        Return the connection pool shared by all caches pointing at the same database.
+        """
+        key: tuple[str, int, int] = (host, port, db)
+        if key not in cls._pools:
+            cls._pools[key] = aioredis.ConnectionPool(
+                host=host,
+                port=port,
+                db=db,
+                max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", 50)),
+                decode_responses=True,
+            )
+        return cls._pools[key]
 
-    def clear_cache(self) -> None:
+    @classmethod
+    def _get_local_cache(cls, host: str, port: int, db: int) -> LocalCache:
+        """
+        Return the in-process coin cache shared by all caches of the same database.
+        """
+        key: tuple[str, int, int] = (host, port, db)
+        if key not in cls._local_caches:
+            cls._local_caches[key] = LocalCache(
+                max_entries=int(os.getenv("L1_CACHE_MAX_ENTRIES", 10000)),
+                ttl=float(os.getenv("L1_CACHE_TTL", 60)),
+            )
+        return cls._local_caches[key]
+
+    @classmethod
+    async def close_pools(cls) -> None:
+        """
+        Disconnect all shared connection pools.
+        """
+        pools: list[aioredis.ConnectionPool] = list(cls._pools.values())
+        cls._pools.clear()
+        for pool in pools:
+            await pool.disconnect()
+        logger.info("Closed shared Redis connection pools")
+
+    async def clear_cache(self) -> None:
         """
         Clear the entire Redis cache.
         """
+        self.local_cache.clear()
         try:
-            self.client.flushdb()
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.flushdb()
+                pipe.publish(self.invalidation_channel, "*")
+                await pipe.execute()
             logger.info("Cleared the entire Redis cache")
         except redis.RedisError as e:
             logger.error(f"Error clearing the Redis cache: {e}")
 
-    def set_coin_cache(self, id: str, symbol: str, name: str) -> None:
+    async def set_coin_cache(self, id: str, symbol: str, name: str) -> None:
         """
         Set a value in the Redis hash.
         """
+        self.local_cache.invalidate([id])
         try:
             value: dict[str, str] = {"symbol": symbol, "name": name}
-            self.client.hset(id, mapping=value)
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.hset(id, mapping=value)
+                pipe.publish(self.invalidation_channel, orjson.dumps([id]))
+                await pipe.execute()
             logger.info(f"Set cache for id: {id}")
         except redis.RedisError as e:
             logger.error(f"Error setting cache for id {id}: {e}")
 
-    def get_coin_from_cache(self, id: str) -> dict[str, str]:
+    async def get_coin_from_cache(self, id: str) -> dict[str, str]:
         """
-        Get all data for a given coin ID from the Redis hash.
+        Get all data for a given coin ID, from the local cache or the Redis hash.
         """
+        local_data: dict[str, str] | None = self.local_cache.get(id)
+        if local_data is not None:
+            LOCAL_CACHE_HITS.inc()
+            return local_data
+        LOCAL_CACHE_MISSES.inc()
+        generation: int = self.local_cache.generation
         try:
-            data: dict[str, str] | None = self.is_coin_in_cache(id)
+            data: dict[str, str] | None = await self.is_coin_in_cache(id)
             if data:
+                REDIS_CACHE_HITS.inc()
+                self.local_cache.put(id, data, generation)
                 return data
             else:
+                REDIS_CACHE_MISSES.inc()
                 return {}
         except redis.RedisError as e:
             logger.error(f"Error retrieving cache for id {id}: {e}")
             return {}
 
-    def is_coin_in_cache(self, id: str) -> dict[str, str] | None:
+    async def is_coin_in_cache(self, id: str) -> dict[str, str] | None:
         """
         Check if a coin with a specific ID is in the cache.
         """
         try:
-            data = self.client.hgetall(id)
-            if data:
-                return {
-                    key.decode("utf-8"): value.decode("utf-8")
-                    for key, value in data.items()
-                }
-            else:
-                return None
+            data: dict[str, str] = await self.client.hgetall(id)
+            return data or None
         except redis.RedisError as e:
             logger.error(f"Error retrieving cache for id {id}: {e}")
             return None
+
+    async def set_coins_cache(self, coins: list[dict[str, str]]) -> int:
+        """
+        Store many coins with a single pipelined round trip.
+
+        Returns the number of coins written.
+        """
+        valid_coins: list[dict[str, str]] = [
+            coin
+            for coin in coins
+            if coin.get("id") and coin.get("symbol") and coin.get("name")
+        ]
+        if not valid_coins:
+            return 0
+        ids: list[str] = [coin["id"] for coin in valid_coins]
+        self.local_cache.invalidate(ids)
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for coin in valid_coins:
+                    pipe.hset(
+                        coin["id"],
+                        mapping={"symbol": coin["symbol"], "name": coin["name"]},
+                    )
+                pipe.publish(self.invalidation_channel, orjson.dumps(ids))
+                await pipe.execute()
+            return len(valid_coins)
+        except redis.RedisError as e:
+            logger.error(f"Error setting cache for {len(valid_coins)} coins: {e}")
+            return 0
+
+    async def get_coins_from_cache(self, ids: list[str]) -> dict[str, dict[str, str]]:
+        """
+        Get the cached data of many coins, reading local misses from Redis with a
+        single pipelined round trip.
+
+        Coins missing from the cache are left out of the result.
+        """
+        found: dict[str, dict[str, str]] = {}
+        missing: list[str] = []
+        for id in ids:
+            local_data: dict[str, str] | None = self.local_cache.get(id)
+            if local_data is None:
+                missing.append(id)
+            else:
+                found[id] = local_data
+        LOCAL_CACHE_HITS.inc(len(found))
+        LOCAL_CACHE_MISSES.inc(len(missing))
+        if not missing:
+            return found
+        generation: int = self.local_cache.generation
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for id in missing:
+                    pipe.hgetall(id)
+                results: list[dict[str, str]] = await pipe.execute()
+        except redis.RedisError as e:
+            logger.error(f"Error retrieving cache for {len(missing)} coins: {e}")
+            return found
+        hits: int = 0
+        for id, data in zip(missing, results):
+            if data:
+                self.local_cache.put(id, data, generation)
+                found[id] = data
+                hits += 1
+        REDIS_CACHE_HITS.inc(hits)
+        REDIS_CACHE_MISSES.inc(len(missing) - hits)
+        return found
+
+    async def delete_coins(self, ids: list[str]) -> int:
+        """
+        Remove many coins from the cache with a single pipelined round trip.
+
+        Returns the number of coins removed, 0 if Redis failed.
+        """
+        if not ids:
+            return 0
+        self.local_cache.invalidate(ids)
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.delete(*ids)
+                pipe.publish(self.invalidation_channel, orjson.dumps(ids))
+                await pipe.execute()
+            return len(ids)
+        except redis.RedisError as e:
+            logger.error(f"Error deleting cache for {len(ids)} coins: {e}")
+            return 0
+
+    async def get_coin_list_fingerprints(self) -> tuple[str | None, dict[str, str]]:
+        """
+        Get the digest and per-coin fingerprints of the last applied coin list.
+
+        Returns no digest and no fingerprints if none are stored or Redis
+        failed, so the caller applies the whole list.
+        """
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.get(self.COIN_LIST_DIGEST_KEY)
+                pipe.hgetall(self.COIN_LIST_FINGERPRINTS_KEY)
+                digest, fingerprints = await pipe.execute()
+            return digest, fingerprints
+        except redis.RedisError as e:
+            logger.error(f"Error retrieving coin list fingerprints: {e}")
+            return None, {}
+
+    async def set_coin_list_fingerprints(
+        self, digest: str, changed: dict[str, str], removed: list[str]
+    ) -> None:
+        """
+        Record the changes of an applied coin list and its new digest.
+        """
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                if changed:
+                    pipe.hset(self.COIN_LIST_FINGERPRINTS_KEY, mapping=changed)
+                if removed:
+                    pipe.hdel(self.COIN_LIST_FINGERPRINTS_KEY, *removed)
+                pipe.set(self.COIN_LIST_DIGEST_KEY, digest)
+                await pipe.execute()
+        except redis.RedisError as e:
+            logger.error(f"Error storing coin list fingerprints: {e}")
+
+    async def add_coin_list_fingerprints(self, fingerprints: dict[str, str]) -> None:
+        """
+        Record the fingerprints of coins written by a coin list still being
+        applied, leaving the digest of the last fully applied list untouched.
+        """
+        try:
+            await self.client.hset(
+                self.COIN_LIST_FINGERPRINTS_KEY, mapping=fingerprints
+            )
+        except redis.RedisError as e:
+            logger.error(f"Error storing coin list fingerprints: {e}")
+
+    async def get_coin_list_snapshot_digest(self) -> str | None:
+        try:
+            return await self.client.get(self.COIN_LIST_SNAPSHOT_DIGEST_KEY)
+        except redis.RedisError as e:
+            logger.error(f"Error retrieving coin list snapshot digest: {e}")
+            return None
+
+    async def get_coin_list_snapshot(self) -> str | None:
+        """
+        Get the coin list the search index was last built from, as JSON.
+        """
+        try:
+            return await self.client.get(self.COIN_LIST_SNAPSHOT_KEY)
+        except redis.RedisError as e:
+            logger.error(f"Error retrieving coin list snapshot: {e}")
+            return None
+
+    async def set_coin_list_snapshot(self, digest: str, snapshot: bytes) -> None:
+        """
+        Store a coin list snapshot together with its digest.
+        """
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.set(self.COIN_LIST_SNAPSHOT_KEY, snapshot)
+                pipe.set(self.COIN_LIST_SNAPSHOT_DIGEST_KEY, digest)
+                await pipe.execute()
+        except redis.RedisError as e:
+            logger.error(f"Error storing coin list snapshot: {e}")
+
+    async def set_coin_prices(self, prices: dict[str, dict]) -> int:
+        """
+        Store the current prices of many coins with a single HSET.
+
+        Returns the number of prices written.
+        """
+        if not prices:
+            return 0
+        try:
+            await self.client.hset(
+                self.COIN_PRICES_KEY,
+                mapping={id: orjson.dumps(price) for id, price in prices.items()},
+            )
+            return len(prices)
+        except redis.RedisError as e:
+            logger.error(f"Error setting prices for {len(prices)} coins: {e}")
+            return 0
+
+    async def get_coin_price(self, id: str) -> dict | None:
+        """
+        Get the current price of a coin, None if it has not been ingested.
+        """
+        try:
+            data: str | None = await self.client.hget(self.COIN_PRICES_KEY, id)
+            return orjson.loads(data) if data else None
+        except redis.RedisError as e:
+            logger.error(f"Error retrieving price for id {id}: {e}")
+            return None
+
+    async def get_coin_prices(self, ids: list[str]) -> dict[str, dict]:
+        """
+        Get the current prices of many coins with a single HMGET, skipping
+        coins that have not been ingested.
+        """
+        if not ids:
+            return {}
+        try:
+            values: list[str | None] = await self.client.hmget(
+                self.COIN_PRICES_KEY, ids
+            )
+            return {id: orjson.loads(value) for id, value in zip(ids, values) if value}
+        except redis.RedisError as e:
+            logger.error(f"Error retrieving prices for {len(ids)} coins: {e}")
+            return {}
+
+    async def publish_prices(self, prices: dict[str, dict]) -> None:
+        """
+        Publish a price tick to the live price streams of all workers.
+        """
+        if not prices:
+            return
+        try:
+            await self.client.publish(self.price_updates_channel, orjson.dumps(prices))
+        except redis.RedisError as e:
+            logger.error(f"Error publishing prices of {len(prices)} coins: {e}")
+
+    async def add_alerts(
+        self, alerts: dict[str, dict], dedup_ttl: int, maxlen: int
+    ) -> int:
+        """
+        Add alerts, keyed by a dedup id, to the alert stream unless an alert with
+        the same id was added within the last `dedup_ttl` seconds.
+
+        Returns the number of alerts added.
+        """
+        items: list[tuple[str, dict]] = list(alerts.items())
+        added: int = 0
+        try:
+            for start in range(0, len(items), self.ALERTS_BATCH_SIZE):
+                batch: list[tuple[str, dict]] = items[
+                    start : start + self.ALERTS_BATCH_SIZE
+                ]
+                added += int(
+                    await self._add_alerts_script(
+                        keys=[
+                            self.ALERTS_STREAM_KEY,
+                            *(self.ALERT_DEDUP_PREFIX + id for id, _ in batch),
+                        ],
+                        args=[
+                            dedup_ttl,
+                            maxlen,
+                            *(orjson.dumps(alert) for _, alert in batch),
+                        ],
+                    )
+                )
+        except redis.RedisError as e:
+            logger.error(f"Error adding {len(alerts)} alerts: {e}")
+        return added
+
+    async def listen_for_invalidations(self) -> None:
+        """
+        Apply coin invalidations published by any worker to the local cache.
+
+        Runs until cancelled and resubscribes after connection errors.
+        """
+        while True:
+            try:
+                async with self.client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.invalidation_channel)
+                    # Anything published before the subscription may have been missed
+                    self.local_cache.clear()
+                    async for message in pubsub.listen():
+                        self._apply_invalidation(message)
+            except redis.RedisError as e:
+                logger.error(f"Cache invalidation subscription failed: {e}")
+                self.local_cache.clear()
+                await asyncio.sleep(1)
+
+    def _apply_invalidation(self, message: dict) -> None:
+        if message["type"] != "message":
+            return
+        if message["data"] == "*":
+            self.local_cache.clear()
+            return
+        self.local_cache.invalidate(orjson.loads(message["data"]))
+
+    async def acquire_lock(self, name: str, token: str, ttl_ms: int) -> bool:
+        """
+        Try to take a short-lived lock owned by `token`.
+
+        Returns True when the lock was taken or Redis is unavailable, so callers
+        fall back to doing the work themselves.
+        """
+        try:
+            return bool(await self.client.set(name, token, nx=True, px=ttl_ms))
+        except redis.RedisError as e:
+            logger.error(f"Error acquiring lock {name}: {e}")
+            return True
+
+    async def release_lock(self, name: str, token: str) -> None:
+        """
+        Release a lock, but only if it is still owned by `token`.
+        """
+        try:
+            await self._release_lock_script(keys=[name], args=[token])
+        except redis.RedisError as e:
+            logger.error(f"Error releasing lock {name}: {e}")
+
+    async def is_locked(self, name: str) -> bool:
+        """
+        Check whether a lock is currently held by anyone.
+        """
+        try:
+            return bool(await self.client.exists(name))
+        except redis.RedisError as e:
+            logger.error(f"Error checking lock {name}: {e}")
+            return False
+
+    async def set_profile(
+        self, profile_id: str, folded: str, info: dict, ttl: int
+    ) -> None:
+        """
+        Store a request profile and add its description to the latest ones.
+        """
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.set(self.PROFILES_PREFIX + profile_id, folded, ex=ttl)
+                pipe.lpush(
+                    self.PROFILES_RECENT_KEY,
+                    orjson.dumps({**info, "expires_at": time.time() + ttl}),
+                )
+                pipe.ltrim(self.PROFILES_RECENT_KEY, 0, self.PROFILES_RECENT_MAX - 1)
+                pipe.expire(self.PROFILES_RECENT_KEY, ttl)
+                await pipe.execute()
+        except redis.RedisError as e:
+            logger.error(f"Error storing request profile {profile_id}: {e}")
+
+    async def get_profile(self, profile_id: str) -> str | None:
+        try:
+            return await self.client.get(self.PROFILES_PREFIX + profile_id)
+        except redis.RedisError as e:
+            logger.error(f"Error retrieving request profile {profile_id}: {e}")
+            return None
+
+    async def list_profiles(self) -> list[dict]:
+        """
+        Get the descriptions of the latest request profiles not expired yet,
+        newest first.
+        """
+        try:
+            entries: list[str] = await self.client.lrange(
+                self.PROFILES_RECENT_KEY, 0, -1
+            )
+        except redis.RedisError as e:
+            logger.error(f"Error listing request profiles: {e}")
+            return []
+        now: float = time.time()
+        profiles: list[dict] = [orjson.loads(entry) for entry in entries]
+        return [profile for profile in profiles if profile["expires_at"] > now]
+
+    async def take_token(self, name: str, rate: float, capacity: int) -> int:
+        """
+        Take a token from a rate limiting bucket shared by all workers.
+
+        Returns 0 when a token was taken, otherwise the milliseconds to wait
+        before trying again. Returns 0 when Redis is unavailable, so callers are
+        not blocked by a cache outage.
+        """
+        try:
+            return int(
+                await self._take_token_script(keys=[name], args=[rate, capacity])
+            )
+        except redis.RedisError as e:
+            logger.error(f"Error taking token from {name}: {e}")
+            return 0
+
+    async def block_bucket(self, name: str, ttl_ms: int) -> None:
+        """
+        Stop a rate limiting bucket from handing out tokens for `ttl_ms`.
+        """
+        try:
+            await self._block_bucket_script(keys=[name], args=[ttl_ms])
+        except redis.RedisError as e:
+            logger.error(f"Error blocking {name}: {e}")
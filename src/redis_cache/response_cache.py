@@ -0,0 +1,176 @@
+import hashlib
+import os
+import orjson
+import redis
+from src.redis_cache.redis_cache import RedisCache
+from src.metrics import CACHE_LOOKUPS
+from src.logger import logger
+
+RESPONSE_CACHE_HITS = CACHE_LOOKUPS.labels("response", "hit")
+RESPONSE_CACHE_MISSES = CACHE_LOOKUPS.labels("response", "miss")
+
+# Return the current generation and the coin cached under KEYS[2]
+GET_COIN_SCRIPT: str = """
+return {redis.call('GET', KEYS[1]) or '0', redis.call('GET', KEYS[2])}
+"""
+
+# Cache a coin only if no invalidation happened since the reader saw ARGV[1]
+SET_COIN_SCRIPT: str = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+# Return the current generation and the page cached under it
+GET_LIST_SCRIPT: str = """
+local generation = redis.call('GET', KEYS[1]) or '0'
+return {generation, redis.call('GET', ARGV[1] .. generation .. ':' .. ARGV[2])}
+"""
+
+# Cache a page only if no invalidation happened since the reader saw ARGV[1]
+SET_LIST_SCRIPT: str = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', ARGV[2] .. ARGV[1] .. ':' .. ARGV[3], ARGV[4], 'EX', ARGV[5])
+return 1
+"""
+
+
+class ResponseCache:
+    """
+    Redis cache of serialized coin responses together with their ETags.
+
+    Single coins and list pages are stored under their own keys with their own
+    TTL. Every write increments a generation, and a response is only cached if
+    the generation is still the one seen by the read that missed, so a body
+    read before a write cannot be cached after it. List pages are also keyed
+    by the generation, so a write drops every cached page with a single INCR.
+    """
+
+    COIN_KEY_PREFIX: str = "response-cache:coin:"
+    LIST_KEY_PREFIX: str = "response-cache:coin-list:"
+    GENERATION_KEY: str = "response-cache:generation"
+
+    def __init__(
+        self,
+        redis_cache: RedisCache | None = None,
+        ttl: int = int(os.getenv("RESPONSE_CACHE_TTL", 30)),
+    ):
+        self.redis_cache: RedisCache = redis_cache or RedisCache()
+        self.ttl: int = ttl
+        self._get_coin_script = self.redis_cache.client.register_script(GET_COIN_SCRIPT)
+        self._set_coin_script = self.redis_cache.client.register_script(SET_COIN_SCRIPT)
+        self._get_list_script = self.redis_cache.client.register_script(GET_LIST_SCRIPT)
+        self._set_list_script = self.redis_cache.client.register_script(SET_LIST_SCRIPT)
+
+    @staticmethod
+    def make_etag(body: str) -> str:
+        return f'"{hashlib.blake2b(body.encode(), digest_size=16).hexdigest()}"'
+
+    @staticmethod
+    def list_query(**params) -> str:
+        """
+        Key a list page by its query parameters, keeping None apart from any
+        string value.
+        """
+        encoded: bytes = orjson.dumps(params, option=orjson.OPT_SORT_KEYS)
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+    @staticmethod
+    def _pack(etag: str, body: str) -> str:
+        return f"{etag}\n{body}"
+
+    @staticmethod
+    def _unpack(value: str | None) -> tuple[str, str] | None:
+        if not value:
+            RESPONSE_CACHE_MISSES.inc()
+            return None
+        RESPONSE_CACHE_HITS.inc()
+        etag, body = value.split("\n", 1)
+        return etag, body
+
+    async def get_coin(self, coin_id: str) -> tuple[tuple[str, str] | None, str | None]:
+        """
+        Return the cached ETag and body of a coin, or None on a miss, together
+        with the generation to cache the coin under. The generation is None
+        when Redis failed.
+        """
+        try:
+            generation, value = await self._get_coin_script(
+                keys=[self.GENERATION_KEY, self.COIN_KEY_PREFIX + coin_id]
+            )
+        except redis.RedisError as e:
+            logger.error(f"Error reading cached response for coin {coin_id}: {e}")
+            return None, None
+        return self._unpack(value), generation
+
+    async def set_coin(self, coin_id: str, body: str, generation: str | None) -> str:
+        """
+        Cache the body of a coin read under `generation` and return its ETag.
+        The body is not cached if coins were written since.
+        """
+        etag: str = self.make_etag(body)
+        if generation is None:
+            return etag
+        try:
+            await self._set_coin_script(
+                keys=[self.GENERATION_KEY, self.COIN_KEY_PREFIX + coin_id],
+                args=[generation, self._pack(etag, body), self.ttl],
+            )
+        except redis.RedisError as e:
+            logger.error(f"Error caching response for coin {coin_id}: {e}")
+        return etag
+
+    async def get_list(self, query: str) -> tuple[tuple[str, str] | None, str | None]:
+        """
+        Return the cached ETag and body of a list page, or None on a miss,
+        together with the generation to cache the page under. The generation is
+        None when Redis failed.
+        """
+        try:
+            generation, value = await self._get_list_script(
+                keys=[self.GENERATION_KEY], args=[self.LIST_KEY_PREFIX, query]
+            )
+        except redis.RedisError as e:
+            logger.error(f"Error reading cached coin list {query}: {e}")
+            return None, None
+        return self._unpack(value), generation
+
+    async def set_list(self, query: str, body: str, generation: str | None) -> str:
+        """
+        Cache the body of a list page read under `generation` and return its
+        ETag. The page is not cached if coins were written since.
+        """
+        etag: str = self.make_etag(body)
+        if generation is None:
+            return etag
+        try:
+            await self._set_list_script(
+                keys=[self.GENERATION_KEY],
+                args=[
+                    generation,
+                    self.LIST_KEY_PREFIX,
+                    query,
+                    self._pack(etag, body),
+                    self.ttl,
+                ],
+            )
+        except redis.RedisError as e:
+            logger.error(f"Error caching coin list {query}: {e}")
+        return etag
+
+    async def invalidate_coins(self, coin_ids: list[str]) -> None:
+        """
+        Drop the cached responses of the given coins and every cached list page.
+        """
+        try:
+            async with self.redis_cache.client.pipeline(transaction=True) as pipe:
+                pipe.incr(self.GENERATION_KEY)
+                if coin_ids:
+                    pipe.delete(*(self.COIN_KEY_PREFIX + id for id in coin_ids))
+                await pipe.execute()
+        except redis.RedisError as e:
+            logger.error(f"Error invalidating cached coin responses: {e}")
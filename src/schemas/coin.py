@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -19,3 +20,60 @@ class CoinUpdate(BaseModel):
     symbol: str | None = Field(default=None)
     name: str | None = Field(default=None)
     target_price: float | None = Field(default=None)
+
+
+class CoinPage(BaseModel):
+    items: list[CoinBase]
+    next_cursor: str | None = None
+
+
+class CoinSearchResult(BaseModel):
+    id: str
+    symbol: str
+    name: str
+
+
+class CoinPrice(BaseModel):
+    id: str
+    usd: float
+    updated_at: datetime
+
+
+class PricePoint(BaseModel):
+    t: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+
+
+class CoinPriceHistory(BaseModel):
+    id: str
+    resolution: str
+    points: list[PricePoint]
+
+
+class CoinBulkItemResult(BaseModel):
+    id: str
+    status: str
+    detail: str | None = None
+
+
+class CoinBulkResult(BaseModel):
+    created: int
+    failed: int
+    items: list[CoinBulkItemResult]
+
+
+class CoinRefreshJob(BaseModel):
+    id: str
+    status: str
+    progress: float
+    processed: int
+    total: int
+    coins_per_second: float
+    attempts: int
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    error: str | None = None
@@ -0,0 +1,123 @@
+import os
+import time
+from collections.abc import Iterable
+from src.redis_cache.redis_cache import RedisCache
+from src.logger import logger
+
+
+class AlertEngine:
+    """
+    Detect coins whose price crossed their target price between two ticks.
+
+    Each coin has at most one target price, so a tick only walks the smaller
+    of its own coins and the coins with a target, and compares the target with
+    the previous and current price of the coins that moved.
+    Crossings are published to a Redis stream, at most once per coin, target
+    and direction within `dedup_ttl` seconds across all workers.
+    """
+
+    def __init__(
+        self,
+        cache: RedisCache | None = None,
+        dedup_ttl: int = int(os.getenv("ALERT_DEDUP_TTL", 3600)),
+        stream_maxlen: int = int(os.getenv("ALERT_STREAM_MAXLEN", 100000)),
+    ):
+        self.cache: RedisCache = cache or RedisCache()
+        self.dedup_ttl: int = dedup_ttl
+        self.stream_maxlen: int = stream_maxlen
+        self._targets: dict[str, float] = {}
+        # Price of each coin at the last evaluation
+        self._prices: dict[str, float] = {}
+        self.stats: dict[str, float] = {
+            "coins": 0,
+            "evaluations": 0,
+            "crossed": 0,
+            "emitted": 0,
+            "last_evaluation_ms": 0.0,
+        }
+
+    def load(self, targets: Iterable[tuple[str, float | None]]) -> None:
+        """
+        Replace the targets with the given (coin_id, target_price) pairs.
+        """
+        self._targets = {
+            coin_id: target_price
+            for coin_id, target_price in targets
+            if target_price is not None
+        }
+        self.stats["coins"] = len(self._targets)
+
+    def evaluate(self, prices: dict[str, float]) -> list[dict]:
+        """
+        Return an event for every target crossed since the last evaluation.
+
+        A coin is above its target once its price reaches it, so a move from
+        `previous` to `price` crosses the target upwards if it is in
+        (previous, price] and downwards if it is in (price, previous]. The
+        first price seen for a coin only sets its baseline.
+        """
+        start: float = time.perf_counter()
+        events: list[dict] = []
+        previous_prices: dict[str, float] = self._prices
+        targets: dict[str, float] = self._targets
+        # Walk the smaller side, the coins of the tick or those with a target
+        if len(prices) <= len(targets):
+            pairs: Iterable[tuple[str, float | None]] = (
+                (coin_id, targets.get(coin_id)) for coin_id in prices
+            )
+        else:
+            pairs = targets.items()
+        for coin_id, target_price in pairs:
+            price: float | None = prices.get(coin_id)
+            previous: float | None = previous_prices.get(coin_id)
+            if (
+                target_price is None
+                or price is None
+                or previous is None
+                or price == previous
+            ):
+                continue
+            if previous < target_price <= price:
+                direction: str = "above"
+            elif price < target_price <= previous:
+                direction = "below"
+            else:
+                continue
+            events.append(
+                {
+                    "coin_id": coin_id,
+                    "target_price": target_price,
+                    "direction": direction,
+                    "price": price,
+                    "previous_price": previous,
+                }
+            )
+        previous_prices.update(prices)
+        self.stats["evaluations"] += 1
+        self.stats["crossed"] += len(events)
+        self.stats["last_evaluation_ms"] = round(
+            (time.perf_counter() - start) * 1000, 3
+        )
+        return events
+
+    @staticmethod
+    def alert_id(event: dict) -> str:
+        return f"{event['coin_id']}:{event['target_price']!r}:{event['direction']}"
+
+    async def publish(self, events: list[dict]) -> int:
+        """
+        Add the events to the alert stream, skipping those sent recently.
+
+        Returns the number of events added.
+        """
+        if not events:
+            return 0
+        emitted: int = await self.cache.add_alerts(
+            {self.alert_id(event): event for event in events},
+            self.dedup_ttl,
+            self.stream_maxlen,
+        )
+        self.stats["emitted"] += emitted
+        if emitted:
+            logger.info(f"Emitted {emitted}/{len(events)} target price alerts")
+        return emitted
@@ -0,0 +1,51 @@
+import csv
+import io
+import os
+from collections.abc import AsyncIterator, Sequence
+import orjson
+from sqlalchemy import Row
+from src.database_utils.connection import DatabaseConnection
+from src.services.coin_service import CoinService
+from src.logger import logger
+
+
+class CoinExportService:
+    MEDIA_TYPES: dict[str, str] = {
+        "ndjson": "application/x-ndjson",
+        "csv": "text/csv",
+    }
+    CSV_COLUMNS: tuple[str, ...] = ("id", "symbol", "name", "target_price")
+
+    def __init__(self, batch_size: int = int(os.getenv("EXPORT_BATCH_SIZE", 1000))):
+        self.batch_size: int = batch_size
+
+    async def stream(self, format: str) -> AsyncIterator[bytes]:
+        """
+        Stream the coin table from a server-side cursor, one encoded chunk per batch.
+
+        The generator owns its session, because the response body is sent after
+        the request dependencies have been closed.
+        """
+        if format == "csv":
+            yield self.encode_csv([self.CSV_COLUMNS])
+        exported: int = 0
+        async with DatabaseConnection.get_shared().async_session() as session:
+            async for rows in CoinService.stream_coins(session, self.batch_size):
+                exported += len(rows)
+                yield self.encode(rows, format)
+        logger.info(f"Exported {exported} coins as {format}")
+
+    def encode(self, rows: Sequence[Row], format: str) -> bytes:
+        if format == "csv":
+            return self.encode_csv(rows)
+        return self.encode_ndjson(rows)
+
+    @staticmethod
+    def encode_ndjson(rows: Sequence[Row]) -> bytes:
+        return b"".join(orjson.dumps(row._asdict()) + b"\n" for row in rows)
+
+    @staticmethod
+    def encode_csv(rows: Sequence[Sequence]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
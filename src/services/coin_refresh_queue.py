@@ -0,0 +1,368 @@
+import asyncio
+import os
+import time
+import uuid
+import redis
+import redis.asyncio as aioredis
+from src.services.periodic_coin_data_updater import PeriodicCoinDataUpdater
+from src.logger import logger
+
+# Queue a job unless the idempotency key KEYS[4] or the active job KEYS[1]
+# already points at one. KEYS[4] is KEYS[1] when the caller has no idempotency
+# key. A new job ARGV[1] gets the hash KEYS[3] with the fields in ARGV[4..] and
+# is pushed to the list KEYS[2]; job hashes and idempotency keys expire after
+# ARGV[2] seconds, the active job key after ARGV[3] milliseconds unless the
+# consumer running the job renews it. Returns the id of the new or already
+# queued job.
+ENQUEUE_JOB_SCRIPT: str = """
+local job_id = redis.call('GET', KEYS[4])
+if not job_id then
+    job_id = redis.call('GET', KEYS[1])
+end
+if not job_id then
+    job_id = ARGV[1]
+    redis.call('HSET', KEYS[3], unpack(ARGV, 4))
+    redis.call('EXPIRE', KEYS[3], ARGV[2])
+    redis.call('SET', KEYS[1], job_id, 'PX', ARGV[3])
+    redis.call('LPUSH', KEYS[2], job_id)
+end
+if KEYS[4] ~= KEYS[1] then
+    redis.call('SET', KEYS[4], job_id, 'EX', ARGV[2], 'NX')
+end
+return job_id
+"""
+
+# Keep job ARGV[1] the active one KEYS[1] for ARGV[2] milliseconds, unless
+# another job became active. Returns 1 when the job is the active one.
+HOLD_ACTIVE_JOB_SCRIPT: str = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return 1
+end
+return 0
+"""
+
+# Record the outcome ARGV[3..] of job ARGV[1] in its hash KEYS[3], remove it
+# from the claimed list KEYS[2] and clear the active job KEYS[1] if it is this
+# one, so the next trigger queues a new job. The hash expires ARGV[2] seconds
+# later.
+FINISH_JOB_SCRIPT: str = """
+redis.call('HSET', KEYS[3], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[3], ARGV[2])
+redis.call('LREM', KEYS[2], 0, ARGV[1])
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+end
+return 1
+"""
+
+
+class RedisJobQueue:
+    """
+    Jobs of one queue in Redis: a hash per job, the lists of pending and
+    claimed job ids, the id of the active job and the idempotency keys.
+    """
+
+    KEY_PREFIX = "jobs:"
+
+    def __init__(self, client: aioredis.Redis, name: str):
+        self.client: aioredis.Redis = client
+        self.name: str = name
+        self._enqueue_script = client.register_script(ENQUEUE_JOB_SCRIPT)
+        self._hold_active_script = client.register_script(HOLD_ACTIVE_JOB_SCRIPT)
+        self._finish_script = client.register_script(FINISH_JOB_SCRIPT)
+
+    def keys(self, job_id: str = "") -> dict[str, str]:
+        """
+        Keys of the queue: the active job id, the lists of pending and claimed
+        job ids, and the hash of job `job_id`.
+        """
+        prefix: str = f"{self.KEY_PREFIX}{self.name}:"
+        return {
+            "active": prefix + "active",
+            "pending": prefix + "pending",
+            "claimed": prefix + "claimed",
+            "job": f"{prefix}job:{job_id}",
+        }
+
+    async def enqueue(
+        self,
+        job_id: str,
+        fields: dict,
+        ttl: int,
+        active_ttl_ms: int,
+        idempotency_key: str | None = None,
+    ) -> str | None:
+        """
+        Queue job `job_id`, unless a job is already pending or running or
+        `idempotency_key` was used by an earlier job.
+
+        The job stays the active one for `active_ttl_ms` milliseconds, or as
+        long as `hold_active` renews it, so a job lost with its consumer does
+        not block new triggers for good.
+
+        Returns the id of the job the caller gets, or None when Redis is
+        unavailable.
+        """
+        keys: dict[str, str] = self.keys(job_id)
+        idempotency: str = (
+            f"{self.KEY_PREFIX}{self.name}:idempotency:{idempotency_key}"
+            if idempotency_key
+            else keys["active"]
+        )
+        try:
+            return await self._enqueue_script(
+                keys=[keys["active"], keys["pending"], keys["job"], idempotency],
+                args=[
+                    job_id,
+                    ttl,
+                    active_ttl_ms,
+                    *(item for pair in fields.items() for item in pair),
+                ],
+            )
+        except redis.RedisError as e:
+            logger.error(f"Error queueing {self.name} job: {e}")
+            return None
+
+    async def hold_active(self, job_id: str, ttl_ms: int) -> bool:
+        """
+        Keep job `job_id` the active one for another `ttl_ms` milliseconds, or
+        make it active again if its key expired while it was pending.
+
+        Returns False if another job became active meanwhile or Redis failed.
+        """
+        try:
+            return bool(
+                await self._hold_active_script(
+                    keys=[self.keys()["active"]], args=[job_id, ttl_ms]
+                )
+            )
+        except redis.RedisError as e:
+            logger.error(f"Error renewing {self.name} job {job_id}: {e}")
+            return False
+
+    async def claim(self, timeout: float) -> str | None:
+        """
+        Move the oldest pending job to the claimed list, waiting up to
+        `timeout` seconds for one. Raises redis.RedisError, so a consumer can
+        back off while Redis is unavailable.
+        """
+        keys: dict[str, str] = self.keys()
+        return await self.client.blmove(
+            keys["pending"], keys["claimed"], timeout, "RIGHT", "LEFT"
+        )
+
+    async def requeue_claimed(self) -> list[str]:
+        """
+        Move the jobs claimed by a consumer that stopped before finishing them
+        back to the front of the pending list.
+        """
+        keys: dict[str, str] = self.keys()
+        requeued: list[str] = []
+        while job_id := await self.client.lmove(
+            keys["claimed"], keys["pending"], "LEFT", "RIGHT"
+        ):
+            requeued.append(job_id)
+        return requeued
+
+    async def update(self, job_id: str, fields: dict) -> None:
+        try:
+            await self.client.hset(self.keys(job_id)["job"], mapping=fields)
+        except redis.RedisError as e:
+            logger.error(f"Error updating {self.name} job {job_id}: {e}")
+
+    async def finish(self, job_id: str, fields: dict, ttl: int) -> None:
+        """
+        Record the outcome of a claimed job and let the next trigger queue a
+        new one.
+        """
+        keys: dict[str, str] = self.keys(job_id)
+        try:
+            await self._finish_script(
+                keys=[keys["active"], keys["claimed"], keys["job"]],
+                args=[job_id, ttl, *(item for pair in fields.items() for item in pair)],
+            )
+        except redis.RedisError as e:
+            logger.error(f"Error finishing {self.name} job {job_id}: {e}")
+
+    async def get(self, job_id: str) -> dict[str, str]:
+        """
+        Get the fields of a job, empty if it does not exist or Redis failed.
+        """
+        try:
+            return await self.client.hgetall(self.keys(job_id)["job"])
+        except redis.RedisError as e:
+            logger.error(f"Error retrieving {self.name} job {job_id}: {e}")
+            return {}
+
+
+class CoinRefreshQueue:
+    """
+    Queue of manual coin data refreshes, shared by all workers.
+
+    A trigger while a refresh is pending or running joins that job instead of
+    starting another, and a trigger repeating an idempotency key gets the job
+    of the first one. Jobs are run one at a time by `consume` in the leader
+    worker. A job claimed by a worker that stopped is run again by the next
+    leader and resumes from the coins its checkpoints already recorded.
+    """
+
+    QUEUE = "coin-refresh"
+
+    def __init__(
+        self,
+        updater: PeriodicCoinDataUpdater,
+        client: aioredis.Redis,
+        job_ttl: int = int(os.getenv("COIN_REFRESH_JOB_TTL", 86400)),
+        active_ttl_ms: int = int(os.getenv("COIN_REFRESH_ACTIVE_TTL_MS", 60000)),
+        claim_timeout: float = 5,
+    ):
+        self.updater: PeriodicCoinDataUpdater = updater
+        self.jobs: RedisJobQueue = RedisJobQueue(client, self.QUEUE)
+        # Seconds a job and its idempotency key are kept after it was queued or finished
+        self.job_ttl: int = job_ttl
+        # Milliseconds a job stays the one triggers join without being renewed,
+        # a running job renews it every third of that
+        self.active_ttl_ms: int = active_ttl_ms
+        self.claim_timeout: float = claim_timeout
+        self.stats: dict[str, int] = {
+            "queued": 0,
+            "joined": 0,
+            "resumed": 0,
+            "succeeded": 0,
+            "failed": 0,
+        }
+
+    async def enqueue(
+        self, idempotency_key: str | None = None
+    ) -> tuple[str | None, bool]:
+        """
+        Queue a refresh or join the one already pending or running.
+
+        Returns the job id, None when Redis is unavailable, and whether the job
+        was created by this call.
+        """
+        job_id: str = uuid.uuid4().hex
+        fields: dict = {
+            "status": "queued",
+            "created_at": time.time(),
+            "attempts": 0,
+            "processed": 0,
+            "total": 0,
+        }
+        queued_id: str | None = await self.jobs.enqueue(
+            job_id,
+            fields,
+            self.job_ttl,
+            self.active_ttl_ms,
+            idempotency_key,
+        )
+        if queued_id is None:
+            return None, False
+        created: bool = queued_id == job_id
+        self.stats["queued" if created else "joined"] += 1
+        return queued_id, created
+
+    async def get(self, job_id: str) -> dict | None:
+        job: dict[str, str] = await self.jobs.get(job_id)
+        return self.describe(job_id, job) if job else None
+
+    @staticmethod
+    def describe(job_id: str, job: dict[str, str]) -> dict:
+        """
+        Turn the fields of a job hash into the body of GET /coins/update-coins/{id}.
+        """
+        processed: int = int(job.get("processed", 0))
+        total: int = int(job.get("total", 0))
+        if total:
+            progress: float = processed / total
+        else:
+            progress = 1.0 if job["status"] == "succeeded" else 0.0
+        return {
+            "id": job_id,
+            "status": job["status"],
+            "progress": round(progress, 4),
+            "processed": processed,
+            "total": total,
+            "coins_per_second": float(job.get("coins_per_second", 0)),
+            "attempts": int(job.get("attempts", 0)),
+            "created_at": float(job["created_at"]),
+            "started_at": float(job["started_at"]) if "started_at" in job else None,
+            "finished_at": float(job["finished_at"]) if "finished_at" in job else None,
+            "error": job.get("error"),
+        }
+
+    async def run(self, job_id: str) -> None:
+        """
+        Run a claimed job, recording its progress after every written batch.
+        """
+        job: dict[str, str] = await self.jobs.get(job_id)
+        started_at: float = time.time()
+        await self.jobs.update(
+            job_id,
+            {
+                "status": "running",
+                "started_at": started_at,
+                "attempts": int(job.get("attempts", 0)) + 1,
+            },
+        )
+        logger.info(f"Running coin refresh job {job_id}")
+
+        async def progress(processed: int, total: int) -> None:
+            elapsed: float = time.time() - started_at
+            await self.jobs.update(
+                job_id,
+                {
+                    "processed": processed,
+                    "total": total,
+                    "coins_per_second": round(processed / elapsed, 1) if elapsed else 0,
+                },
+            )
+
+        async def hold_active() -> None:
+            while True:
+                await self.jobs.hold_active(job_id, self.active_ttl_ms)
+                await asyncio.sleep(self.active_ttl_ms / 3000)
+
+        holder: asyncio.Task = asyncio.create_task(hold_active())
+        try:
+            await self.updater.fetch_and_cache_coin_data(progress)
+        except Exception as e:
+            logger.error(f"Coin refresh job {job_id} failed: {e}")
+            self.stats["failed"] += 1
+            outcome: dict = {"status": "failed", "error": str(e)}
+        else:
+            logger.info(f"Coin refresh job {job_id} succeeded")
+            self.stats["succeeded"] += 1
+            outcome = {"status": "succeeded"}
+        finally:
+            holder.cancel()
+        outcome["finished_at"] = time.time()
+        await self.jobs.finish(job_id, outcome, self.job_ttl)
+
+    async def consume(self) -> None:
+        """
+        Run queued jobs one at a time, starting with the ones a stopped
+        consumer left unfinished.
+
+        Runs until cancelled and keeps retrying while Redis is unavailable.
+        """
+        recovered: bool = False
+        while True:
+            try:
+                if not recovered:
+                    for job_id in await self.jobs.requeue_claimed():
+                        logger.info(f"Resuming interrupted coin refresh job {job_id}")
+                        await self.jobs.update(job_id, {"status": "queued"})
+                        self.stats["resumed"] += 1
+                    recovered = True
+                job_id: str | None = await self.jobs.claim(self.claim_timeout)
+            except redis.RedisError as e:
+                logger.error(f"Coin refresh queue unavailable: {e}")
+                await asyncio.sleep(1)
+                continue
+            if job_id is not None:
+                await self.run(job_id)
@@ -0,0 +1,96 @@
+import bisect
+import sys
+from array import array
+
+
+class CoinSearchIndex:
+    """
+    Immutable in-memory index over the CoinGecko coin list.
+
+    Lowercase symbols and name words are kept in sorted arrays, next to the
+    position of their coin, so exact and prefix matches are two binary searches.
+    A refresh builds a new index and replaces the old one in a single
+    assignment, so queries never see a half-built index.
+    """
+
+    def __init__(self, coins: list[dict[str, str]]):
+        self.coins: list[tuple[str, str, str]] = [
+            (coin["id"], coin["symbol"], coin["name"])
+            for coin in coins
+            if coin.get("id") and coin.get("symbol") and coin.get("name")
+        ]
+        symbols: list[tuple[str, int]] = sorted(
+            (symbol.lower(), position)
+            for position, (_, symbol, _) in enumerate(self.coins)
+        )
+        # Every word of a name is indexed, so "bitcoin" also finds "Wrapped Bitcoin"
+        names: list[tuple[str, int]] = sorted(
+            {
+                (" ".join(words[start:]), position)
+                for position, (_, _, name) in enumerate(self.coins)
+                for words in [name.lower().split()]
+                for start in range(len(words))
+            }
+        )
+        self._symbol_keys: list[str] = [key for key, _ in symbols]
+        self._symbol_positions: array = array(
+            "I", (position for _, position in symbols)
+        )
+        self._name_keys: list[str] = [key for key, _ in names]
+        self._name_positions: array = array("I", (position for _, position in names))
+
+    def __len__(self) -> int:
+        return len(self.coins)
+
+    def search(self, query: str, limit: int = 20) -> list[dict[str, str]]:
+        """
+        Find coins by symbol or name, case-insensitively.
+
+        Exact symbol matches come first, then symbol prefix matches, then coins
+        with a name word starting with the query.
+        """
+        query = " ".join(query.lower().split())
+        if not query or limit <= 0:
+            return []
+        positions: dict[int, None] = {}
+        # An exact symbol sorts before every longer key with it as a prefix
+        start, end = self._prefix_range(self._symbol_keys, query)
+        for i in range(start, end):
+            positions.setdefault(self._symbol_positions[i])
+            if len(positions) >= limit:
+                return self._results(positions)
+        start, end = self._prefix_range(self._name_keys, query)
+        for i in range(start, end):
+            positions.setdefault(self._name_positions[i])
+            if len(positions) >= limit:
+                break
+        return self._results(positions)
+
+    @staticmethod
+    def _prefix_range(keys: list[str], prefix: str) -> tuple[int, int]:
+        start: int = bisect.bisect_left(keys, prefix)
+        # U+FFFF sorts after every character that can follow the prefix
+        end: int = bisect.bisect_left(keys, prefix + "\uffff", start)
+        return start, end
+
+    def _results(self, positions: dict[int, None]) -> list[dict[str, str]]:
+        return [
+            dict(zip(("id", "symbol", "name"), self.coins[position]))
+            for position in positions
+        ]
+
+    def memory_bytes(self) -> int:
+        """
+        Approximate memory held by the index, including its strings.
+        """
+        size: int = sys.getsizeof(self.coins) + sum(
+            sys.getsizeof(coin) + sum(sys.getsizeof(value) for value in coin)
+            for coin in self.coins
+        )
+        for keys, positions in (
+            (self._symbol_keys, self._symbol_positions),
+            (self._name_keys, self._name_positions),
+        ):
+            size += sys.getsizeof(keys) + sys.getsizeof(positions)
+            size += sum(sys.getsizeof(key) for key in keys)
+        return size
@@ -0,0 +1,69 @@
+import os
+from collections import OrderedDict
+from collections.abc import Sequence
+import orjson
+from src.schemas.coin import CoinBase
+
+
+class CoinSerializer:
+    """
+    Encode coin rows read from our own database straight into JSON bytes.
+
+    Rows skip Pydantic validation and are encoded with orjson. The JSON of each
+    coin is kept in an LRU keyed by the whole row, so an entry can never be
+    stale and a page of unchanged coins is mostly a join of cached fragments.
+    With `validate` set, coins go through `CoinBase` like any other response.
+    """
+
+    FIELDS: tuple[str, ...] = ("id", "symbol", "name", "target_price")
+
+    def __init__(
+        self,
+        max_fragments: int = int(os.getenv("COIN_FRAGMENT_CACHE_SIZE", 10000)),
+        validate: bool = os.getenv("FAST_SERIALIZATION", "true").lower() != "true",
+    ):
+        self.max_fragments: int = max_fragments
+        self.validate: bool = validate
+        self._fragments: OrderedDict[tuple, bytes] = OrderedDict()
+        self.stats: dict[str, int] = {"hits": 0, "misses": 0}
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+    def coin(self, row: Sequence) -> bytes:
+        """
+        Encode an (id, symbol, name, target_price) row.
+        """
+        if self.validate:
+            return (
+                CoinBase.model_validate(dict(zip(self.FIELDS, row)))
+                .model_dump_json()
+                .encode()
+            )
+        fragment: bytes | None = self._fragments.get(row)
+        if fragment is not None:
+            self._fragments.move_to_end(row)
+            self.stats["hits"] += 1
+            return fragment
+        self.stats["misses"] += 1
+        fragment = orjson.dumps(dict(zip(self.FIELDS, row)))
+        if self.max_fragments:
+            # A plain tuple key does not keep the result row alive
+            self._fragments[tuple(row)] = fragment
+            if len(self._fragments) > self.max_fragments:
+                self._fragments.popitem(last=False)
+        return fragment
+
+    def page(self, rows: Sequence[Sequence], next_cursor: str | None) -> bytes:
+        """
+        Encode a page of rows with the body of `CoinPage`.
+        """
+        return b"".join(
+            (
+                b'{"items":[',
+                b",".join([self.coin(row) for row in rows]),
+                b'],"next_cursor":',
+                orjson.dumps(next_cursor),
+                b"}",
+            )
+        )
@@ -1,11 +1,22 @@
+import base64
+import binascii
+from collections.abc import AsyncIterator, Sequence
 from fastapi import HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, bindparam, delete, func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
 from sqlalchemy.future import select
 from src.models.coin import Coin as SQLAlchemyCoin
 from src.logger import logger
 
 
 class CoinService:
+    COLUMNS: tuple = (
+        SQLAlchemyCoin.id,
+        SQLAlchemyCoin.symbol,
+        SQLAlchemyCoin.name,
+        SQLAlchemyCoin.target_price,
+    )
 
     @staticmethod
     async def get_coin_by_id(
@@ -31,3 +42,186 @@ class CoinService:
             raise HTTPException(
                 status_code=400, detail="Coin with this ID already exists"
             )
+
+    @staticmethod
+    async def _autocommit_connection(session: AsyncSession) -> AsyncConnection:
+        """
+        Return the session connection in autocommit mode, so a single statement is
+        sent without the extra BEGIN and COMMIT round trips.
+
+        Must be called before the session has executed anything else.
+        """
+        return await session.connection(
+            execution_options={"isolation_level": "AUTOCOMMIT"}
+        )
+
+    @staticmethod
+    async def create_coin(session: AsyncSession, coin_data: dict) -> Row | None:
+        """
+        Insert a coin with one INSERT ... ON CONFLICT DO NOTHING RETURNING.
+
+        Returns None when a coin with the same id or symbol already exists.
+        """
+        connection: AsyncConnection = await CoinService._autocommit_connection(session)
+        result = await connection.execute(
+            insert(SQLAlchemyCoin)
+            .values(**coin_data)
+            .on_conflict_do_nothing()
+            .returning(*CoinService.COLUMNS)
+        )
+        return result.one_or_none()
+
+    @staticmethod
+    async def update_coin(
+        session: AsyncSession, coin_id: str, coin_data: dict
+    ) -> Row | None:
+        """
+        Apply a partial update with one UPDATE ... RETURNING.
+
+        Returns None when the coin does not exist.
+        """
+        connection: AsyncConnection = await CoinService._autocommit_connection(session)
+        result = await connection.execute(
+            update(SQLAlchemyCoin)
+            .where(SQLAlchemyCoin.id == coin_id)
+            .values(**coin_data)
+            .returning(*CoinService.COLUMNS)
+        )
+        return result.one_or_none()
+
+    @staticmethod
+    async def delete_coin(session: AsyncSession, coin_id: str) -> bool:
+        """
+        Delete a coin with one DELETE ... RETURNING.
+
+        Returns False when the coin does not exist.
+        """
+        connection: AsyncConnection = await CoinService._autocommit_connection(session)
+        result = await connection.execute(
+            delete(SQLAlchemyCoin)
+            .where(SQLAlchemyCoin.id == coin_id)
+            .returning(SQLAlchemyCoin.id)
+        )
+        return result.one_or_none() is not None
+
+    @staticmethod
+    async def insert_coins(session: AsyncSession, coins: list[dict]) -> set[str]:
+        """
+        Insert many coins with one set-based INSERT ... ON CONFLICT DO NOTHING.
+
+        Returns the ids of the inserted coins; coins whose id or symbol already
+        exists are skipped.
+        """
+        if not coins:
+            return set()
+        result = await session.execute(
+            insert(SQLAlchemyCoin)
+            .on_conflict_do_nothing()
+            .returning(SQLAlchemyCoin.id),
+            coins,
+        )
+        inserted: set[str] = set(result.scalars().all())
+        await session.commit()
+        return inserted
+
+    @staticmethod
+    async def get_price_targets(
+        session: AsyncSession,
+    ) -> list[tuple[str, float | None]]:
+        """
+        Return the id and target price of every tracked coin.
+        """
+        result = await session.execute(
+            select(SQLAlchemyCoin.id, SQLAlchemyCoin.target_price).order_by(
+                SQLAlchemyCoin.id
+            )
+        )
+        return [(id, target_price) for id, target_price in result.all()]
+
+    @staticmethod
+    async def update_prices(session: AsyncSession, prices: list[dict]) -> int:
+        """
+        Write the current price of many coins with one executemany UPDATE.
+
+        Each price is a dict with the coin_id, price and updated_at. Coins
+        deleted in the meantime are skipped.
+        """
+        if not prices:
+            return 0
+        coin_table = SQLAlchemyCoin.__table__
+        await session.execute(
+            update(coin_table)
+            .where(coin_table.c.id == bindparam("coin_id"))
+            .values(
+                current_price=bindparam("price"),
+                price_updated_at=bindparam("updated_at"),
+            ),
+            prices,
+        )
+        await session.commit()
+        return len(prices)
+
+    @staticmethod
+    async def list_coins(
+        session: AsyncSession,
+        limit: int,
+        after_id: str | None = None,
+        symbol: str | None = None,
+        name_prefix: str | None = None,
+        has_target_price: bool | None = None,
+    ) -> list[Row]:
+        """
+        Return up to `limit` coins as plain rows ordered by id, starting after
+        `after_id`.
+
+        Seeking on the primary key keeps every page equally cheap, however deep.
+        """
+        query = select(*CoinService.COLUMNS).order_by(SQLAlchemyCoin.id).limit(limit)
+        if after_id is not None:
+            query = query.where(SQLAlchemyCoin.id > after_id)
+        if symbol is not None:
+            query = query.where(SQLAlchemyCoin.symbol == symbol)
+        if name_prefix:
+            query = query.where(
+                func.lower(SQLAlchemyCoin.name).startswith(
+                    name_prefix.lower(), autoescape=True
+                )
+            )
+        if has_target_price is not None:
+            query = query.where(
+                SQLAlchemyCoin.target_price.is_not(None)
+                if has_target_price
+                else SQLAlchemyCoin.target_price.is_(None)
+            )
+        result = await session.execute(query)
+        return list(result.all())
+
+    @staticmethod
+    async def stream_coins(
+        session: AsyncSession, batch_size: int
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Yield all coins as plain rows, `batch_size` rows at a time, from a
+        server-side cursor so the table is never held in memory at once.
+        """
+        result = await session.stream(
+            select(*CoinService.COLUMNS)
+            .order_by(SQLAlchemyCoin.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            yield rows
+
+    @staticmethod
+    def encode_cursor(coin_id: str) -> str:
+        return base64.urlsafe_b64encode(coin_id.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> str:
+        try:
+            padding: str = "=" * (-len(cursor) % 4)
+            return base64.b64decode(
+                cursor + padding, altchars=b"-_", validate=True
+            ).decode()
+        except (binascii.Error, UnicodeDecodeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -1,51 +1,107 @@
+import asyncio
+import httpx
+import orjson
 from src.redis_cache.redis_cache import RedisCache
 from src.coingecko.coingecko_coins_api import CoinGeckoAPI
-from src.schemas.coin import CoinUpdate
+from src.coingecko.coin_lookup_batcher import CoinLookupBatcher
+from src.schemas.coin import CoinCreate, CoinUpdate
+from src.services.single_flight import SingleFlight
 
 
 class CoinUpdateService:
     def __init__(self):
         self.redis_cache = RedisCache()
         self.coingecko_api = CoinGeckoAPI()
+        self.coin_lookup_batcher = CoinLookupBatcher(self.coingecko_api)
+        self.single_flight = SingleFlight(self.redis_cache)
 
     async def update_coin_data(self, coin_data: CoinUpdate) -> CoinUpdate:
         try:
             # Check Redis cache
-            cached_data: dict[str, str] = self.redis_cache.get_coin_from_cache(
+            cached_data: dict[str, str] = await self.redis_cache.get_coin_from_cache(
                 coin_data.id
             )
             if cached_data:
-                # Update coin_data with cached values if they differ
-                if (
-                    cached_data.get("symbol")
-                    and cached_data["symbol"] != coin_data.symbol
-                ):
-                    coin_data.symbol = cached_data["symbol"]
-                if cached_data.get("name") and cached_data["name"] != coin_data.name:
-                    coin_data.name = cached_data["name"]
-                return coin_data
-            else:
-                # Fetch data from CoinGecko API
-                api_data: dict = self.coingecko_api.get_coin_info(coin_data.id)
-                if api_data:
-                    if (
-                        api_data.get("symbol")
-                        and api_data["symbol"] != coin_data.symbol
-                    ):
-                        coin_data.symbol = api_data["symbol"]
-                    if api_data.get("name") and api_data["name"] != coin_data.name:
-                        coin_data.name = api_data["name"]
-                    # Store fetched data into Redis cache
-                    if coin_data.symbol and coin_data.name:
-                        self.redis_cache.set_coin_cache(
-                            coin_data.id, coin_data.symbol, coin_data.name
-                        )
-                    return coin_data
-                else:
-                    raise ValueError(
-                        f"Coin ID {coin_data.id} not found in CoinGecko API"
-                    )
+                return self._apply_coin_metadata(coin_data, cached_data)
+            # Fetch data from CoinGecko API, once for all concurrent misses of this id
+            api_data: dict[str, str] = await self.single_flight.do(
+                coin_data.id,
+                lambda: self._fetch_coin_metadata(coin_data.id),
+                lambda: self.redis_cache.get_coin_from_cache(coin_data.id),
+            )
+            return self._apply_coin_metadata(coin_data, api_data)
         except ValueError as e:
             raise ValueError(
                 f"Coin ID {coin_data.id} not found in cache or CoinGecko API"
             )
+
+    async def update_coins_data(
+        self, coins: list[CoinCreate]
+    ) -> tuple[list[CoinCreate], list[str], list[str]]:
+        """
+        Validate many coins with one Redis lookup and batched CoinGecko requests
+        for the cache misses, falling back to single lookups like one coin does.
+
+        Returns the validated coins, the ids unknown to CoinGecko and the ids
+        whose lookup failed upstream.
+        """
+        ids: list[str] = [coin.id for coin in coins]
+        metadata: dict[str, dict] = await self.redis_cache.get_coins_from_cache(ids)
+        missing: list[str] = [id for id in ids if id not in metadata]
+        upstream_errors: list[str] = []
+        if missing:
+            results: list = await asyncio.gather(
+                *(self.coin_lookup_batcher.load(id) for id in missing),
+                return_exceptions=True,
+            )
+            api_data: dict[str, dict] = {}
+            for id, result in zip(missing, results):
+                if isinstance(result, (httpx.HTTPError, orjson.JSONDecodeError)):
+                    upstream_errors.append(id)
+                elif isinstance(result, BaseException):
+                    raise result
+                elif result:
+                    api_data[id] = result
+            await self.redis_cache.set_coins_cache(list(api_data.values()))
+            metadata.update(api_data)
+        valid_coins: list[CoinCreate] = [
+            self._apply_coin_metadata(coin, metadata[coin.id])
+            for coin in coins
+            if coin.id in metadata
+        ]
+        failed: set[str] = set(upstream_errors)
+        not_found: list[str] = [
+            id for id in ids if id not in metadata and id not in failed
+        ]
+        return valid_coins, not_found, upstream_errors
+
+    async def _fetch_coin_metadata(self, coin_id: str) -> dict[str, str]:
+        """
+        Fetch the symbol and name of a coin from CoinGecko, batched with lookups
+        of other coins, and store them in Redis.
+        """
+        api_data: dict = await self.coin_lookup_batcher.load(coin_id)
+        if not api_data:
+            raise ValueError(f"Coin ID {coin_id} not found in CoinGecko API")
+        metadata: dict[str, str] = {
+            key: api_data[key] for key in ("symbol", "name") if api_data.get(key)
+        }
+        # Store fetched data into Redis cache
+        if len(metadata) == 2:
+            await self.redis_cache.set_coin_cache(
+                coin_id, metadata["symbol"], metadata["name"]
+            )
+        return metadata
+
+    @staticmethod
+    def _apply_coin_metadata(
+        coin_data: CoinCreate | CoinUpdate, metadata: dict[str, str]
+    ) -> CoinCreate | CoinUpdate:
+        """
+        Overwrite the symbol and name of a coin with known metadata if they differ.
+        """
+        if metadata.get("symbol") and metadata["symbol"] != coin_data.symbol:
+            coin_data.symbol = metadata["symbol"]
+        if metadata.get("name") and metadata["name"] != coin_data.name:
+            coin_data.name = metadata["name"]
+        return coin_data
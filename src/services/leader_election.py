@@ -0,0 +1,154 @@
+import asyncio
+import os
+import time
+import uuid
+from collections.abc import Callable, Coroutine
+import redis
+import redis.asyncio as aioredis
+from src.logger import logger
+
+# Take or renew the lease KEYS[1] for owner ARGV[1] for ARGV[2] milliseconds.
+# Returns 1 when the caller holds the lease afterwards, 0 when someone else does.
+ACQUIRE_LEASE_SCRIPT: str = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return 1
+end
+return 0
+"""
+
+# Delete the lease KEYS[1] if it is still owned by ARGV[1]
+RELEASE_LEASE_SCRIPT: str = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class LeaderElection:
+    """
+    Run background jobs in exactly one worker, elected through a Redis lease.
+
+    Every worker tries to take or renew the lease every third of its TTL. The
+    holder runs the jobs; when it dies its lease expires and another worker
+    takes over within one TTL. A graceful shutdown releases the lease at once.
+    While Redis is unreachable the leader keeps its jobs only until its last
+    renewal would have expired, so two workers never both believe they lead.
+    """
+
+    LEASE_KEY = "leader:background-jobs"
+
+    def __init__(
+        self,
+        client: aioredis.Redis,
+        lease_ttl_ms: int = int(os.getenv("LEADER_LEASE_TTL_MS", 15000)),
+    ):
+        self.client: aioredis.Redis = client
+        self._acquire_lease_script = client.register_script(ACQUIRE_LEASE_SCRIPT)
+        self._release_lease_script = client.register_script(RELEASE_LEASE_SCRIPT)
+        self.lease_ttl_ms: int = lease_ttl_ms
+        self.token: str = uuid.uuid4().hex
+        self.is_leader: bool = False
+        self.stop_event = asyncio.Event()
+        self._lease_expires_at: float = 0.0
+        self._jobs: list[asyncio.Task] = []
+        self._runner: asyncio.Task | None = None
+        self.stats: dict[str, int] = {"elections": 0, "demotions": 0}
+
+    def start(self, jobs: Callable[[], list[Coroutine]]) -> None:
+        """
+        Start campaigning; `jobs` returns the coroutines to run while leading.
+        """
+        self.stop_event.clear()
+        self._runner = asyncio.create_task(self.run(jobs))
+
+    async def run(self, jobs: Callable[[], list[Coroutine]]) -> None:
+        try:
+            while not self.stop_event.is_set():
+                await self.campaign(jobs)
+                try:
+                    await asyncio.wait_for(
+                        self.stop_event.wait(), self.lease_ttl_ms / 3000
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self._stop_jobs()
+            if self.is_leader:
+                self.is_leader = False
+                await self.release_lease()
+                logger.info("Released background job leadership")
+
+    async def campaign(self, jobs: Callable[[], list[Coroutine]]) -> None:
+        """
+        Take or renew the lease and start or stop the jobs accordingly.
+        """
+        # Measured before the call, so the local deadline never outlives the lease
+        attempted_at: float = time.monotonic()
+        held: bool | None = await self.acquire_lease()
+        if held:
+            self._lease_expires_at = attempted_at + self.lease_ttl_ms / 1000
+        leading: bool = bool(held) or (
+            held is None
+            and self.is_leader
+            and time.monotonic() < self._lease_expires_at
+        )
+        if self.stop_event.is_set():
+            # Shutting down, `run` releases the lease
+            self.is_leader = self.is_leader or bool(held)
+            return
+        if leading and not self.is_leader:
+            self.is_leader = True
+            self.stats["elections"] += 1
+            self._jobs = [asyncio.create_task(job) for job in jobs()]
+            logger.info(f"Elected to run {len(self._jobs)} background jobs")
+        elif not leading and self.is_leader:
+            self.is_leader = False
+            self.stats["demotions"] += 1
+            await self._stop_jobs()
+            logger.warning("Lost background job leadership, jobs stopped")
+
+    async def acquire_lease(self) -> bool | None:
+        """
+        Take the lease, or extend it if this worker already holds it.
+
+        Returns None when Redis is unavailable, so the caller can tell an
+        unknown state from a lease held by another worker.
+        """
+        try:
+            return bool(
+                await self._acquire_lease_script(
+                    keys=[self.LEASE_KEY], args=[self.token, self.lease_ttl_ms]
+                )
+            )
+        except redis.RedisError as e:
+            logger.error(f"Error acquiring lease {self.LEASE_KEY}: {e}")
+            return None
+
+    async def release_lease(self) -> None:
+        """
+        Release the lease, but only if this worker still holds it.
+        """
+        try:
+            await self._release_lease_script(keys=[self.LEASE_KEY], args=[self.token])
+        except redis.RedisError as e:
+            logger.error(f"Error releasing lease {self.LEASE_KEY}: {e}")
+
+    async def _stop_jobs(self) -> None:
+        for job in self._jobs:
+            job.cancel()
+        await asyncio.gather(*self._jobs, return_exceptions=True)
+        self._jobs = []
+
+    async def stop(self) -> None:
+        """
+        Stop the jobs and hand the lease over to another worker.
+        """
+        self.stop_event.set()
+        if self._runner is not None:
+            await self._runner
+            self._runner = None
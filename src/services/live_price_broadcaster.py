@@ -0,0 +1,162 @@
+import asyncio
+import os
+import time
+from collections.abc import AsyncIterator
+import orjson
+import redis
+from src.redis_cache.redis_cache import RedisCache
+from src.services.price_ingestion_service import PriceIngestionService
+from src.logger import logger
+
+KEEP_ALIVE: bytes = b": keep-alive\n\n"
+
+
+class LivePriceSubscription:
+    """
+    Price updates waiting to be sent to one streaming client.
+
+    Only the latest update of each coin is kept, so a client that reads slower
+    than prices change gets coalesced updates and never holds more than one
+    message per subscribed coin.
+    """
+
+    def __init__(self, coin_ids: list[str]):
+        self.coin_ids: list[str] = coin_ids
+        self._pending: dict[str, bytes] = {}
+        self._ready = asyncio.Event()
+
+    def push(self, coin_id: str, message: bytes) -> bool:
+        """
+        Queue a message, returning True when it replaced an unsent one.
+        """
+        replaced: bool = coin_id in self._pending
+        self._pending[coin_id] = message
+        self._ready.set()
+        return replaced
+
+    async def next(self, timeout: float) -> bytes:
+        """
+        Wait for the pending messages, or a keep-alive comment after `timeout`.
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return KEEP_ALIVE
+        self._ready.clear()
+        pending, self._pending = self._pending, {}
+        return b"".join(pending.values())
+
+
+class LivePriceBroadcaster:
+    """
+    Fan price ticks out to clients streaming them as Server-Sent Events.
+
+    The ingesting worker publishes each tick once to Redis, and every worker
+    relays it to its own clients. A price is encoded once per tick, however
+    many clients subscribe to its coin.
+    """
+
+    def __init__(
+        self,
+        cache: RedisCache | None = None,
+        keep_alive: float = float(os.getenv("LIVE_PRICES_KEEP_ALIVE", 15)),
+    ):
+        self.cache: RedisCache = cache or RedisCache()
+        self.keep_alive: float = keep_alive
+        self._subscriptions: dict[str, set[LivePriceSubscription]] = {}
+        self.clients: int = 0
+        self.stats: dict[str, float] = {
+            "ticks": 0,
+            "messages": 0,
+            "coalesced": 0,
+            "last_broadcast_ms": 0.0,
+        }
+
+    def subscribe(self, coin_ids: list[str]) -> LivePriceSubscription:
+        subscription = LivePriceSubscription(coin_ids)
+        for coin_id in coin_ids:
+            self._subscriptions.setdefault(coin_id, set()).add(subscription)
+        self.clients += 1
+        return subscription
+
+    def unsubscribe(self, subscription: LivePriceSubscription) -> None:
+        for coin_id in subscription.coin_ids:
+            subscriptions: set[LivePriceSubscription] | None = self._subscriptions.get(
+                coin_id
+            )
+            if subscriptions is None:
+                continue
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[coin_id]
+        self.clients -= 1
+
+    @staticmethod
+    def encode(coin_id: str, price: dict) -> bytes:
+        """
+        Encode a price as an SSE `price` event with the body of GET /coins/{id}/price.
+        """
+        data: bytes = orjson.dumps(
+            {
+                "id": coin_id,
+                "usd": price["usd"],
+                "updated_at": PriceIngestionService.updated_at(price),
+            }
+        )
+        return b"event: price\ndata: " + data + b"\n\n"
+
+    def broadcast(self, prices: dict[str, dict]) -> int:
+        """
+        Queue the prices for the clients subscribed to their coins.
+
+        Returns the number of messages queued.
+        """
+        start: float = time.perf_counter()
+        messages: int = 0
+        coalesced: int = 0
+        for coin_id, price in prices.items():
+            subscriptions: set[LivePriceSubscription] | None = self._subscriptions.get(
+                coin_id
+            )
+            if not subscriptions:
+                continue
+            message: bytes = self.encode(coin_id, price)
+            for subscription in subscriptions:
+                coalesced += subscription.push(coin_id, message)
+            messages += len(subscriptions)
+        self.stats["ticks"] += 1
+        self.stats["messages"] += messages
+        self.stats["coalesced"] += coalesced
+        self.stats["last_broadcast_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return messages
+
+    async def stream(self, coin_ids: list[str]) -> AsyncIterator[bytes]:
+        """
+        Yield the current prices of the coins, then every update, until the
+        client disconnects.
+        """
+        subscription: LivePriceSubscription = self.subscribe(coin_ids)
+        try:
+            for coin_id, price in (await self.cache.get_coin_prices(coin_ids)).items():
+                subscription.push(coin_id, self.encode(coin_id, price))
+            while True:
+                yield await subscription.next(self.keep_alive)
+        finally:
+            self.unsubscribe(subscription)
+
+    async def listen(self) -> None:
+        """
+        Broadcast the ticks published by any worker.
+
+        Runs until cancelled and resubscribes after connection errors.
+        """
+        while True:
+            try:
+                async with self.cache.client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.cache.price_updates_channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.broadcast(orjson.loads(message["data"]))
+            except redis.RedisError as e:
+                logger.error(f"Live price subscription failed: {e}")
+                await asyncio.sleep(1)
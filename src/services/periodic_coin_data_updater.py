@@ -1,49 +1,304 @@
 import asyncio
+import hashlib
+import os
+import time
+from collections.abc import Awaitable, Callable
+import orjson
 from src.coingecko.coingecko_coins_api import CoinGeckoAPI
+from src.coingecko.request_scheduler import RequestScheduler
+from src.metrics import COIN_LIST_SIZE, COIN_REFRESH_COINS, COIN_REFRESH_DURATION
 from src.redis_cache.redis_cache import RedisCache
+from src.services.coin_search_index import CoinSearchIndex
 from src.logger import logger
 
 
 class PeriodicCoinDataUpdater:
-    def __init__(self, interval: int = 86400, batch_size: int = 100):
-        self.api = CoinGeckoAPI()
+    def __init__(
+        self,
+        interval: int = int(os.getenv("COIN_UPDATE_INTERVAL", 86400)),
+        search_index_sync_interval: float = float(
+            os.getenv("SEARCH_INDEX_SYNC_INTERVAL", 30)
+        ),
+        batch_size: int = int(os.getenv("COIN_CACHE_BATCH_SIZE", 1000)),
+        target_write_rate: float = float(os.getenv("COIN_CACHE_WRITE_RATE", 0)),
+    ):
+        self.api = CoinGeckoAPI(priority=RequestScheduler.BACKGROUND)
         self.cache = RedisCache()
         self.interval: int = interval
         self.batch_size: int = batch_size
+        # Coins written per second, 0 disables throttling
+        self.target_write_rate: float = target_write_rate
         self.stop_event = asyncio.Event()
+        # Periodic and manual refreshes both run in the leader, one at a time
+        self.refresh_lock = asyncio.Lock()
+        # Replaced as a whole after every refresh, None until the first one
+        self.search_index: CoinSearchIndex | None = None
+        # Digest of the coin list snapshot the search index was built from
+        self.search_index_digest: str | None = None
+        self.search_index_sync_interval: float = search_index_sync_interval
+        # Measured by the last write, used to estimate the time saved by a diff
+        self._seconds_per_coin: float | None = None
 
     async def fetch_coin_list(self) -> list:
         logger.info("Fetching coin list from CoinGecko API...")
-        return self.api.get_coin_list()
+        return await self.api.get_coin_list()
 
-    async def cache_coin_data(self, coin_list: list) -> None:
+    async def cache_coin_data(
+        self,
+        coin_list: list,
+        checkpoint: Callable[[list, int], Awaitable[None]] | None = None,
+    ) -> dict[str, float]:
+        """
+        Write the coin list to Redis with one pipeline per batch.
+
+        `checkpoint` is awaited after every batch with the batch and the number
+        of its coins written. Returns the number of written coins, the wall time
+        and the achieved rate.
+        """
         logger.info("Caching coin data...")
-        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
-        tasks: list = []
-        for coin in coin_list:
-            coin_id: str = coin.get("id")
-            coin_symbol: str = coin.get("symbol")
-            coin_name: str = coin.get("name")
-            if coin_id and coin_symbol and coin_name:
-                tasks.append(
-                    loop.run_in_executor(
-                        None, self.cache.set_coin_cache, coin_id, coin_symbol, coin_name
+        start: float = time.perf_counter()
+        written: int = 0
+        for i in range(0, len(coin_list), self.batch_size):
+            batch: list = coin_list[i : i + self.batch_size]
+            batch_written: int = await self.cache.set_coins_cache(batch)
+            written += batch_written
+            if checkpoint is not None:
+                await checkpoint(batch, batch_written)
+            await self._throttle(written, start)
+        elapsed: float = time.perf_counter() - start
+        stats: dict[str, float] = {
+            "coins": written,
+            "seconds": elapsed,
+            "coins_per_second": written / elapsed if elapsed else 0.0,
+        }
+        if written:
+            self._seconds_per_coin = elapsed / written
+        logger.info(
+            f"Cached {written} coins in {elapsed:.2f} s "
+            f"({stats['coins_per_second']:.0f} coins/s)"
+        )
+        return stats
+
+    async def _throttle(self, written: int, start: float) -> None:
+        """
+        Sleep just long enough to keep the writes at the target rate.
+        """
+        if not self.target_write_rate:
+            return
+        ahead: float = written / self.target_write_rate - (time.perf_counter() - start)
+        if ahead > 0:
+            await asyncio.sleep(ahead)
+
+    @staticmethod
+    def fingerprint(coin: dict[str, str]) -> str:
+        """
+        Hash of the cached fields of a coin.
+        """
+        content: bytes = f"{coin['symbol']}\0{coin['name']}".encode()
+        return hashlib.blake2b(content, digest_size=8).hexdigest()
+
+    @staticmethod
+    def snapshot_digest(fingerprints: dict[str, str]) -> str:
+        """
+        Hash of a whole coin list, independent of the order of the coins.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for id in sorted(fingerprints):
+            digest.update(f"{id}\0{fingerprints[id]}\n".encode())
+        return digest.hexdigest()
+
+    async def apply_coin_list(
+        self,
+        coin_list: list,
+        progress: Callable[[int, int], Awaitable[None]] | None = None,
+    ) -> dict[str, float]:
+        """
+        Bring the Redis coin cache in line with a fresh coin list by writing
+        only added and modified coins and deleting removed ones.
+
+        The fingerprints of the applied list are kept in Redis, so the diff
+        also works across restarts and workers. The fingerprints of each fully
+        written batch are stored right away as a checkpoint, so an interrupted
+        run is resumed by the next one, while the digest is only updated once
+        all writes succeeded. `progress` is awaited after every batch with the
+        coins processed so far and the coins to write.
+        """
+        start: float = time.perf_counter()
+        coins: dict[str, dict] = {
+            coin["id"]: coin
+            for coin in coin_list
+            if coin.get("id") and coin.get("symbol") and coin.get("name")
+        }
+        fingerprints: dict[str, str] = {
+            id: self.fingerprint(coin) for id, coin in coins.items()
+        }
+        digest: str = self.snapshot_digest(fingerprints)
+        previous_digest, previous = await self.cache.get_coin_list_fingerprints()
+        stats: dict[str, float] = {"coins": len(coins)}
+        if digest == previous_digest:
+            stats.update(added=0, modified=0, removed=0, written=0)
+        else:
+            changed: dict[str, str] = {
+                id: fingerprint
+                for id, fingerprint in fingerprints.items()
+                if previous.get(id) != fingerprint
+            }
+            removed: list[str] = [id for id in previous if id not in fingerprints]
+            processed: int = 0
+
+            async def checkpoint(batch: list, written: int) -> None:
+                nonlocal processed
+                processed += len(batch)
+                if written == len(batch):
+                    await self.cache.add_coin_list_fingerprints(
+                        {coin["id"]: changed[coin["id"]] for coin in batch}
                     )
+                if progress is not None:
+                    await progress(processed, len(changed))
+
+            write_stats: dict[str, float] = await self.cache_coin_data(
+                [coins[id] for id in changed], checkpoint
+            )
+            deleted: int = await self.cache.delete_coins(removed)
+            stats.update(
+                added=sum(id not in previous for id in changed),
+                modified=sum(id in previous for id in changed),
+                removed=deleted,
+                written=write_stats["coins"],
+            )
+            if write_stats["coins"] == len(changed) and deleted == len(removed):
+                await self.cache.set_coin_list_fingerprints(digest, changed, removed)
+            else:
+                logger.warning(
+                    "Not all coin list changes were applied, keeping the old "
+                    "fingerprints so the next refresh retries them"
                 )
-        await asyncio.gather(*tasks)
-        logger.info("Coin data cached successfully.")
+        stats["seconds"] = time.perf_counter() - start
+        for change in ("added", "modified", "removed", "written"):
+            COIN_REFRESH_COINS.labels(change).inc(stats[change])
+        COIN_LIST_SIZE.set(stats["coins"])
+        stats["estimated_seconds_saved"] = (
+            (len(coins) - stats["written"]) * self._seconds_per_coin
+            if self._seconds_per_coin
+            else 0.0
+        )
+        logger.info(
+            f"Applied coin list of {len(coins)} coins"
+            f"{' (unchanged, writes skipped)' if digest == previous_digest else ''}: "
+            f"{stats['added']} added, {stats['modified']} modified, "
+            f"{stats['removed']} removed in {stats['seconds']:.2f} s, "
+            f"about {stats['estimated_seconds_saved']:.2f} s saved over a full rewrite"
+        )
+        return stats
 
-    async def fetch_and_cache_coin_data(self):
-        coin_list: list = await self.fetch_coin_list()
-        for i in range(0, len(coin_list), self.batch_size):
-            batch: list = coin_list[i : i + self.batch_size]
-            await self.cache_coin_data(batch)
-            await asyncio.sleep(1)  # to reduce load
+    async def fetch_and_cache_coin_data(
+        self, progress: Callable[[int, int], Awaitable[None]] | None = None
+    ) -> dict[str, float]:
+        """
+        Refresh the coin cache and search index from CoinGecko, waiting for a
+        refresh already in progress to finish first.
+        """
+        if self.refresh_lock.locked():
+            logger.info("Waiting for the coin data refresh in progress")
+        async with self.refresh_lock:
+            return await self._fetch_and_cache_coin_data(progress)
+
+    async def _fetch_and_cache_coin_data(
+        self, progress: Callable[[int, int], Awaitable[None]] | None
+    ) -> dict[str, float]:
+        start: float = time.perf_counter()
+        result: str = "failed"
+        try:
+            coin_list: list = await self.fetch_coin_list()
+            if not coin_list:
+                # A failed download must not be applied as "every coin was removed"
+                logger.warning("Empty coin list, skipping the coin cache refresh")
+                result = "skipped"
+                return {"coins": 0}
+            stats: dict[str, float] = await self.apply_coin_list(coin_list, progress)
+            digest: str = await self.share_coin_list_snapshot(coin_list)
+            await self.rebuild_search_index(coin_list, digest)
+            result = "succeeded"
+            return stats
+        finally:
+            COIN_REFRESH_DURATION.labels(result).observe(time.perf_counter() - start)
+
+    async def share_coin_list_snapshot(self, coin_list: list) -> str:
+        """
+        Store the coin list in Redis for the search indexes of the other
+        workers, unless it is unchanged. Returns the digest of the snapshot.
+        """
+        snapshot: bytes = orjson.dumps(
+            [
+                (coin["id"], coin["symbol"], coin["name"])
+                for coin in coin_list
+                if coin.get("id") and coin.get("symbol") and coin.get("name")
+            ]
+        )
+        digest: str = hashlib.blake2b(snapshot, digest_size=16).hexdigest()
+        if digest != await self.cache.get_coin_list_snapshot_digest():
+            await self.cache.set_coin_list_snapshot(digest, snapshot)
+        return digest
+
+    async def sync_search_index(self) -> bool:
+        """
+        Rebuild the search index from the snapshot shared by the worker that
+        last refreshed the coin list, if it changed since the last build.
+        """
+        digest: str | None = await self.cache.get_coin_list_snapshot_digest()
+        if digest is None or digest == self.search_index_digest:
+            return False
+        snapshot: str | None = await self.cache.get_coin_list_snapshot()
+        if not snapshot:
+            return False
+        coin_list: list[dict[str, str]] = [
+            {"id": id, "symbol": symbol, "name": name}
+            for id, symbol, name in orjson.loads(snapshot)
+        ]
+        await self.rebuild_search_index(coin_list, digest)
+        return True
+
+    async def search_index_sync_task(self):
+        while not self.stop_event.is_set():
+            try:
+                await self.sync_search_index()
+            except Exception as e:
+                logger.error(f"Search index sync failed: {e}")
+            try:
+                await asyncio.wait_for(
+                    self.stop_event.wait(), self.search_index_sync_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def rebuild_search_index(
+        self, coin_list: list, digest: str | None = None
+    ) -> None:
+        """
+        Build a search index over the coin list and swap it in.
+        """
+        start: float = time.perf_counter()
+        search_index: CoinSearchIndex = await asyncio.to_thread(
+            CoinSearchIndex, coin_list
+        )
+        self.search_index = search_index
+        self.search_index_digest = digest
+        logger.info(
+            f"Built search index over {len(search_index)} coins in "
+            f"{time.perf_counter() - start:.2f} s "
+            f"({search_index.memory_bytes() / 1024 / 1024:.1f} MiB)"
+        )
 
     async def periodic_task(self):
         while not self.stop_event.is_set():
-            await self.fetch_and_cache_coin_data()
-            await asyncio.sleep(self.interval)
+            try:
+                await self.fetch_and_cache_coin_data()
+            except Exception as e:
+                logger.error(f"Coin data update failed: {e}")
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
 
     async def stop(self):
         self.stop_event.set()
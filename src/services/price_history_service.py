@@ -0,0 +1,347 @@
+import asyncio
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import Table, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from src.database_utils.connection import DatabaseConnection
+from src.models.price_history import (
+    price_history,
+    price_ohlc_1d,
+    price_ohlc_1h,
+    price_ohlc_1m,
+)
+from src.logger import logger
+
+# Each rollup recomputes, in UTC, the buckets holding a tick recorded since
+# :since, however old the tick's own timestamp, so reruns are idempotent
+ROLLUP_STATEMENT: str = """
+INSERT INTO {target} (coin_id, bucket, open, high, low, close)
+SELECT source.coin_id, date_trunc('{unit}', source.{at}, 'UTC'),
+       (array_agg(source.{open} ORDER BY source.{at}))[1], max(source.{high}),
+       min(source.{low}), (array_agg(source.{close} ORDER BY source.{at} DESC))[1]
+FROM {source} source
+JOIN (
+    SELECT DISTINCT coin_id, date_trunc('{unit}', ts, 'UTC') AS bucket
+    FROM price_history
+    WHERE recorded_at >= :since
+) changed ON changed.coin_id = source.coin_id
+    AND source.{at} >= changed.bucket
+    AND source.{at} < changed.bucket + interval '{width}'
+GROUP BY 1, 2
+ON CONFLICT (coin_id, bucket) DO UPDATE SET open = excluded.open,
+    high = excluded.high, low = excluded.low, close = excluded.close
+"""
+
+ROLLUP_STATEMENTS: tuple[str, ...] = (
+    ROLLUP_STATEMENT.format(
+        target="price_ohlc_1m",
+        source="price_history",
+        at="ts",
+        open="price",
+        high="price",
+        low="price",
+        close="price",
+        unit="minute",
+        width="1 minute",
+    ),
+    *(
+        ROLLUP_STATEMENT.format(
+            target=target,
+            source=source,
+            at="bucket",
+            open="open",
+            high="high",
+            low="low",
+            close="close",
+            unit=unit,
+            width=width,
+        )
+        for target, source, unit, width in (
+            ("price_ohlc_1h", "price_ohlc_1m", "hour", "1 hour"),
+            # A day of 24 hours, whatever the time zone of the session
+            ("price_ohlc_1d", "price_ohlc_1h", "day", "24 hours"),
+        )
+    ),
+)
+
+GET_ROLLUP_WATERMARK: str = """
+SELECT recorded_at FROM price_rollup_watermark WHERE name = 'ohlc'
+"""
+
+SET_ROLLUP_WATERMARK: str = """
+INSERT INTO price_rollup_watermark (name, recorded_at) VALUES ('ohlc', :recorded_at)
+ON CONFLICT (name) DO UPDATE SET recorded_at = excluded.recorded_at
+"""
+
+# Ticks are stamped with the start of their transaction, which may commit
+# after a rollup ran, so each rollup also rereads this much before the last
+ROLLUP_WATERMARK_LAG: timedelta = timedelta(minutes=5)
+
+LIST_PARTITIONS: str = """
+SELECT child.relname
+FROM pg_inherits
+JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+WHERE parent.relname = :table
+"""
+
+
+class PriceHistoryService:
+    """
+    Store raw price ticks in daily partitions and keep 1-minute, 1-hour and
+    1-day OHLC rollups of them.
+
+    Old raw and 1-minute partitions are dropped as a whole once they fall out
+    of their retention, which costs no more than dropping a table.
+    """
+
+    # Partitioned table -> partition period, "day" or "month"
+    PARTITIONS: dict[str, str] = {
+        "price_history": "day",
+        "price_ohlc_1m": "day",
+        "price_ohlc_1h": "month",
+    }
+    # Resolution -> (table, time column), from the finest to the coarsest
+    RESOLUTIONS: dict[str, tuple[Table, str]] = {
+        "raw": (price_history, "ts"),
+        "1m": (price_ohlc_1m, "bucket"),
+        "1h": (price_ohlc_1h, "bucket"),
+        "1d": (price_ohlc_1d, "bucket"),
+    }
+
+    def __init__(
+        self,
+        raw_retention_days: int = int(os.getenv("PRICE_HISTORY_RAW_RETENTION_DAYS", 7)),
+        minute_retention_days: int = int(
+            os.getenv("PRICE_HISTORY_1M_RETENTION_DAYS", 90)
+        ),
+        max_points: int = int(os.getenv("PRICE_HISTORY_MAX_POINTS", 1000)),
+        tick_interval: float = float(os.getenv("PRICE_TICK_INTERVAL", 60)),
+        rollup_interval: float = float(os.getenv("PRICE_ROLLUP_INTERVAL", 60)),
+        partitions_ahead: int = 2,
+    ):
+        self.retention: dict[str, timedelta] = {
+            "price_history": timedelta(days=raw_retention_days),
+            "price_ohlc_1m": timedelta(days=minute_retention_days),
+        }
+        self.max_points: int = max_points
+        # Seconds between two points of each resolution
+        self.point_seconds: dict[str, float] = {
+            "raw": tick_interval or 60,
+            "1m": 60,
+            "1h": 3600,
+            "1d": 86400,
+        }
+        self.rollup_interval: float = rollup_interval
+        self.partitions_ahead: int = partitions_ahead
+        # Partitions known to exist, so ticks only create the missing ones
+        self._partitions: set[str] = set()
+        self.stop_event = asyncio.Event()
+
+    @staticmethod
+    def partition_bounds(period: str, day: date) -> tuple[date, date]:
+        """
+        First day of the partition holding `day` and first day of the next one.
+        """
+        if period == "day":
+            return day, day + timedelta(days=1)
+        start: date = day.replace(day=1)
+        return start, (start + timedelta(days=32)).replace(day=1)
+
+    @staticmethod
+    def partition_name(table: str, start: date) -> str:
+        return f"{table}_p{start:%Y%m%d}"
+
+    async def ensure_partitions(
+        self,
+        connection: AsyncConnection,
+        now: datetime | None = None,
+        days: set[date] | None = None,
+    ) -> None:
+        """
+        Create the partitions for today, the next `partitions_ahead` days and
+        the given UTC days.
+        """
+        today: date = (now or datetime.now(timezone.utc)).date()
+        wanted: set[date] = {
+            today + timedelta(days=ahead) for ahead in range(self.partitions_ahead + 1)
+        } | (days or set())
+        created: list[str] = []
+        for table, period in self.PARTITIONS.items():
+            for day in sorted(wanted):
+                start, end = self.partition_bounds(period, day)
+                name: str = self.partition_name(table, start)
+                if name in self._partitions:
+                    continue
+                # Bounds in UTC, whatever the time zone of the session
+                await connection.execute(
+                    text(
+                        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                        f"FOR VALUES FROM ('{start} 00:00+00') TO ('{end} 00:00+00')"
+                    )
+                )
+                self._partitions.add(name)
+                created.append(name)
+        if created:
+            logger.info(f"Price history partitions ready: {created}")
+
+    async def drop_expired_partitions(
+        self, connection: AsyncConnection, now: datetime | None = None
+    ) -> list[str]:
+        """
+        Drop the partitions that ended before the retention of their table.
+        """
+        now = now or datetime.now(timezone.utc)
+        dropped: list[str] = []
+        for table, retention in self.retention.items():
+            result = await connection.execute(text(LIST_PARTITIONS), {"table": table})
+            for name in result.scalars().all():
+                start: date = datetime.strptime(
+                    name.rsplit("_p", 1)[1], "%Y%m%d"
+                ).date()
+                _, end = self.partition_bounds(self.PARTITIONS[table], start)
+                if end <= (now - retention).date():
+                    await connection.execute(text(f"DROP TABLE {name}"))
+                    self._partitions.discard(name)
+                    dropped.append(name)
+        if dropped:
+            logger.info(f"Dropped expired price history partitions: {dropped}")
+        return dropped
+
+    async def record_prices(
+        self, connection: AsyncConnection, ticks: list[tuple[str, datetime, float]]
+    ) -> int:
+        """
+        Append raw (coin_id, ts, price) ticks with a single COPY, creating the
+        partitions of the days they fall on.
+
+        Ticks are stamped with the time CoinGecko last updated the price, which
+        may be days ago for a stale coin. Ticks older than the raw retention
+        would only be dropped again and are skipped.
+        """
+        oldest: datetime = datetime.now(timezone.utc) - self.retention["price_history"]
+        kept: list[tuple[str, datetime, float]] = [
+            tick for tick in ticks if tick[1] >= oldest
+        ]
+        if len(kept) < len(ticks):
+            logger.warning(
+                f"Skipped {len(ticks) - len(kept)} price ticks older than the raw "
+                "price history retention"
+            )
+        if not kept:
+            return 0
+        await self.ensure_partitions(
+            connection,
+            days={ts.astimezone(timezone.utc).date() for _, ts, _ in kept},
+        )
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            "price_history", records=kept, columns=("coin_id", "ts", "price")
+        )
+        return len(kept)
+
+    async def refresh_rollups(self, connection: AsyncConnection) -> None:
+        """
+        Roll up the ticks recorded since the last run, from the finest to the
+        coarsest resolution.
+        """
+        since: datetime | None = await connection.scalar(text(GET_ROLLUP_WATERMARK))
+        started: datetime = await connection.scalar(text("SELECT now()"))
+        for statement in ROLLUP_STATEMENTS:
+            await connection.execute(
+                text(statement),
+                {"since": since or datetime.min.replace(tzinfo=timezone.utc)},
+            )
+        await connection.execute(
+            text(SET_ROLLUP_WATERMARK),
+            {"recorded_at": started - ROLLUP_WATERMARK_LAG},
+        )
+
+    def choose_resolution(
+        self, start: datetime, end: datetime, now: datetime | None = None
+    ) -> str:
+        """
+        Pick the finest resolution that is still retained for the whole range
+        and returns at most `max_points` points, falling back to daily rollups.
+        """
+        now = now or datetime.now(timezone.utc)
+        seconds: float = (end - start).total_seconds()
+        for resolution, (table, _) in self.RESOLUTIONS.items():
+            retention: timedelta | None = self.retention.get(table.name)
+            if retention and start < now - retention:
+                continue
+            if seconds / self.point_seconds[resolution] <= self.max_points:
+                return resolution
+        return "1d"
+
+    def count_points(self, start: datetime, end: datetime, resolution: str) -> float:
+        return (end - start).total_seconds() / self.point_seconds[resolution]
+
+    async def get_history(
+        self,
+        session: AsyncSession,
+        coin_id: str,
+        start: datetime,
+        end: datetime,
+        resolution: str,
+    ) -> list[dict]:
+        """
+        Return the OHLC points of a coin in [start, end) at the given resolution.
+
+        Raw ticks are returned as points whose open, high, low and close are
+        all the tick price.
+        """
+        table, time_column = self.RESOLUTIONS[resolution]
+        at = table.c[time_column]
+        if resolution == "raw":
+            columns = (
+                at,
+                *(
+                    table.c.price.label(name)
+                    for name in ("open", "high", "low", "close")
+                ),
+            )
+        else:
+            columns = (at, table.c.open, table.c.high, table.c.low, table.c.close)
+        result = await session.execute(
+            select(*columns)
+            .where(table.c.coin_id == coin_id, at >= start, at < end)
+            .order_by(at)
+        )
+        return [
+            {"t": t, "open": open, "high": high, "low": low, "close": close}
+            for t, open, high, low, close in result.all()
+        ]
+
+    async def run_maintenance(self) -> None:
+        """
+        Create upcoming partitions, refresh the rollups and drop expired data.
+        """
+        start: float = time.perf_counter()
+        engine = DatabaseConnection.get_shared().engine
+        async with engine.connect() as connection:
+            connection = await connection.execution_options(
+                isolation_level="AUTOCOMMIT"
+            )
+            await self.ensure_partitions(connection)
+            await self.refresh_rollups(connection)
+            await self.drop_expired_partitions(connection)
+        logger.info(
+            f"Price history maintenance took {time.perf_counter() - start:.2f} s"
+        )
+
+    async def maintenance_task(self):
+        while not self.stop_event.is_set():
+            try:
+                await self.run_maintenance()
+            except Exception as e:
+                logger.error(f"Price history maintenance failed: {e}")
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), self.rollup_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self):
+        self.stop_event.set()
+        logger.info("Price history maintenance stopped.")
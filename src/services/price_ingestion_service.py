@@ -0,0 +1,140 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+import asyncpg
+from sqlalchemy.exc import SQLAlchemyError
+from src.coingecko.coingecko_coins_api import CoinGeckoAPI
+from src.coingecko.request_scheduler import RequestScheduler
+from src.database_utils.connection import DatabaseConnection
+from src.redis_cache.redis_cache import RedisCache
+from src.services.alert_engine import AlertEngine
+from src.services.coin_service import CoinService
+from src.services.price_history_service import PriceHistoryService
+from src.logger import logger
+
+
+class PriceIngestionService:
+    """
+    Periodically fetch the USD price of every coin in the coin table.
+
+    Prices are fetched in as few multi-id /simple/price requests as possible,
+    stored in Redis for current-price reads, bulk-written to Postgres and
+    appended to the price history. Each tick is then checked against the
+    target prices of the coins for alerts.
+    """
+
+    def __init__(
+        self,
+        interval: float = float(os.getenv("PRICE_TICK_INTERVAL", 60)),
+        history: PriceHistoryService | None = None,
+        alerts: AlertEngine | None = None,
+    ):
+        self.api = CoinGeckoAPI(priority=RequestScheduler.BACKGROUND)
+        self.cache = RedisCache()
+        self.history: PriceHistoryService = history or PriceHistoryService()
+        self.alerts: AlertEngine = alerts or AlertEngine(self.cache)
+        # Update time of the last recorded tick per coin, so a price CoinGecko
+        # has not updated since the previous tick is not recorded twice
+        self._recorded_at: dict[str, datetime] = {}
+        # Seconds between the starts of two ticks
+        self.interval: float = interval
+        self.stop_event = asyncio.Event()
+        self.last_tick: dict[str, float] | None = None
+
+    async def ingest_prices(self) -> dict[str, float]:
+        """
+        Run one tick: fetch, cache and store the prices of all tracked coins.
+
+        Returns the number of tracked and priced coins, the wall time and the
+        achieved rate.
+        """
+        start: float = time.perf_counter()
+        database: DatabaseConnection = DatabaseConnection.get_shared()
+        async with database.async_session() as session:
+            targets: list[tuple[str, float | None]] = (
+                await CoinService.get_price_targets(session)
+            )
+        coin_ids: list[str] = [id for id, _ in targets]
+        prices: dict[str, dict] = (
+            await self.api.get_prices(coin_ids) if coin_ids else {}
+        )
+        await self.cache.set_coin_prices(prices)
+        rows: list[dict] = [
+            {
+                "coin_id": id,
+                "price": price["usd"],
+                "updated_at": self.updated_at(price),
+            }
+            for id, price in prices.items()
+        ]
+        ticks: list[tuple[str, datetime, float]] = [
+            (row["coin_id"], row["updated_at"], row["price"])
+            for row in rows
+            if self._recorded_at.get(row["coin_id"]) != row["updated_at"]
+        ]
+        # Live price streams only need the prices that changed
+        await self.cache.publish_prices({id: prices[id] for id, _, _ in ticks})
+        unrecorded: set[str] = set()
+        async with database.async_session() as session:
+            await CoinService.update_prices(session, rows)
+            # A failed COPY must not lose the prices or stop the alerts
+            try:
+                async with session.begin_nested():
+                    await self.history.record_prices(await session.connection(), ticks)
+            except (SQLAlchemyError, asyncpg.PostgresError) as e:
+                logger.error(f"Recording {len(ticks)} price ticks failed: {e}")
+                unrecorded = {id for id, _, _ in ticks}
+            await session.commit()
+        # Ticks that were not recorded are retried on the next tick
+        self._recorded_at = {
+            row["coin_id"]: row["updated_at"]
+            for row in rows
+            if row["coin_id"] not in unrecorded
+        }
+        self.alerts.load(targets)
+        alerts: list[dict] = self.alerts.evaluate(
+            {id: price["usd"] for id, price in prices.items()}
+        )
+        await self.alerts.publish(alerts)
+        elapsed: float = time.perf_counter() - start
+        stats: dict[str, float] = {
+            "coins": len(coin_ids),
+            "priced": len(prices),
+            "recorded": len(ticks) - len(unrecorded),
+            "alerts": len(alerts),
+            "seconds": elapsed,
+            "coins_per_second": len(prices) / elapsed if elapsed else 0.0,
+        }
+        self.last_tick = stats
+        logger.info(
+            f"Ingested prices of {len(prices)}/{len(coin_ids)} coins in "
+            f"{elapsed:.2f} s ({stats['coins_per_second']:.0f} coins/s)"
+        )
+        return stats
+
+    @staticmethod
+    def updated_at(price: dict) -> datetime:
+        if price.get("last_updated_at"):
+            return datetime.fromtimestamp(price["last_updated_at"], tz=timezone.utc)
+        return datetime.now(timezone.utc)
+
+    async def periodic_task(self):
+        while not self.stop_event.is_set():
+            start: float = time.monotonic()
+            try:
+                await self.ingest_prices()
+            except Exception as e:
+                logger.error(f"Price ingestion tick failed: {e}")
+            # Keep the ticks on schedule however long the last one took
+            try:
+                await asyncio.wait_for(
+                    self.stop_event.wait(),
+                    max(0.0, self.interval - (time.monotonic() - start)),
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self):
+        self.stop_event.set()
+        logger.info("Price ingestion service stopped.")
@@ -0,0 +1,111 @@
+import asyncio
+import os
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from src.redis_cache.redis_cache import RedisCache
+from src.logger import logger
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into a single execution.
+
+    Callers in the same worker await the in-flight call and share its result or
+    error. Across workers a short Redis lock elects one caller to do the work;
+    the others poll `read_shared` until the owner has published the result.
+    """
+
+    def __init__(
+        self,
+        redis_cache: RedisCache | None = None,
+        lock_ttl_ms: int = int(os.getenv("SINGLE_FLIGHT_LOCK_TTL_MS", 5000)),
+        poll_interval: float = 0.05,
+    ):
+        self.redis_cache: RedisCache | None = redis_cache
+        self.lock_ttl_ms: int = lock_ttl_ms
+        self.poll_interval: float = poll_interval
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self.stats: dict[str, int] = {
+            "calls": 0,
+            "executions": 0,
+            "coalesced_local": 0,
+            "coalesced_remote": 0,
+        }
+
+    async def do(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[dict]],
+        read_shared: Callable[[], Awaitable[dict]] | None = None,
+    ) -> dict:
+        """
+        Run `fetch` once for all concurrent callers using the same key.
+        """
+        self.stats["calls"] += 1
+        in_flight: asyncio.Future | None = self._in_flight.get(key)
+        if in_flight is not None:
+            self.stats["coalesced_local"] += 1
+            return await asyncio.shield(in_flight)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result: dict = await self._run(key, fetch, read_shared)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the error as retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+        future.set_result(result)
+        return result
+
+    async def _run(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[dict]],
+        read_shared: Callable[[], Awaitable[dict]] | None,
+    ) -> dict:
+        if self.redis_cache is None or read_shared is None:
+            return await self._execute(fetch)
+
+        lock_name: str = f"lock:single-flight:{key}"
+        token: str = uuid.uuid4().hex
+        if await self.redis_cache.acquire_lock(lock_name, token, self.lock_ttl_ms):
+            try:
+                return await self._execute(fetch)
+            finally:
+                await self.redis_cache.release_lock(lock_name, token)
+
+        shared: dict = await self._wait_for_shared(lock_name, read_shared)
+        if shared:
+            self.stats["coalesced_remote"] += 1
+            return shared
+        logger.info(f"No shared result for {key}, fetching it in this worker")
+        return await self._execute(fetch)
+
+    async def _execute(self, fetch: Callable[[], Awaitable[dict]]) -> dict:
+        self.stats["executions"] += 1
+        return await fetch()
+
+    async def _wait_for_shared(
+        self, lock_name: str, read_shared: Callable[[], Awaitable[dict]]
+    ) -> dict:
+        """
+        Poll for the result of another worker until its lock is released or expires.
+        """
+        deadline: float = time.monotonic() + self.lock_ttl_ms / 1000
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            shared: dict = await read_shared()
+            if shared:
+                return shared
+            if not await self.redis_cache.is_locked(lock_name):
+                # The owner may have published right before releasing the lock
+                return await read_shared()
+        return {}
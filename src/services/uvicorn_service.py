@@ -5,4 +5,14 @@ import uvicorn
 def run_uvicorn():
     uvicorn_host: str = os.getenv("UVICORN_HOST", "0.0.0.0")
     uvicorn_port: int = int(os.getenv("UVICORN_PORT", 8000))
-    uvicorn.run("main:app", host=uvicorn_host, port=uvicorn_port)
+    # Each worker is a process with its own pools, background jobs run in the
+    # worker elected leader
+    uvicorn_workers: int = int(os.getenv("UVICORN_WORKERS", 1))
+    # The factory builds the app in the server process, after the boot checks
+    uvicorn.run(
+        "main:create_app",
+        factory=True,
+        host=uvicorn_host,
+        port=uvicorn_port,
+        workers=uvicorn_workers,
+    )
@@ -0,0 +1,29 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+import asyncpg
+from src.alembic.alembic_migration import ensure_schema_at_head
+
+
+class TestEnsureSchemaAtHead(unittest.IsolatedAsyncioTestCase):
+
+    @patch("src.alembic.alembic_migration.run_alembic_migrations")
+    @patch("src.alembic.alembic_migration.get_head_revisions", return_value={"0002"})
+    async def test_schema_at_head_is_left_alone(self, mock_heads, mock_upgrade):
+        conn = AsyncMock()
+        conn.fetch.return_value = [{"version_num": "0002"}]
+
+        self.assertFalse(await ensure_schema_at_head(conn))
+        mock_upgrade.assert_not_awaited()
+
+    @patch("src.alembic.alembic_migration.run_alembic_migrations")
+    @patch("src.alembic.alembic_migration.get_head_revisions", return_value={"0002"})
+    async def test_unversioned_database_is_upgraded(self, mock_heads, mock_upgrade):
+        conn = AsyncMock()
+        conn.fetch.side_effect = asyncpg.UndefinedTableError("no alembic_version")
+
+        self.assertTrue(await ensure_schema_at_head(conn))
+        mock_upgrade.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+from src.services.alert_engine import AlertEngine
+
+
+class TestAlertEngine(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.cache = MagicMock()
+        self.cache.add_alerts = AsyncMock(return_value=1)
+        self.engine = AlertEngine(self.cache, dedup_ttl=3600, stream_maxlen=1000)
+        self.engine.load(
+            [
+                ("bitcoin", 60000.0),
+                ("ethereum", None),
+                ("solana", 150.0),
+            ]
+        )
+
+    def test_load_skips_missing_targets(self):
+        self.assertEqual(self.engine._targets, {"bitcoin": 60000.0, "solana": 150.0})
+        self.assertEqual(self.engine.stats["coins"], 2)
+
+    def test_first_price_only_sets_baseline(self):
+        self.assertEqual(self.engine.evaluate({"bitcoin": 80000.0}), [])
+
+    def test_rise_up_to_the_target_crosses_it(self):
+        self.engine.evaluate({"bitcoin": 59000.0})
+
+        events: list[dict] = self.engine.evaluate({"bitcoin": 60000.0})
+
+        self.assertEqual(
+            [(event["target_price"], event["direction"]) for event in events],
+            [(60000.0, "above")],
+        )
+        self.assertEqual(events[0]["previous_price"], 59000.0)
+
+    def test_fall_from_the_target_crosses_it(self):
+        self.engine.evaluate({"bitcoin": 60000.0})
+
+        events: list[dict] = self.engine.evaluate({"bitcoin": 59999.0})
+
+        self.assertEqual(
+            [(event["target_price"], event["direction"]) for event in events],
+            [(60000.0, "below")],
+        )
+
+    def test_move_on_one_side_of_the_target_crosses_nothing(self):
+        self.engine.evaluate({"bitcoin": 61000.0, "ethereum": 3000.0})
+
+        self.assertEqual(self.engine.evaluate({"bitcoin": 64000.0}), [])
+        # A coin missing from a tick keeps its previous price
+        self.assertEqual(self.engine.evaluate({}), [])
+        self.assertEqual(len(self.engine.evaluate({"bitcoin": 59000.0})), 1)
+        # Coins without a target never alert
+        self.assertEqual(self.engine.evaluate({"ethereum": 1.0}), [])
+
+    async def test_publish_keys_alerts_by_target_and_direction(self):
+        self.engine.evaluate({"bitcoin": 59000.0})
+        events: list[dict] = self.engine.evaluate({"bitcoin": 61000.0})
+
+        emitted: int = await self.engine.publish(events)
+
+        self.assertEqual(emitted, 1)
+        alerts, ttl, maxlen = self.cache.add_alerts.await_args.args
+        self.assertEqual(list(alerts), ["bitcoin:60000.0:above"])
+        self.assertEqual((ttl, maxlen), (3600, 1000))
+
+    async def test_publish_without_events(self):
+        self.assertEqual(await self.engine.publish([]), 0)
+        self.cache.add_alerts.assert_not_awaited()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.boot import BOOT_STARTED_AT_ENV, BootTimer, seconds_since_boot, warm_up_pools
+
+
+class TestBootTimer(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        patcher = patch.dict(
+            BootTimer.stats, {"ready_seconds": None, "first_request_seconds": None}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch.dict("os.environ", {BOOT_STARTED_AT_ENV: "0"})
+    async def test_records_first_http_request_only(self):
+        app = AsyncMock()
+        timer = BootTimer(app)
+
+        await timer({"type": "lifespan"}, None, None)
+        self.assertIsNone(BootTimer.stats["first_request_seconds"])
+        await timer({"type": "http"}, None, None)
+        first: float = BootTimer.stats["first_request_seconds"]
+        await timer({"type": "http"}, None, None)
+
+        self.assertGreater(first, 0)
+        self.assertEqual(BootTimer.stats["first_request_seconds"], first)
+        self.assertEqual(app.await_count, 3)
+
+    @patch.dict("os.environ", {}, clear=True)
+    def test_seconds_since_boot_without_start_mark(self):
+        self.assertIsNone(seconds_since_boot())
+
+    async def test_warm_up_failures_do_not_raise(self):
+        database = MagicMock()
+        database.engine.pool.size.return_value = 2
+        database.engine.connect.side_effect = OSError("refused")
+        redis_cache = MagicMock()
+        redis_cache.client.ping = AsyncMock(return_value=True)
+        with (
+            patch(
+                "src.database_utils.connection.DatabaseConnection.get_shared",
+                return_value=database,
+            ),
+            patch("src.redis_cache.redis_cache.RedisCache", return_value=redis_cache),
+            patch(
+                "src.coingecko.coingecko_coins_api.CoinGeckoAPI.ping",
+                AsyncMock(return_value=True),
+            ),
+        ):
+            await warm_up_pools()
+
+        self.assertEqual(redis_cache.client.ping.await_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
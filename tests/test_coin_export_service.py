@@ -0,0 +1,70 @@
+import unittest
+from collections import namedtuple
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from main import app
+from src.services.coin_export_service import CoinExportService
+
+CoinRow = namedtuple("CoinRow", ["id", "symbol", "name", "target_price"])
+
+
+class TestCoinExportService(unittest.TestCase):
+
+    def setUp(self):
+        self.rows: list[CoinRow] = [
+            CoinRow("bitcoin", "btc", "Bitcoin", 100000.0),
+            CoinRow("ethereum", "eth", "Ether, Classic", None),
+        ]
+
+    def test_encode_ndjson_one_line_per_row(self):
+        data: bytes = CoinExportService.encode_ndjson(self.rows)
+
+        self.assertEqual(
+            data,
+            b'{"id":"bitcoin","symbol":"btc","name":"Bitcoin","target_price":100000.0}\n'
+            b'{"id":"ethereum","symbol":"eth","name":"Ether, Classic","target_price":null}\n',
+        )
+
+    def test_encode_csv_quotes_values(self):
+        data: bytes = CoinExportService.encode_csv(self.rows)
+
+        self.assertEqual(
+            data,
+            b'bitcoin,btc,Bitcoin,100000.0\r\nethereum,eth,"Ether, Classic",\r\n',
+        )
+
+    def test_encode_empty_batch(self):
+        self.assertEqual(CoinExportService.encode_ndjson([]), b"")
+        self.assertEqual(CoinExportService.encode_csv([]), b"")
+
+
+class TestCoinExportRoute(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(app)
+
+    @patch("src.api.routes.coin_routes.coin_export_service.stream")
+    def test_export_streams_chunks(self, mock_stream):
+        async def stream(format: str):
+            yield b"id,symbol,name,target_price\r\n"
+            yield b"bitcoin,btc,Bitcoin,\r\n"
+
+        mock_stream.side_effect = stream
+
+        response = self.client.get("/coins/export", params={"format": "csv"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/csv"))
+        self.assertEqual(
+            response.content,
+            b"id,symbol,name,target_price\r\nbitcoin,btc,Bitcoin,\r\n",
+        )
+
+    def test_export_unknown_format(self):
+        response = self.client.get("/coins/export", params={"format": "xml"})
+
+        self.assertEqual(response.status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+from src.coingecko.coin_lookup_batcher import CoinLookupBatcher
+
+
+def make_coin(id: str) -> dict[str, str]:
+    return {"id": id, "symbol": id[:3], "name": id.title()}
+
+
+class TestCoinLookupBatcher(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.api = MagicMock()
+        self.api.get_coins_info = AsyncMock(
+            side_effect=lambda ids: {id: make_coin(id) for id in ids if id != "old"}
+        )
+        self.api.get_coin_info = AsyncMock(return_value={})
+        self.batcher = CoinLookupBatcher(self.api, window=0.005)
+
+    async def test_lookups_in_one_window_share_a_request(self):
+        results: list[dict] = await asyncio.gather(
+            self.batcher.load("bitcoin"),
+            self.batcher.load("ethereum"),
+            self.batcher.load("bitcoin"),
+        )
+
+        self.assertEqual(
+            [result["symbol"] for result in results], ["bit", "eth", "bit"]
+        )
+        self.api.get_coins_info.assert_awaited_once_with(["bitcoin", "ethereum"])
+        self.assertEqual(self.batcher.stats["batches"], 1)
+
+    async def test_full_batch_is_sent_without_waiting(self):
+        self.batcher.window = 60
+        self.batcher.max_batch_size = 2
+
+        results: list[dict] = await asyncio.wait_for(
+            asyncio.gather(self.batcher.load("bitcoin"), self.batcher.load("ethereum")),
+            timeout=1,
+        )
+
+        self.assertEqual(len(results), 2)
+
+    async def test_missing_ids_fall_back_to_single_lookup(self):
+        self.api.get_coin_info.return_value = make_coin("old")
+
+        result: dict = await self.batcher.load("old")
+
+        self.assertEqual(result["name"], "Old")
+        self.api.get_coin_info.assert_awaited_once_with("old")
+
+    async def test_unknown_coin_resolves_empty(self):
+        self.assertEqual(await self.batcher.load("old"), {})
+
+    async def test_error_is_raised_to_every_caller(self):
+        self.api.get_coins_info.side_effect = RuntimeError("boom")
+
+        results: list = await asyncio.gather(
+            self.batcher.load("bitcoin"),
+            self.batcher.load("old"),
+            return_exceptions=True,
+        )
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        # A failed batch is not retried id by id
+        self.api.get_coin_info.assert_not_awaited()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+import redis
+from src.services.coin_refresh_queue import CoinRefreshQueue, RedisJobQueue
+
+
+class TestCoinRefreshQueue(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.jobs = MagicMock()
+        self.jobs.enqueue = AsyncMock(side_effect=lambda job_id, *a: job_id)
+        self.jobs.get = AsyncMock(return_value={"attempts": "0"})
+        self.jobs.update = AsyncMock()
+        self.jobs.finish = AsyncMock()
+        self.jobs.hold_active = AsyncMock(return_value=True)
+        self.jobs.requeue_claimed = AsyncMock(return_value=[])
+        self.updater = MagicMock()
+        self.updater.fetch_and_cache_coin_data = AsyncMock(return_value={"coins": 3})
+        self.queue = CoinRefreshQueue(
+            self.updater, MagicMock(), job_ttl=60, active_ttl_ms=30
+        )
+        self.queue.jobs = self.jobs
+
+    async def test_enqueue_creates_job(self):
+        job_id, created = await self.queue.enqueue("click-1")
+
+        self.assertTrue(created)
+        self.assertEqual(self.jobs.enqueue.await_args.args[0], job_id)
+        self.assertEqual(self.jobs.enqueue.await_args.args[3:], (30, "click-1"))
+        self.assertEqual(self.queue.stats["queued"], 1)
+
+    async def test_enqueue_joins_running_job(self):
+        self.jobs.enqueue = AsyncMock(return_value="running-job")
+
+        job_id, created = await self.queue.enqueue()
+
+        self.assertEqual(job_id, "running-job")
+        self.assertFalse(created)
+        self.assertEqual(self.queue.stats["joined"], 1)
+
+    async def test_enqueue_redis_error(self):
+        self.jobs.enqueue = AsyncMock(return_value=None)
+
+        self.assertEqual(await self.queue.enqueue(), (None, False))
+
+    async def test_run_records_progress_and_success(self):
+        async def refresh(progress):
+            await progress(2, 4)
+            await progress(4, 4)
+            return {"coins": 4}
+
+        self.updater.fetch_and_cache_coin_data = AsyncMock(side_effect=refresh)
+
+        await self.queue.run("job")
+
+        running = self.jobs.update.await_args_list[0].args[1]
+        self.assertEqual((running["status"], running["attempts"]), ("running", 1))
+        last_progress = self.jobs.update.await_args_list[-1].args[1]
+        self.assertEqual((last_progress["processed"], last_progress["total"]), (4, 4))
+        job_id, outcome, ttl = self.jobs.finish.await_args.args
+        self.assertEqual((job_id, outcome["status"], ttl), ("job", "succeeded", 60))
+
+    async def test_run_keeps_the_job_active_while_it_runs(self):
+        async def refresh(progress):
+            await asyncio.sleep(0.05)
+            return {"coins": 0}
+
+        self.updater.fetch_and_cache_coin_data = AsyncMock(side_effect=refresh)
+
+        await self.queue.run("job")
+        renewals: int = self.jobs.hold_active.await_count
+        await asyncio.sleep(0.03)
+
+        self.assertGreaterEqual(renewals, 3)
+        self.assertEqual(self.jobs.hold_active.await_count, renewals)
+        self.jobs.hold_active.assert_awaited_with("job", 30)
+
+    async def test_run_records_failure(self):
+        self.updater.fetch_and_cache_coin_data = AsyncMock(
+            side_effect=RuntimeError("upstream down")
+        )
+
+        await self.queue.run("job")
+
+        outcome = self.jobs.finish.await_args.args[1]
+        self.assertEqual(outcome["status"], "failed")
+        self.assertEqual(outcome["error"], "upstream down")
+        self.assertEqual(self.queue.stats["failed"], 1)
+
+    async def test_consume_resumes_interrupted_jobs_first(self):
+        self.jobs.requeue_claimed = AsyncMock(return_value=["interrupted"])
+        claimed = asyncio.Event()
+
+        async def claim(timeout):
+            if claimed.is_set():
+                await asyncio.Event().wait()
+            claimed.set()
+            return "interrupted"
+
+        self.jobs.claim = AsyncMock(side_effect=claim)
+
+        consumer = asyncio.create_task(self.queue.consume())
+        await asyncio.wait_for(claimed.wait(), 1)
+        await asyncio.sleep(0)
+        consumer.cancel()
+        await asyncio.gather(consumer, return_exceptions=True)
+
+        self.jobs.update.assert_any_await("interrupted", {"status": "queued"})
+        self.assertEqual(self.queue.stats["resumed"], 1)
+        self.jobs.requeue_claimed.assert_awaited_once()
+        self.updater.fetch_and_cache_coin_data.assert_awaited_once()
+
+    async def test_consume_backs_off_while_redis_is_down(self):
+        self.jobs.claim = AsyncMock(side_effect=redis.RedisError("down"))
+        slept = asyncio.Event()
+
+        async def sleep(seconds):
+            slept.set()
+            await asyncio.Event().wait()
+
+        with patch("src.services.coin_refresh_queue.asyncio.sleep", side_effect=sleep):
+            consumer = asyncio.create_task(self.queue.consume())
+            await asyncio.wait_for(slept.wait(), 1)
+        consumer.cancel()
+        await asyncio.gather(consumer, return_exceptions=True)
+
+        self.jobs.claim.assert_awaited_once()
+
+    def test_describe_job(self):
+        job: dict = CoinRefreshQueue.describe(
+            "job",
+            {
+                "status": "running",
+                "created_at": "1700000000.0",
+                "started_at": "1700000001.0",
+                "attempts": "1",
+                "processed": "250",
+                "total": "1000",
+                "coins_per_second": "125.0",
+            },
+        )
+
+        self.assertEqual(job["progress"], 0.25)
+        self.assertEqual(job["coins_per_second"], 125.0)
+        self.assertIsNone(job["finished_at"])
+
+    def test_describe_finished_job_without_changes(self):
+        job: dict = CoinRefreshQueue.describe(
+            "job", {"status": "succeeded", "created_at": "1700000000.0"}
+        )
+
+        self.assertEqual(job["progress"], 1.0)
+
+
+class TestRedisJobQueue(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.jobs = RedisJobQueue(MagicMock(), "refresh")
+
+    async def test_enqueue_without_idempotency_key_dedups_on_active_job(self):
+        self.jobs._enqueue_script = AsyncMock(return_value="running")
+
+        job_id: str | None = await self.jobs.enqueue(
+            "new", {"status": "queued"}, 60, 30000
+        )
+
+        self.assertEqual(job_id, "running")
+        kwargs = self.jobs._enqueue_script.await_args.kwargs
+        self.assertEqual(
+            kwargs["keys"],
+            [
+                "jobs:refresh:active",
+                "jobs:refresh:pending",
+                "jobs:refresh:job:new",
+                "jobs:refresh:active",
+            ],
+        )
+        self.assertEqual(kwargs["args"], ["new", 60, 30000, "status", "queued"])
+
+    async def test_enqueue_with_idempotency_key(self):
+        self.jobs._enqueue_script = AsyncMock(return_value="new")
+
+        await self.jobs.enqueue("new", {}, 60, 30000, "click-1")
+
+        keys = self.jobs._enqueue_script.await_args.kwargs["keys"]
+        self.assertEqual(keys[3], "jobs:refresh:idempotency:click-1")
+
+    async def test_enqueue_redis_error(self):
+        self.jobs._enqueue_script = AsyncMock(side_effect=redis.RedisError("down"))
+
+        self.assertIsNone(await self.jobs.enqueue("new", {}, 60, 30000))
+
+    async def test_hold_active_renews_the_active_key(self):
+        self.jobs._hold_active_script = AsyncMock(return_value=1)
+
+        self.assertTrue(await self.jobs.hold_active("job", 30000))
+        self.jobs._hold_active_script.assert_awaited_once_with(
+            keys=["jobs:refresh:active"], args=["job", 30000]
+        )
+
+    async def test_requeue_claimed(self):
+        self.jobs.client.lmove = AsyncMock(side_effect=["a", "b", None])
+
+        self.assertEqual(await self.jobs.requeue_claimed(), ["a", "b"])
+        self.jobs.client.lmove.assert_awaited_with(
+            "jobs:refresh:claimed", "jobs:refresh:pending", "LEFT", "RIGHT"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
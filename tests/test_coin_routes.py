@@ -0,0 +1,439 @@
+import unittest
+import httpx
+from collections import namedtuple
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock, patch
+from main import app
+from src.dependencies import get_db
+from src.models.coin import Coin as SQLAlchemyCoin
+from src.schemas.coin import CoinCreate, CoinUpdate
+from src.services.coin_search_index import CoinSearchIndex
+from src.services.coin_serializer import CoinSerializer
+from src.services.coin_service import CoinService
+
+CoinRow = namedtuple("CoinRow", CoinSerializer.FIELDS)
+
+
+class TestCoinRoutes(unittest.TestCase):
+
+    def setUp(self):
+        self.session = MagicMock()
+        app.dependency_overrides[get_db] = lambda: self.session
+        self.client = TestClient(app)
+        self.response_cache = MagicMock()
+        self.response_cache.get_coin = AsyncMock(return_value=(None, "0"))
+        self.response_cache.get_list = AsyncMock(return_value=(None, "0"))
+        self.response_cache.set_coin = AsyncMock(return_value='"etag"')
+        self.response_cache.set_list = AsyncMock(return_value='"etag"')
+        self.response_cache.invalidate_coins = AsyncMock()
+        patcher = patch(
+            "src.api.routes.coin_routes.response_cache", self.response_cache
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        app.dependency_overrides.clear()
+
+    @patch("src.api.routes.coin_routes.CoinService.insert_coins")
+    @patch("src.api.routes.coin_routes.coin_update_service.update_coins_data")
+    def test_create_coins_bulk_reports_each_coin(self, mock_validate, mock_insert):
+        mock_validate.return_value = (
+            [
+                CoinCreate(id="bitcoin", symbol="btc", name="Bitcoin"),
+                CoinCreate(id="ethereum", symbol="eth", name="Ethereum"),
+            ],
+            ["unknown"],
+            ["solana"],
+        )
+        mock_insert.return_value = {"bitcoin"}
+
+        response = self.client.post(
+            "/coins/bulk",
+            json=[
+                {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"},
+                {"id": "ethereum", "symbol": "eth", "name": "Ethereum"},
+                {"id": "unknown", "symbol": "unk", "name": "Unknown"},
+                {"id": "solana", "symbol": "sol", "name": "Solana"},
+                {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"},
+            ],
+        )
+
+        self.assertEqual(response.status_code, 200)
+        body: dict = response.json()
+        self.assertEqual((body["created"], body["failed"]), (1, 4))
+        self.assertEqual(
+            [item["status"] for item in body["items"]],
+            ["created", "already_exists", "not_found", "upstream_error", "duplicate"],
+        )
+        self.assertEqual(len(mock_validate.await_args.args[0]), 4)
+
+    @patch("src.api.routes.coin_routes.BULK_IMPORT_MAX_COINS", 1)
+    def test_create_coins_bulk_too_many_coins(self):
+        response = self.client.post(
+            "/coins/bulk",
+            json=[
+                {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"},
+                {"id": "ethereum", "symbol": "eth", "name": "Ethereum"},
+            ],
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    @patch("src.api.routes.coin_routes.CoinService.create_coin")
+    @patch("src.api.routes.coin_routes.coin_update_service.update_coin_data")
+    def test_create_coin_single_statement(self, mock_validate, mock_create):
+        coin = CoinCreate(id="bitcoin", symbol="btc", name="Bitcoin")
+        mock_validate.return_value = coin
+        mock_create.return_value = coin
+
+        response = self.client.post("/coins/", json=coin.model_dump())
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["id"], "bitcoin")
+        mock_create.assert_awaited_once_with(self.session, coin.model_dump())
+
+    @patch("src.api.routes.coin_routes.CoinService.create_coin")
+    @patch("src.api.routes.coin_routes.coin_update_service.update_coin_data")
+    def test_create_coin_conflict(self, mock_validate, mock_create):
+        mock_validate.return_value = CoinCreate(
+            id="bitcoin", symbol="btc", name="Bitcoin"
+        )
+        mock_create.return_value = None
+
+        response = self.client.post(
+            "/coins/", json={"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"}
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    @patch("src.api.routes.coin_routes.CoinService.get_coin_by_id")
+    @patch("src.api.routes.coin_routes.coin_update_service.update_coin_data")
+    def test_create_coin_not_found_upstream(self, mock_validate, mock_get):
+        mock_validate.side_effect = ValueError("Coin ID unknown not found")
+        mock_get.return_value = None
+
+        response = self.client.post(
+            "/coins/", json={"id": "unknown", "symbol": "unk", "name": "Unknown"}
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    @patch("src.api.routes.coin_routes.CoinService.get_coin_by_id")
+    @patch("src.api.routes.coin_routes.coin_update_service.update_coin_data")
+    def test_create_coin_upstream_error(self, mock_validate, mock_get):
+        mock_validate.side_effect = httpx.HTTPStatusError(
+            "429", request=MagicMock(), response=MagicMock()
+        )
+        mock_get.return_value = None
+
+        response = self.client.post(
+            "/coins/", json={"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"}
+        )
+
+        self.assertEqual(response.status_code, 503)
+
+    @patch("src.api.routes.coin_routes.CoinService.get_coin_by_id")
+    @patch("src.api.routes.coin_routes.coin_update_service.update_coin_data")
+    def test_create_existing_coin_while_upstream_fails(self, mock_validate, mock_get):
+        mock_validate.side_effect = httpx.ConnectError("refused")
+        mock_get.return_value = MagicMock()
+
+        response = self.client.post(
+            "/coins/", json={"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"}
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["detail"], "Coin with this ID already exists")
+
+    @patch("src.api.routes.coin_routes.CoinService.update_coin")
+    @patch("src.api.routes.coin_routes.coin_update_service.update_coin_data")
+    def test_update_coin_sends_only_set_fields(self, mock_validate, mock_update):
+        mock_validate.side_effect = lambda coin: coin
+        mock_update.return_value = CoinCreate(
+            id="bitcoin", symbol="btc", name="Bitcoin", target_price=5.0
+        )
+
+        response = self.client.put("/coins/bitcoin", json={"target_price": 5.0})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            mock_update.await_args.args[2], {"id": "bitcoin", "target_price": 5.0}
+        )
+
+    @patch("src.api.routes.coin_routes.CoinService.update_coin")
+    @patch("src.api.routes.coin_routes.coin_update_service.update_coin_data")
+    def test_update_missing_coin(self, mock_validate, mock_update):
+        mock_validate.side_effect = lambda coin: coin
+        mock_update.return_value = None
+
+        response = self.client.put("/coins/unknown", json={"target_price": 5.0})
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()["detail"], "Coin with this ID not found")
+
+    @patch("src.api.routes.coin_routes.CoinService.get_coin_by_id")
+    @patch("src.api.routes.coin_routes.CoinService.update_coin")
+    @patch("src.api.routes.coin_routes.coin_update_service.update_coin_data")
+    def test_update_missing_coin_unknown_upstream(
+        self, mock_validate, mock_update, mock_get
+    ):
+        mock_validate.side_effect = ValueError("Coin ID unknown not found")
+        mock_get.return_value = None
+
+        response = self.client.put("/coins/unknown", json={"target_price": 5.0})
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()["detail"], "Coin with this ID not found")
+        mock_update.assert_not_awaited()
+
+    @patch("src.api.routes.coin_routes.CoinService.delete_coin")
+    def test_delete_coin(self, mock_delete):
+        mock_delete.return_value = True
+
+        response = self.client.delete("/coins/bitcoin")
+
+        self.assertEqual(response.status_code, 200)
+        self.response_cache.invalidate_coins.assert_awaited_once_with(["bitcoin"])
+
+    @patch("src.api.routes.coin_routes.CoinService.delete_coin")
+    def test_delete_missing_coin(self, mock_delete):
+        mock_delete.return_value = False
+
+        response = self.client.delete("/coins/unknown")
+
+        self.assertEqual(response.status_code, 404)
+
+    @patch("src.api.routes.coin_routes.CoinService.handle_coin_not_found")
+    def test_get_coin_cached_etag_matches(self, mock_get):
+        self.response_cache.get_coin.return_value = (('"abc"', '{"id":"bitcoin"}'), "0")
+
+        response = self.client.get(
+            "/coins/bitcoin", headers={"If-None-Match": 'W/"abc"'}
+        )
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["etag"], '"abc"')
+        mock_get.assert_not_awaited()
+
+    @patch("src.api.routes.coin_routes.CoinService.handle_coin_not_found")
+    def test_get_coin_cached_etag_differs(self, mock_get):
+        self.response_cache.get_coin.return_value = (('"abc"', '{"id":"bitcoin"}'), "0")
+
+        response = self.client.get("/coins/bitcoin", headers={"If-None-Match": '"x"'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"id": "bitcoin"})
+        mock_get.assert_not_awaited()
+
+    @patch("src.api.routes.coin_routes.CoinService.handle_coin_not_found")
+    def test_get_coin_cache_miss_stores_body(self, mock_get):
+        mock_get.return_value = SQLAlchemyCoin(
+            id="bitcoin", symbol="btc", name="Bitcoin"
+        )
+
+        response = self.client.get("/coins/bitcoin")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["etag"], '"etag"')
+        self.response_cache.set_coin.assert_awaited_once_with(
+            "bitcoin", response.text, "0"
+        )
+
+    @patch("src.api.routes.coin_routes.CoinService.list_coins")
+    def test_list_coins_cached_etag_matches(self, mock_list):
+        self.response_cache.get_list.return_value = (('"abc"', '{"items":[]}'), "0")
+
+        response = self.client.get("/coins/", headers={"If-None-Match": '"abc"'})
+
+        self.assertEqual(response.status_code, 304)
+        mock_list.assert_not_awaited()
+
+    @patch("src.api.routes.coin_routes.CoinService.list_coins")
+    def test_list_coins_returns_next_cursor(self, mock_list):
+        mock_list.return_value = [
+            CoinRow(f"coin-{i}", f"c{i}", f"Coin {i}", None) for i in range(3)
+        ]
+
+        response = self.client.get(
+            "/coins/", params={"limit": 2, "cursor": CoinService.encode_cursor("a")}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        body: dict = response.json()
+        self.assertEqual([coin["id"] for coin in body["items"]], ["coin-0", "coin-1"])
+        self.assertEqual(CoinService.decode_cursor(body["next_cursor"]), "coin-1")
+        self.assertEqual(mock_list.await_args.args[1:3], (3, "a"))
+
+    @patch("src.api.routes.coin_routes.CoinService.list_coins")
+    def test_list_coins_last_page(self, mock_list):
+        mock_list.return_value = [CoinRow("bitcoin", "btc", "Bitcoin", 5.0)]
+
+        response = self.client.get("/coins/", params={"limit": 2})
+
+        self.assertEqual(
+            response.json(),
+            {
+                "items": [
+                    {
+                        "id": "bitcoin",
+                        "symbol": "btc",
+                        "name": "Bitcoin",
+                        "target_price": 5.0,
+                    }
+                ],
+                "next_cursor": None,
+            },
+        )
+
+    def test_list_coins_invalid_cursor(self):
+        response = self.client.get("/coins/", params={"cursor": "%%%"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_coins_limit_above_maximum(self):
+        response = self.client.get("/coins/", params={"limit": 100000})
+
+        self.assertEqual(response.status_code, 422)
+
+    @patch("src.api.routes.coin_routes.price_ingestion_service.cache.get_coin_price")
+    def test_get_coin_price_from_redis(self, mock_price):
+        mock_price.return_value = {"usd": 65000.5, "last_updated_at": 1700000000}
+
+        response = self.client.get("/coins/bitcoin/price")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["usd"], 65000.5)
+        self.assertTrue(response.json()["updated_at"].startswith("2023-11-14"))
+
+    @patch("src.api.routes.coin_routes.CoinService.get_coin_by_id")
+    @patch("src.api.routes.coin_routes.price_ingestion_service.cache.get_coin_price")
+    def test_get_coin_price_not_ingested(self, mock_price, mock_get):
+        mock_price.return_value = None
+        mock_get.return_value = SQLAlchemyCoin(
+            id="bitcoin", symbol="btc", name="Bitcoin"
+        )
+
+        response = self.client.get("/coins/bitcoin/price")
+
+        self.assertEqual(response.status_code, 404)
+
+    @patch(
+        "src.api.routes.coin_routes.price_ingestion_service.history.get_history",
+        new_callable=AsyncMock,
+    )
+    def test_get_coin_history_picks_resolution(self, mock_history):
+        mock_history.return_value = []
+
+        response = self.client.get(
+            "/coins/bitcoin/history",
+            params={"from": "2026-01-01T00:00:00Z", "to": "2026-01-31T00:00:00Z"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["resolution"], "1h")
+        self.assertEqual(mock_history.await_args.args[4], "1h")
+
+    def test_get_coin_history_too_many_points(self):
+        response = self.client.get(
+            "/coins/bitcoin/history",
+            params={
+                "from": "2026-01-01T00:00:00Z",
+                "to": "2026-03-01T00:00:00Z",
+                "resolution": "1m",
+            },
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_coin_history_invalid_range(self):
+        response = self.client.get(
+            "/coins/bitcoin/history",
+            params={"from": "2026-03-01T00:00:00Z", "to": "2026-01-01T00:00:00Z"},
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_search_coins(self):
+        search_index = CoinSearchIndex(
+            [{"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"}]
+        )
+        with patch(
+            "src.api.routes.coin_routes.periodic_updater.search_index", search_index
+        ):
+            response = self.client.get("/coins/search", params={"q": "bit"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(), [{"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"}]
+        )
+
+    def test_search_coins_before_first_refresh(self):
+        with patch("src.api.routes.coin_routes.periodic_updater.search_index", None):
+            response = self.client.get("/coins/search", params={"q": "btc"})
+
+        self.assertEqual(response.status_code, 503)
+
+    @patch("src.api.routes.coin_routes.coin_refresh_queue.enqueue")
+    def test_trigger_coin_update_joins_running_job(self, mock_enqueue):
+        mock_enqueue.return_value = ("job-1", False)
+
+        response = self.client.post(
+            "/coins/update-coins/", headers={"Idempotency-Key": "click-2"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["job_id"], "job-1")
+        self.assertEqual(
+            response.json()["message"], "Coin data update already in progress"
+        )
+        mock_enqueue.assert_awaited_once_with("click-2")
+
+    @patch("src.api.routes.coin_routes.coin_refresh_queue.enqueue")
+    def test_trigger_coin_update_queue_unavailable(self, mock_enqueue):
+        mock_enqueue.return_value = (None, False)
+
+        response = self.client.post("/coins/update-coins/")
+
+        self.assertEqual(response.status_code, 503)
+
+    @patch("src.api.routes.coin_routes.coin_refresh_queue.jobs.get")
+    def test_get_coin_update_job(self, mock_get_job):
+        mock_get_job.return_value = {
+            "status": "running",
+            "created_at": "1700000000.0",
+            "started_at": "1700000001.0",
+            "attempts": "1",
+            "processed": "500",
+            "total": "1000",
+            "coins_per_second": "250.0",
+        }
+
+        response = self.client.get("/coins/update-coins/job-1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["progress"], 0.5)
+        self.assertEqual(response.json()["status"], "running")
+
+    @patch("src.api.routes.coin_routes.coin_refresh_queue.jobs.get")
+    def test_get_coin_update_job_not_found(self, mock_get_job):
+        mock_get_job.return_value = {}
+
+        response = self.client.get("/coins/update-coins/unknown")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_stream_prices_rejects_empty_id_list(self):
+        response = self.client.get("/coins/stream", params={"ids": " , "})
+
+        self.assertEqual(response.status_code, 400)
+
+    @patch("src.api.routes.coin_routes.LIVE_PRICES_MAX_COINS", 2)
+    def test_stream_prices_rejects_too_many_ids(self):
+        response = self.client.get("/coins/stream", params={"ids": "a,b,c"})
+
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from src.services.coin_search_index import CoinSearchIndex
+
+COINS: list[dict[str, str]] = [
+    {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"},
+    {"id": "wrapped-bitcoin", "symbol": "wbtc", "name": "Wrapped Bitcoin"},
+    {"id": "bitcoin-cash", "symbol": "bch", "name": "Bitcoin Cash"},
+    {"id": "btc-2x", "symbol": "btc2x", "name": "BTC 2x Flexible"},
+    {"id": "batcat", "symbol": "btc", "name": "Batcat"},
+    {"id": "broken", "symbol": "", "name": "No Symbol"},
+]
+
+
+class TestCoinSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = CoinSearchIndex(COINS)
+
+    def ids(self, query: str, limit: int = 20) -> list[str]:
+        return [coin["id"] for coin in self.index.search(query, limit)]
+
+    def test_exact_symbol_matches_come_first(self):
+        self.assertEqual(self.ids("BTC"), ["bitcoin", "batcat", "btc-2x"])
+
+    def test_name_prefix_matches_any_word_shortest_first(self):
+        self.assertEqual(
+            self.ids("bitcoin"), ["bitcoin", "wrapped-bitcoin", "bitcoin-cash"]
+        )
+
+    def test_multi_word_query(self):
+        self.assertEqual(self.ids("bitcoin ca"), ["bitcoin-cash"])
+
+    def test_limit(self):
+        self.assertEqual(len(self.ids("b", limit=2)), 2)
+
+    def test_no_match(self):
+        self.assertEqual(self.ids("zzz"), [])
+        self.assertEqual(self.ids("  "), [])
+
+    def test_skips_incomplete_coins_and_reports_memory(self):
+        self.assertEqual(len(self.index), 5)
+        self.assertGreater(self.index.memory_bytes(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from src.schemas.coin import CoinBase, CoinPage
+from src.services.coin_serializer import CoinSerializer
+
+ROWS: list[tuple] = [
+    ("bitcoin", "btc", "Bitcoin", 70000.5),
+    ("tether", "usdt", 'Tether "USD₮"', None),
+]
+
+
+class TestCoinSerializer(unittest.TestCase):
+
+    def test_page_matches_pydantic_body(self):
+        expected: str = CoinPage(
+            items=[CoinBase(**dict(zip(CoinSerializer.FIELDS, row))) for row in ROWS],
+            next_cursor="abc",
+        ).model_dump_json()
+
+        for validate in (False, True):
+            with self.subTest(validate=validate):
+                serializer = CoinSerializer(validate=validate)
+                self.assertEqual(serializer.page(ROWS, "abc").decode(), expected)
+
+    def test_fragments_are_reused_until_the_row_changes(self):
+        serializer = CoinSerializer(max_fragments=10, validate=False)
+
+        serializer.coin(ROWS[0])
+        serializer.coin(ROWS[0])
+        changed: bytes = serializer.coin(("bitcoin", "btc", "Bitcoin", 1.0))
+
+        self.assertEqual(serializer.stats, {"hits": 1, "misses": 2})
+        self.assertIn(b'"target_price":1.0', changed)
+
+    def test_least_recently_used_fragment_is_evicted(self):
+        serializer = CoinSerializer(max_fragments=1, validate=False)
+
+        serializer.page(ROWS, None)
+
+        self.assertEqual(len(serializer), 1)
+        self.assertEqual(list(serializer._fragments), [ROWS[1]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import asyncio
+import unittest
+import httpx
+from unittest.mock import AsyncMock
+from src.schemas.coin import CoinCreate, CoinUpdate
+from src.services.coin_update_service import CoinUpdateService
+
+
+class TestCoinUpdateService(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.service = CoinUpdateService()
+        self.service.redis_cache.get_coin_from_cache = AsyncMock(return_value={})
+        self.service.redis_cache.set_coin_cache = AsyncMock()
+        self.service.redis_cache.acquire_lock = AsyncMock(return_value=True)
+        self.service.redis_cache.release_lock = AsyncMock()
+
+    async def test_update_coin_data_from_cache(self):
+        self.service.redis_cache.get_coin_from_cache.return_value = {
+            "symbol": "btc",
+            "name": "Bitcoin",
+        }
+        self.service.coingecko_api.get_coins_info = AsyncMock()
+
+        coin: CoinUpdate = await self.service.update_coin_data(
+            CoinUpdate(id="bitcoin", symbol="x", name="x")
+        )
+
+        self.assertEqual((coin.symbol, coin.name), ("btc", "Bitcoin"))
+        self.service.coingecko_api.get_coins_info.assert_not_awaited()
+
+    async def test_concurrent_misses_fetch_once(self):
+        async def get_coins_info(coin_ids: list[str]) -> dict:
+            await asyncio.sleep(0.01)
+            return {"bitcoin": {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"}}
+
+        self.service.coingecko_api.get_coins_info = AsyncMock(
+            side_effect=get_coins_info
+        )
+
+        coins: list[CoinUpdate] = await asyncio.gather(
+            *(
+                self.service.update_coin_data(CoinUpdate(id="bitcoin"))
+                for _ in range(10)
+            )
+        )
+
+        self.assertTrue(all(coin.symbol == "btc" for coin in coins))
+        self.service.coingecko_api.get_coins_info.assert_awaited_once_with(["bitcoin"])
+        self.service.redis_cache.set_coin_cache.assert_awaited_once()
+
+    async def test_misses_of_different_coins_share_one_request(self):
+        self.service.coingecko_api.get_coins_info = AsyncMock(
+            return_value={
+                "bitcoin": {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"},
+                "ethereum": {"id": "ethereum", "symbol": "eth", "name": "Ethereum"},
+            }
+        )
+
+        coins: list[CoinUpdate] = await asyncio.gather(
+            self.service.update_coin_data(CoinUpdate(id="bitcoin")),
+            self.service.update_coin_data(CoinUpdate(id="ethereum")),
+        )
+
+        self.assertEqual([coin.symbol for coin in coins], ["btc", "eth"])
+        self.service.coingecko_api.get_coins_info.assert_awaited_once_with(
+            ["bitcoin", "ethereum"]
+        )
+
+    async def test_update_coin_data_not_found(self):
+        self.service.coingecko_api.get_coins_info = AsyncMock(return_value={})
+        self.service.coingecko_api.get_coin_info = AsyncMock(return_value={})
+
+        with self.assertRaises(ValueError):
+            await self.service.update_coin_data(CoinUpdate(id="unknown"))
+
+    async def test_update_coins_data_batches_cache_misses(self):
+        self.service.redis_cache.get_coins_from_cache = AsyncMock(
+            return_value={"bitcoin": {"symbol": "btc", "name": "Bitcoin"}}
+        )
+        self.service.redis_cache.set_coins_cache = AsyncMock()
+        self.service.coingecko_api.get_coins_info = AsyncMock(
+            return_value={
+                "ethereum": {"id": "ethereum", "symbol": "eth", "name": "Ethereum"}
+            }
+        )
+
+        self.service.coingecko_api.get_coin_info = AsyncMock(return_value={})
+
+        valid, not_found, upstream_errors = await self.service.update_coins_data(
+            [
+                CoinCreate(id="bitcoin", symbol="x", name="x"),
+                CoinCreate(id="ethereum", symbol="x", name="x"),
+                CoinCreate(id="unknown", symbol="x", name="x"),
+            ]
+        )
+
+        self.assertEqual([coin.symbol for coin in valid], ["btc", "eth"])
+        self.assertEqual((not_found, upstream_errors), (["unknown"], []))
+        self.service.coingecko_api.get_coins_info.assert_awaited_once_with(
+            ["ethereum", "unknown"]
+        )
+        self.service.coingecko_api.get_coin_info.assert_awaited_once_with("unknown")
+
+    async def test_update_coins_data_falls_back_for_coins_without_market_data(self):
+        self.service.redis_cache.get_coins_from_cache = AsyncMock(return_value={})
+        self.service.redis_cache.set_coins_cache = AsyncMock()
+        self.service.coingecko_api.get_coins_info = AsyncMock(return_value={})
+        self.service.coingecko_api.get_coin_info = AsyncMock(
+            return_value={"id": "delisted", "symbol": "dls", "name": "Delisted"}
+        )
+
+        valid, not_found, _ = await self.service.update_coins_data(
+            [CoinCreate(id="delisted", symbol="x", name="x")]
+        )
+
+        self.assertEqual([coin.symbol for coin in valid], ["dls"])
+        self.assertEqual(not_found, [])
+
+    async def test_update_coins_data_reports_upstream_errors(self):
+        self.service.redis_cache.get_coins_from_cache = AsyncMock(return_value={})
+        self.service.redis_cache.set_coins_cache = AsyncMock()
+        self.service.coingecko_api.get_coins_info = AsyncMock(
+            side_effect=httpx.ConnectError("refused")
+        )
+        self.service.coingecko_api.get_coin_info = AsyncMock()
+
+        valid, not_found, upstream_errors = await self.service.update_coins_data(
+            [CoinCreate(id="bitcoin", symbol="x", name="x")]
+        )
+
+        self.assertEqual((valid, not_found, upstream_errors), ([], [], ["bitcoin"]))
+        self.service.coingecko_api.get_coin_info.assert_not_awaited()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+import unittest
+from unittest.mock import patch
+import httpx
+from prometheus_client import REGISTRY
+from src.coingecko.coingecko_coins_api import CoinGeckoAPI, CoinGeckoSyncAPI
+from src.coingecko.request_scheduler import RequestScheduler
+
+
+def mock_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=CoinGeckoAPI.BASE_URL, transport=httpx.MockTransport(handler)
+    )
+
+
+class TestCoinGeckoAPI(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        # No shared rate limit and instant retries
+        self.scheduler = RequestScheduler(backoff_base=0)
+        patcher = patch.object(RequestScheduler, "_shared", self.scheduler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_get_coin_info_success(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.assertEqual(request.url.path, "/api/v3/coins/bitcoin")
+            self.assertEqual(request.url.params["tickers"], "false")
+            return httpx.Response(200, json={"symbol": "btc", "name": "Bitcoin"})
+
+        async with mock_client(handler) as client:
+            data: dict = await CoinGeckoAPI(client).get_coin_info("bitcoin")
+
+        self.assertEqual(data, {"symbol": "btc", "name": "Bitcoin"})
+        self.assertGreater(CoinGeckoAPI.upstream_stats["bytes"], 0)
+
+    async def test_get_coins_info_chunks_ids(self):
+        requested: list[str] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            ids: list[str] = request.url.params["ids"].split(",")
+            requested.append(request.url.params["ids"])
+            return httpx.Response(
+                200, json=[{"id": id, "symbol": id[:3], "name": id} for id in ids]
+            )
+
+        async with mock_client(handler) as client:
+            api = CoinGeckoAPI(client)
+            api.MARKETS_PAGE_SIZE = 2
+            data: dict = await api.get_coins_info(["a", "b", "c"])
+
+        self.assertEqual(sorted(data), ["a", "b", "c"])
+        self.assertEqual(sorted(requested), ["a,b", "c"])
+
+    async def test_get_prices_chunks_ids_and_skips_unpriced(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.assertEqual(request.url.path, "/api/v3/simple/price")
+            ids: list[str] = request.url.params["ids"].split(",")
+            return httpx.Response(
+                200,
+                json={
+                    id: {"usd": 1.5, "last_updated_at": 1700000000} if id != "b" else {}
+                    for id in ids
+                },
+            )
+
+        async with mock_client(handler) as client:
+            api = CoinGeckoAPI(client)
+            api.SIMPLE_PRICE_PAGE_SIZE = 2
+            prices: dict = await api.get_prices(["a", "b", "c"])
+
+        self.assertEqual(sorted(prices), ["a", "c"])
+        self.assertEqual(prices["a"]["usd"], 1.5)
+
+    async def test_get_coins_info_upstream_error_is_raised(self):
+        async with mock_client(lambda request: httpx.Response(500)) as client:
+            with self.assertRaises(httpx.HTTPStatusError):
+                await CoinGeckoAPI(client).get_coins_info(["bitcoin"])
+
+    async def test_upstream_error_is_retried(self):
+        statuses: list[int] = [503, 200]
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(statuses.pop(0), json={"symbol": "btc"})
+
+        async with mock_client(handler) as client:
+            data: dict = await CoinGeckoAPI(client).get_coin_info("bitcoin")
+
+        self.assertEqual(data, {"symbol": "btc"})
+        self.assertEqual(self.scheduler.retries, 1)
+
+    async def test_rate_limited_request_waits_for_retry_after(self):
+        statuses: list[int] = [429, 200]
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(
+                statuses.pop(0), headers={"Retry-After": "0.05"}, json=[]
+            )
+
+        async with mock_client(handler) as client:
+            with patch.object(
+                self.scheduler, "rate_limit_hit", wraps=self.scheduler.rate_limit_hit
+            ) as rate_limit_hit:
+                data: list = await CoinGeckoAPI(client).get_coin_list()
+
+        self.assertEqual(data, [])
+        self.assertAlmostEqual(rate_limit_hit.await_args.args[0], 0.05)
+        self.assertEqual(self.scheduler.rate_limited, 1)
+
+    async def test_responses_counted_by_endpoint_and_status(self):
+        statuses: list[int] = [429, 200]
+
+        def count(status: str) -> float:
+            return (
+                REGISTRY.get_sample_value(
+                    "cointrack_coingecko_responses_total",
+                    {"endpoint": "/coins/{id}", "status": status},
+                )
+                or 0.0
+            )
+
+        def rate_limited() -> float:
+            return REGISTRY.get_sample_value("cointrack_coingecko_rate_limited_total")
+
+        before: tuple[float, ...] = (count("429"), count("200"), rate_limited())
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(statuses.pop(0), json={"symbol": "btc"})
+
+        async with mock_client(handler) as client:
+            await CoinGeckoAPI(client).get_coin_info("bitcoin")
+
+        after: tuple[float, ...] = (count("429"), count("200"), rate_limited())
+        self.assertEqual([a - b for a, b in zip(after, before)], [1, 1, 1])
+
+    async def test_get_coin_info_not_found(self):
+        async with mock_client(lambda request: httpx.Response(404)) as client:
+            data: dict = await CoinGeckoAPI(client).get_coin_info("unknown")
+
+        self.assertEqual(data, {})
+
+    async def test_get_coin_info_upstream_error_is_raised(self):
+        async with mock_client(lambda request: httpx.Response(500)) as client:
+            with self.assertRaises(httpx.HTTPStatusError):
+                await CoinGeckoAPI(client).get_coin_info("bitcoin")
+
+    async def test_get_coin_list_timeout(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise httpx.ReadTimeout("timed out", request=request)
+
+        async with mock_client(handler) as client:
+            data: list = await CoinGeckoAPI(client).get_coin_list()
+
+        self.assertEqual(data, [])
+
+    async def test_get_coin_list_invalid_json(self):
+        async with mock_client(lambda request: httpx.Response(200)) as client:
+            data: list = await CoinGeckoAPI(client).get_coin_list()
+
+        self.assertEqual(data, [])
+
+    async def test_shared_client_is_reused(self):
+        first = CoinGeckoAPI()
+        second = CoinGeckoAPI()
+
+        self.assertIs(first.client, second.client)
+        self.assertIs(first.semaphore, second.semaphore)
+        await CoinGeckoAPI.close_shared_client()
+
+
+class TestCoinGeckoSyncAPI(unittest.TestCase):
+
+    def test_sync_wrapper_delegates_to_async_client(self):
+        async def fake_call(method: str, *args) -> dict:
+            return {"method": method, "args": args}
+
+        api = CoinGeckoSyncAPI()
+        api._call = fake_call
+
+        self.assertEqual(
+            api.get_coin_info("bitcoin"),
+            {"method": "get_coin_info", "args": ("bitcoin",)},
+        )
+
+    def test_consecutive_calls_do_not_share_the_loop_bound_scheduler(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json=[{"id": "bitcoin"}])
+
+        with (
+            patch.object(
+                CoinGeckoAPI, "create_client", side_effect=lambda: mock_client(handler)
+            ),
+            patch.object(
+                RequestScheduler,
+                "get_shared",
+                side_effect=AssertionError("shared scheduler used"),
+            ),
+        ):
+            api = CoinGeckoSyncAPI()
+            self.assertEqual(api.get_coin_list(), [{"id": "bitcoin"}])
+            self.assertEqual(api.get_coin_list(), [{"id": "bitcoin"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+from src.database_utils.connection import DatabaseConnection, TimedAsyncQueuePool
+
+
+class TestDatabaseConnection(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncTearDown(self):
+        await DatabaseConnection.close_shared()
+
+    async def test_get_shared_returns_same_instance(self):
+        first: DatabaseConnection = DatabaseConnection.get_shared()
+        second: DatabaseConnection = DatabaseConnection.get_shared()
+
+        self.assertIs(first, second)
+        self.assertIsInstance(first.engine.pool, TimedAsyncQueuePool)
+
+    async def test_close_shared_recreates_engine_on_next_use(self):
+        first: DatabaseConnection = DatabaseConnection.get_shared()
+        await DatabaseConnection.close_shared()
+
+        self.assertIsNot(first, DatabaseConnection.get_shared())
+
+    @patch.dict("os.environ", {"DB_POOL_SIZE": "3"})
+    async def test_pool_settings_from_environment(self):
+        connection = DatabaseConnection()
+
+        self.assertEqual(connection.pool_status()["size"], 3)
+        await connection.engine.dispose()
+
+    async def test_pool_status_without_checkouts(self):
+        connection = DatabaseConnection()
+
+        status: dict[str, int | float] = connection.pool_status()
+
+        self.assertEqual(status["checked_out"], 0)
+        self.assertEqual(status["acquire_count"], 0)
+        self.assertEqual(status["acquire_wait_avg_ms"], 0.0)
+        await connection.engine.dispose()
+
+    @patch("src.database_utils.connection.asyncio.sleep")
+    async def test_wait_for_postgres_backs_off_until_connected(self, mock_sleep):
+        connection = DatabaseConnection()
+        conn = AsyncMock()
+        connection.create_direct_connection = AsyncMock(
+            side_effect=[OSError("refused"), OSError("refused"), conn]
+        )
+
+        ready: bool = await connection.wait_for_postgres(timeout=60)
+
+        self.assertTrue(ready)
+        self.assertEqual(
+            [call.args[0] for call in mock_sleep.await_args_list], [0.1, 0.2]
+        )
+        conn.close.assert_awaited_once()
+        await connection.engine.dispose()
+
+    async def test_wait_for_postgres_gives_up_after_timeout(self):
+        connection = DatabaseConnection()
+        connection.create_direct_connection = AsyncMock(side_effect=OSError("refused"))
+
+        self.assertFalse(await connection.wait_for_postgres(timeout=0.05))
+        await connection.engine.dispose()
+
+
+if __name__ == "__main__":
+    unittest.main()
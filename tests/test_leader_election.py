@@ -0,0 +1,114 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+import redis
+from src.services.leader_election import LeaderElection
+
+
+class TestLeaderElection(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.election = LeaderElection(MagicMock(), lease_ttl_ms=15000)
+        self.election.acquire_lease = AsyncMock(return_value=True)
+        self.election.release_lease = AsyncMock()
+        self.job_started = asyncio.Event()
+
+    def jobs(self) -> list:
+        async def job():
+            self.job_started.set()
+            await asyncio.Event().wait()
+
+        return [job()]
+
+    async def test_leader_starts_jobs_once(self):
+        await self.election.campaign(self.jobs)
+        await self.election.campaign(self.jobs)
+        await asyncio.wait_for(self.job_started.wait(), 1)
+
+        self.assertTrue(self.election.is_leader)
+        self.assertEqual(len(self.election._jobs), 1)
+        self.assertEqual(self.election.stats["elections"], 1)
+        await self.election._stop_jobs()
+
+    async def test_follower_runs_no_jobs(self):
+        self.election.acquire_lease.return_value = False
+
+        await self.election.campaign(self.jobs)
+
+        self.assertFalse(self.election.is_leader)
+        self.assertEqual(self.election._jobs, [])
+
+    async def test_lost_lease_stops_jobs(self):
+        await self.election.campaign(self.jobs)
+        job: asyncio.Task = self.election._jobs[0]
+        self.election.acquire_lease.return_value = False
+
+        await self.election.campaign(self.jobs)
+
+        self.assertFalse(self.election.is_leader)
+        self.assertTrue(job.cancelled())
+        self.assertEqual(self.election.stats["demotions"], 1)
+
+    async def test_redis_outage_keeps_leader_until_lease_expires(self):
+        await self.election.campaign(self.jobs)
+        self.election.acquire_lease.return_value = None
+
+        await self.election.campaign(self.jobs)
+        self.assertTrue(self.election.is_leader)
+        self.election._lease_expires_at = 0.0
+        await self.election.campaign(self.jobs)
+
+        self.assertFalse(self.election.is_leader)
+
+    async def test_redis_outage_does_not_elect_a_follower(self):
+        self.election.acquire_lease.return_value = None
+
+        await self.election.campaign(self.jobs)
+
+        self.assertFalse(self.election.is_leader)
+
+    async def test_stop_releases_the_lease(self):
+        self.election.start(self.jobs)
+        await asyncio.wait_for(self.job_started.wait(), 1)
+
+        await self.election.stop()
+
+        self.election.release_lease.assert_awaited_once()
+        self.assertFalse(self.election.is_leader)
+        self.assertEqual(self.election._jobs, [])
+
+
+class TestLeaderElectionLease(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.election = LeaderElection(MagicMock(), lease_ttl_ms=15000)
+
+    async def test_acquire_lease_held_by_another_token(self):
+        self.election._acquire_lease_script = AsyncMock(return_value=0)
+
+        held: bool | None = await self.election.acquire_lease()
+
+        self.assertFalse(held)
+        self.election._acquire_lease_script.assert_awaited_once_with(
+            keys=[LeaderElection.LEASE_KEY], args=[self.election.token, 15000]
+        )
+
+    async def test_acquire_lease_redis_error_is_unknown(self):
+        self.election._acquire_lease_script = AsyncMock(
+            side_effect=redis.RedisError("down")
+        )
+
+        self.assertIsNone(await self.election.acquire_lease())
+
+    async def test_release_lease_only_by_its_owner(self):
+        self.election._release_lease_script = AsyncMock(return_value=0)
+
+        await self.election.release_lease()
+
+        self.election._release_lease_script.assert_awaited_once_with(
+            keys=[LeaderElection.LEASE_KEY], args=[self.election.token]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
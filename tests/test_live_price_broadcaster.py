@@ -0,0 +1,93 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+import orjson
+from src.services.live_price_broadcaster import (
+    KEEP_ALIVE,
+    LivePriceBroadcaster,
+    LivePriceSubscription,
+)
+
+BITCOIN: dict = {"usd": 65000.0, "last_updated_at": 1700000000}
+
+
+def decode(chunk: bytes) -> list[dict]:
+    return [
+        orjson.loads(line.removeprefix(b"data: "))
+        for line in chunk.splitlines()
+        if line.startswith(b"data: ")
+    ]
+
+
+class TestLivePriceBroadcaster(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.cache = MagicMock()
+        self.cache.get_coin_prices = AsyncMock(return_value={})
+        self.broadcaster = LivePriceBroadcaster(self.cache, keep_alive=0.01)
+
+    def test_encode_matches_price_endpoint(self):
+        message: bytes = LivePriceBroadcaster.encode("bitcoin", BITCOIN)
+
+        self.assertTrue(message.startswith(b"event: price\n"))
+        self.assertEqual(
+            decode(message),
+            [
+                {
+                    "id": "bitcoin",
+                    "usd": 65000.0,
+                    "updated_at": "2023-11-14T22:13:20+00:00",
+                }
+            ],
+        )
+
+    async def test_broadcast_reaches_subscribers_of_the_coin_only(self):
+        bitcoin = self.broadcaster.subscribe(["bitcoin"])
+        ethereum = self.broadcaster.subscribe(["ethereum"])
+
+        messages: int = self.broadcaster.broadcast({"bitcoin": BITCOIN})
+
+        self.assertEqual(messages, 1)
+        self.assertEqual(decode(await bitcoin.next(1))[0]["id"], "bitcoin")
+        self.assertEqual(await ethereum.next(0.01), KEEP_ALIVE)
+
+    async def test_slow_client_gets_latest_price_only(self):
+        subscription = self.broadcaster.subscribe(["bitcoin"])
+
+        self.broadcaster.broadcast({"bitcoin": BITCOIN})
+        self.broadcaster.broadcast({"bitcoin": {**BITCOIN, "usd": 66000.0}})
+
+        self.assertEqual(
+            [price["usd"] for price in decode(await subscription.next(1))], [66000.0]
+        )
+        self.assertEqual(self.broadcaster.stats["coalesced"], 1)
+
+    def test_unsubscribe_removes_empty_coins(self):
+        subscription = self.broadcaster.subscribe(["bitcoin", "ethereum"])
+
+        self.broadcaster.unsubscribe(subscription)
+
+        self.assertEqual(self.broadcaster._subscriptions, {})
+        self.assertEqual(self.broadcaster.clients, 0)
+
+    async def test_stream_starts_with_current_prices(self):
+        self.cache.get_coin_prices.return_value = {"bitcoin": BITCOIN}
+        stream = self.broadcaster.stream(["bitcoin"])
+
+        first: bytes = await anext(stream)
+        self.assertEqual(decode(first)[0]["usd"], 65000.0)
+        self.assertEqual(self.broadcaster.clients, 1)
+        await stream.aclose()
+
+        self.assertEqual(self.broadcaster.clients, 0)
+
+    async def test_subscription_keeps_one_message_per_coin(self):
+        subscription = LivePriceSubscription(["bitcoin"])
+
+        self.assertFalse(subscription.push("bitcoin", b"a"))
+        self.assertTrue(subscription.push("bitcoin", b"b"))
+
+        self.assertEqual(await subscription.next(1), b"b")
+
+
+if __name__ == "__main__":
+    unittest.main()
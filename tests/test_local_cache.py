@@ -0,0 +1,57 @@
+import unittest
+from unittest.mock import patch
+from src.redis_cache.local_cache import LocalCache
+
+
+class TestLocalCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LocalCache(max_entries=2, ttl=60)
+
+    def test_get_returns_stored_value(self):
+        self.cache.put("bitcoin", {"symbol": "btc"}, self.cache.generation)
+
+        self.assertEqual(self.cache.get("bitcoin"), {"symbol": "btc"})
+        self.assertEqual(self.cache.stats["hits"], 1)
+
+    def test_get_missing_key(self):
+        self.assertIsNone(self.cache.get("bitcoin"))
+        self.assertEqual(self.cache.stats["misses"], 1)
+
+    def test_evicts_least_recently_used(self):
+        self.cache.put("bitcoin", {"symbol": "btc"}, 0)
+        self.cache.put("ethereum", {"symbol": "eth"}, 0)
+        self.cache.get("bitcoin")
+        self.cache.put("solana", {"symbol": "sol"}, 0)
+
+        self.assertIsNone(self.cache.get("ethereum"))
+        self.assertIsNotNone(self.cache.get("bitcoin"))
+        self.assertEqual(self.cache.stats["evictions"], 1)
+
+    @patch("src.redis_cache.local_cache.time.monotonic")
+    def test_entries_expire_after_ttl(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        self.cache.put("bitcoin", {"symbol": "btc"}, 0)
+        mock_monotonic.return_value = 161.0
+
+        self.assertIsNone(self.cache.get("bitcoin"))
+        self.assertEqual(self.cache.stats["expirations"], 1)
+
+    def test_put_ignores_value_read_before_invalidation(self):
+        generation: int = self.cache.generation
+        self.cache.invalidate(["bitcoin"])
+
+        self.cache.put("bitcoin", {"symbol": "stale"}, generation)
+
+        self.assertIsNone(self.cache.get("bitcoin"))
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = LocalCache(max_entries=0, ttl=60)
+
+        cache.put("bitcoin", {"symbol": "btc"}, 0)
+
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
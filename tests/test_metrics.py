@@ -0,0 +1,133 @@
+import types
+import unittest
+from unittest.mock import AsyncMock, patch
+from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from main import app
+from src.metrics import InstrumentedRedis, MetricsRoute, instrument_engine
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestMetricsRoute(unittest.TestCase):
+
+    def setUp(self):
+        router = APIRouter(prefix="/items", route_class=MetricsRoute)
+
+        @router.get("/{item_id}")
+        async def get_item(item_id: str):
+            if item_id == "missing":
+                raise HTTPException(status_code=404, detail="Not found")
+            return {"id": item_id}
+
+        app = FastAPI()
+        app.include_router(router)
+        self.client = TestClient(app)
+
+    def test_requests_recorded_under_route_template(self):
+        before: float = sample(
+            "cointrack_http_request_duration_seconds_count",
+            method="GET",
+            route="/items/{item_id}",
+            status="200",
+        )
+
+        self.client.get("/items/a")
+        self.client.get("/items/b")
+
+        after: float = sample(
+            "cointrack_http_request_duration_seconds_count",
+            method="GET",
+            route="/items/{item_id}",
+            status="200",
+        )
+        self.assertEqual(after - before, 2)
+        self.assertEqual(
+            sample(
+                "cointrack_http_requests_in_flight",
+                method="GET",
+                route="/items/{item_id}",
+            ),
+            0,
+        )
+
+    def test_handled_exception_recorded_with_its_status(self):
+        before: float = sample(
+            "cointrack_http_request_duration_seconds_count",
+            method="GET",
+            route="/items/{item_id}",
+            status="404",
+        )
+
+        response = self.client.get("/items/missing")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(
+            sample(
+                "cointrack_http_request_duration_seconds_count",
+                method="GET",
+                route="/items/{item_id}",
+                status="404",
+            )
+            - before,
+            1,
+        )
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+
+    def test_metrics_exposed_in_prometheus_format(self):
+        response = TestClient(app).get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        self.assertIn("cointrack_http_request_duration_seconds", response.text)
+        self.assertIn("cointrack_coingecko_rate_limited_total", response.text)
+
+
+class TestEngineMetrics(unittest.TestCase):
+
+    def test_queries_and_checkouts_recorded(self):
+        sync_engine = create_engine("sqlite://")
+        instrument_engine(types.SimpleNamespace(sync_engine=sync_engine), 15)
+        before: float = sample(
+            "cointrack_db_query_duration_seconds_count", operation="SELECT"
+        )
+
+        with sync_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            self.assertEqual(sample("cointrack_db_pool_checked_out_connections"), 1)
+
+        self.assertEqual(
+            sample("cointrack_db_query_duration_seconds_count", operation="SELECT")
+            - before,
+            1,
+        )
+        self.assertEqual(sample("cointrack_db_pool_checked_out_connections"), 0)
+        self.assertEqual(sample("cointrack_db_pool_capacity_connections"), 15)
+
+
+class TestInstrumentedRedis(unittest.IsolatedAsyncioTestCase):
+
+    async def test_command_round_trip_recorded(self):
+        client = InstrumentedRedis()
+        before: float = sample(
+            "cointrack_redis_command_duration_seconds_count", command="HGETALL"
+        )
+
+        with patch("redis.asyncio.Redis.execute_command", AsyncMock(return_value={})):
+            await client.hgetall("bitcoin")
+
+        self.assertEqual(
+            sample("cointrack_redis_command_duration_seconds_count", command="HGETALL")
+            - before,
+            1,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from unittest.mock import AsyncMock, MagicMock, patch
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -41,6 +42,58 @@ class TestCoinService(unittest.IsolatedAsyncioTestCase):
             "Coin with id nonexistent_coin not found"
         )
 
+    async def test_list_coins_seeks_after_cursor_with_filters(self):
+        mock_result = MagicMock()
+        mock_result.all.return_value = []
+        mock_session = AsyncMock(spec=AsyncSession)
+        mock_session.execute.return_value = mock_result
+
+        await CoinService.list_coins(
+            mock_session, 10, "bitcoin", name_prefix="Bit_", has_target_price=True
+        )
+
+        sql: str = str(mock_session.execute.call_args.args[0])
+        self.assertIn("coin.id > :id_1", sql)
+        self.assertIn("lower(coin.name) LIKE", sql)
+        self.assertIn("coin.target_price IS NOT NULL", sql)
+        self.assertIn("ORDER BY coin.id", sql)
+
+    async def test_delete_coin_single_statement(self):
+        mock_result = MagicMock()
+        mock_result.one_or_none.return_value = None
+        mock_connection = AsyncMock()
+        mock_connection.execute.return_value = mock_result
+        mock_session = AsyncMock(spec=AsyncSession)
+        mock_session.connection.return_value = mock_connection
+
+        deleted: bool = await CoinService.delete_coin(mock_session, "unknown")
+
+        self.assertFalse(deleted)
+        mock_session.connection.assert_awaited_once_with(
+            execution_options={"isolation_level": "AUTOCOMMIT"}
+        )
+        sql: str = str(mock_connection.execute.call_args.args[0])
+        self.assertIn("DELETE FROM coin WHERE coin.id = :id_1 RETURNING coin.id", sql)
+
+    async def test_update_prices_executemany(self):
+        mock_session = AsyncMock(spec=AsyncSession)
+        prices: list[dict] = [
+            {"coin_id": "bitcoin", "price": 1.0, "updated_at": None},
+            {"coin_id": "ethereum", "price": 2.0, "updated_at": None},
+        ]
+
+        updated: int = await CoinService.update_prices(mock_session, prices)
+
+        self.assertEqual(updated, 2)
+        statement, params = mock_session.execute.call_args.args
+        self.assertIn("WHERE coin.id = :coin_id", str(statement))
+        self.assertEqual(params, prices)
+        mock_session.commit.assert_awaited_once()
+
+    def test_decode_cursor_invalid(self):
+        with self.assertRaises(HTTPException):
+            CoinService.decode_cursor("%%%")
+
 
 class TestCoinServiceIntegration(unittest.IsolatedAsyncioTestCase):
     async def asyncSetUp(self):
@@ -0,0 +1,184 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+import orjson
+from src.services.periodic_coin_data_updater import PeriodicCoinDataUpdater
+
+
+def make_coins(count: int) -> list[dict[str, str]]:
+    return [
+        {"id": f"coin-{i}", "symbol": f"c{i}", "name": f"Coin {i}"}
+        for i in range(count)
+    ]
+
+
+class TestPeriodicCoinDataUpdater(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.updater = PeriodicCoinDataUpdater(batch_size=2, target_write_rate=0)
+        self.updater.cache.set_coins_cache = AsyncMock(
+            side_effect=lambda coins: len(coins)
+        )
+        self.updater.cache.delete_coins = AsyncMock(side_effect=lambda ids: len(ids))
+        self.updater.cache.get_coin_list_fingerprints = AsyncMock(
+            return_value=(None, {})
+        )
+        self.updater.cache.set_coin_list_fingerprints = AsyncMock()
+        self.updater.cache.add_coin_list_fingerprints = AsyncMock()
+        self.updater.cache.get_coin_list_snapshot_digest = AsyncMock(return_value=None)
+        self.updater.cache.set_coin_list_snapshot = AsyncMock()
+
+    def applied(self, coins: list[dict[str, str]]) -> tuple[str, dict[str, str]]:
+        fingerprints: dict[str, str] = {
+            coin["id"]: PeriodicCoinDataUpdater.fingerprint(coin) for coin in coins
+        }
+        return PeriodicCoinDataUpdater.snapshot_digest(fingerprints), fingerprints
+
+    async def test_cache_coin_data_writes_in_batches(self):
+        stats: dict[str, float] = await self.updater.cache_coin_data(make_coins(5))
+
+        self.assertEqual(self.updater.cache.set_coins_cache.await_count, 3)
+        self.assertEqual(stats["coins"], 5)
+        self.assertGreater(stats["coins_per_second"], 0)
+
+    async def test_cache_coin_data_empty_list(self):
+        stats: dict[str, float] = await self.updater.cache_coin_data([])
+
+        self.updater.cache.set_coins_cache.assert_not_awaited()
+        self.assertEqual(stats["coins"], 0)
+        self.assertEqual(stats["coins_per_second"], 0.0)
+
+    @patch("src.services.periodic_coin_data_updater.asyncio.sleep")
+    async def test_throttle_keeps_target_rate(self, mock_sleep):
+        self.updater.target_write_rate = 10
+
+        await self.updater.cache_coin_data(make_coins(4))
+
+        # Sleep is mocked, so each pause covers the whole schedule up to that batch
+        self.assertEqual(mock_sleep.await_count, 2)
+        self.assertAlmostEqual(mock_sleep.await_args.args[0], 0.4, delta=0.05)
+
+    async def test_apply_coin_list_writes_only_the_diff(self):
+        previous: list[dict[str, str]] = make_coins(4)
+        self.updater.cache.get_coin_list_fingerprints.return_value = self.applied(
+            previous
+        )
+        fresh: list[dict[str, str]] = make_coins(5)[1:]
+        fresh[0] = {**fresh[0], "name": "Renamed"}
+
+        stats: dict[str, float] = await self.updater.apply_coin_list(fresh)
+
+        written: list[str] = [
+            coin["id"]
+            for call in self.updater.cache.set_coins_cache.await_args_list
+            for coin in call.args[0]
+        ]
+        self.assertEqual(written, ["coin-1", "coin-4"])
+        self.updater.cache.delete_coins.assert_awaited_once_with(["coin-0"])
+        self.assertEqual(
+            (stats["added"], stats["modified"], stats["removed"]), (1, 1, 1)
+        )
+        digest, changed, removed = (
+            self.updater.cache.set_coin_list_fingerprints.await_args.args
+        )
+        self.assertEqual(digest, self.applied(fresh)[0])
+        self.assertEqual(sorted(changed), ["coin-1", "coin-4"])
+        self.assertEqual(removed, ["coin-0"])
+
+    async def test_apply_unchanged_coin_list_skips_writes(self):
+        coins: list[dict[str, str]] = make_coins(3)
+        self.updater.cache.get_coin_list_fingerprints.return_value = self.applied(coins)
+
+        stats: dict[str, float] = await self.updater.apply_coin_list(coins[::-1])
+
+        self.updater.cache.set_coins_cache.assert_not_awaited()
+        self.updater.cache.set_coin_list_fingerprints.assert_not_awaited()
+        self.assertEqual(stats["written"], 0)
+
+    async def test_failed_writes_keep_old_fingerprints(self):
+        self.updater.cache.set_coins_cache.side_effect = lambda coins: 0
+
+        await self.updater.apply_coin_list(make_coins(3))
+
+        self.updater.cache.set_coin_list_fingerprints.assert_not_awaited()
+
+    async def test_written_batches_are_checkpointed(self):
+        self.updater.cache.set_coins_cache.side_effect = [2, 1]
+        progress = AsyncMock()
+
+        await self.updater.apply_coin_list(make_coins(4), progress)
+
+        # Only the fully written first batch is recorded, the digest is not
+        self.updater.cache.add_coin_list_fingerprints.assert_awaited_once()
+        self.assertEqual(
+            sorted(self.updater.cache.add_coin_list_fingerprints.await_args.args[0]),
+            ["coin-0", "coin-1"],
+        )
+        self.updater.cache.set_coin_list_fingerprints.assert_not_awaited()
+        self.assertEqual(
+            [call.args for call in progress.await_args_list], [(2, 4), (4, 4)]
+        )
+
+    async def test_empty_coin_list_is_not_applied(self):
+        self.updater.api.get_coin_list = AsyncMock(return_value=[])
+
+        await self.updater.fetch_and_cache_coin_data()
+
+        self.updater.cache.get_coin_list_fingerprints.assert_not_awaited()
+        self.updater.cache.delete_coins.assert_not_awaited()
+
+    async def test_refreshes_run_one_at_a_time(self):
+        running: list[int] = []
+        overlapped: bool = False
+
+        async def get_coin_list():
+            nonlocal overlapped
+            overlapped = overlapped or bool(running)
+            running.append(1)
+            await asyncio.sleep(0.01)
+            running.pop()
+            return []
+
+        self.updater.api.get_coin_list = AsyncMock(side_effect=get_coin_list)
+
+        await asyncio.gather(
+            self.updater.fetch_and_cache_coin_data(),
+            self.updater.fetch_and_cache_coin_data(),
+        )
+
+        self.assertFalse(overlapped)
+        self.assertEqual(self.updater.api.get_coin_list.await_count, 2)
+
+    async def test_refresh_swaps_in_a_new_search_index(self):
+        self.updater.api.get_coin_list = AsyncMock(return_value=make_coins(3))
+        old_index = self.updater.search_index
+
+        await self.updater.fetch_and_cache_coin_data()
+
+        self.assertIsNot(self.updater.search_index, old_index)
+        self.assertEqual(len(self.updater.search_index), 3)
+        digest, snapshot = self.updater.cache.set_coin_list_snapshot.await_args.args
+        self.assertEqual(self.updater.search_index_digest, digest)
+        self.assertEqual(orjson.loads(snapshot)[0], ["coin-0", "c0", "Coin 0"])
+
+    async def test_sync_builds_search_index_from_shared_snapshot(self):
+        self.updater.cache.get_coin_list_snapshot_digest.return_value = "abc"
+        self.updater.cache.get_coin_list_snapshot = AsyncMock(
+            return_value=orjson.dumps([["bitcoin", "btc", "Bitcoin"]]).decode()
+        )
+
+        self.assertTrue(await self.updater.sync_search_index())
+        self.assertFalse(await self.updater.sync_search_index())
+
+        self.assertEqual(self.updater.search_index.search("btc")[0]["id"], "bitcoin")
+        self.updater.cache.get_coin_list_snapshot.assert_awaited_once()
+
+    @patch("src.services.periodic_coin_data_updater.asyncio.sleep")
+    async def test_no_throttle_without_target_rate(self, mock_sleep):
+        await self.updater.cache_coin_data(make_coins(4))
+
+        mock_sleep.assert_not_awaited()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.services.price_history_service import (
+    ROLLUP_WATERMARK_LAG,
+    PriceHistoryService,
+)
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+def executed_sql(connection: AsyncMock) -> list[str]:
+    return [str(call.args[0]) for call in connection.execute.await_args_list]
+
+
+class TestPriceHistoryService(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.service = PriceHistoryService(
+            raw_retention_days=7,
+            minute_retention_days=90,
+            max_points=1000,
+            tick_interval=60,
+        )
+
+    def test_partition_bounds(self):
+        self.assertEqual(
+            PriceHistoryService.partition_bounds("day", date(2026, 12, 31)),
+            (date(2026, 12, 31), date(2027, 1, 1)),
+        )
+        self.assertEqual(
+            PriceHistoryService.partition_bounds("month", date(2026, 12, 31)),
+            (date(2026, 12, 1), date(2027, 1, 1)),
+        )
+
+    async def test_ensure_partitions_creates_upcoming_partitions_once(self):
+        connection = AsyncMock()
+
+        await self.service.ensure_partitions(connection, NOW)
+        await self.service.ensure_partitions(connection, NOW)
+
+        sql: list[str] = executed_sql(connection)
+        # 3 daily raw, 3 daily 1-minute and 1 monthly 1-hour partition
+        self.assertEqual(len(sql), 7)
+        self.assertIn(
+            "CREATE TABLE IF NOT EXISTS price_history_p20261020 PARTITION OF "
+            "price_history FOR VALUES FROM ('2026-10-20 00:00+00') "
+            "TO ('2026-10-21 00:00+00')",
+            sql,
+        )
+        self.assertIn(
+            "CREATE TABLE IF NOT EXISTS price_ohlc_1h_p20261001 PARTITION OF "
+            "price_ohlc_1h FOR VALUES FROM ('2026-10-01 00:00+00') "
+            "TO ('2026-11-01 00:00+00')",
+            sql,
+        )
+
+    async def test_ensure_partitions_for_past_days(self):
+        connection = AsyncMock()
+        await self.service.ensure_partitions(connection, NOW)
+
+        await self.service.ensure_partitions(
+            connection, NOW, days={date(2026, 10, 17), date(2026, 10, 18)}
+        )
+
+        sql: list[str] = executed_sql(connection)
+        # Yesterday's raw and 1-minute partitions, the month is already there
+        self.assertEqual(len(sql), 9)
+        self.assertIn("price_history_p20261017", sql[-2])
+        self.assertIn("price_ohlc_1m_p20261017", sql[-1])
+
+    async def test_drop_expired_partitions(self):
+        partitions: dict[str, list[str]] = {
+            "price_history": ["price_history_p20261010", "price_history_p20261011"],
+            "price_ohlc_1m": ["price_ohlc_1m_p20261010"],
+        }
+
+        async def execute(statement, params=None):
+            result = MagicMock()
+            result.scalars.return_value.all.return_value = (
+                partitions[params["table"]] if params else []
+            )
+            return result
+
+        connection = AsyncMock()
+        connection.execute.side_effect = execute
+
+        dropped: list[str] = await self.service.drop_expired_partitions(connection, NOW)
+
+        self.assertEqual(dropped, ["price_history_p20261010"])
+        self.assertIn("DROP TABLE price_history_p20261010", executed_sql(connection))
+
+    async def test_record_prices_copies_ticks(self):
+        raw_connection = MagicMock()
+        raw_connection.driver_connection.copy_records_to_table = AsyncMock()
+        connection = AsyncMock()
+        connection.get_raw_connection.return_value = raw_connection
+        now: datetime = datetime.now(timezone.utc)
+        ticks = [
+            ("bitcoin", now, 65000.0),
+            ("stale", now - timedelta(days=1), 1.0),
+            ("expired", now - timedelta(days=30), 1.0),
+        ]
+
+        recorded: int = await self.service.record_prices(connection, ticks)
+
+        self.assertEqual(recorded, 2)
+        raw_connection.driver_connection.copy_records_to_table.assert_awaited_once_with(
+            "price_history", records=ticks[:2], columns=("coin_id", "ts", "price")
+        )
+        yesterday: str = f"{now - timedelta(days=1):%Y%m%d}"
+        self.assertTrue(
+            any(
+                f"price_history_p{yesterday}" in sql for sql in executed_sql(connection)
+            )
+        )
+
+    async def test_refresh_rollups_from_recorded_watermark(self):
+        watermark: datetime = NOW - timedelta(minutes=6)
+        connection = AsyncMock()
+        connection.scalar.side_effect = [watermark, NOW]
+
+        await self.service.refresh_rollups(connection)
+
+        calls = connection.execute.await_args_list
+        self.assertEqual(len(calls), 4)
+        for call in calls[:3]:
+            self.assertIn("recorded_at >= :since", str(call.args[0]))
+            self.assertEqual(str(call.args[0]).count("'UTC')"), 2)
+            self.assertEqual(call.args[1], {"since": watermark})
+        self.assertIn("INSERT INTO price_rollup_watermark", str(calls[3].args[0]))
+        self.assertEqual(calls[3].args[1], {"recorded_at": NOW - ROLLUP_WATERMARK_LAG})
+
+    async def test_first_rollup_covers_all_ticks(self):
+        connection = AsyncMock()
+        connection.scalar.side_effect = [None, NOW]
+
+        await self.service.refresh_rollups(connection)
+
+        since: datetime = connection.execute.await_args_list[0].args[1]["since"]
+        self.assertEqual(since.year, 1)
+
+    def test_choose_resolution(self):
+        choose = self.service.choose_resolution
+        self.assertEqual(choose(NOW - timedelta(hours=6), NOW, NOW), "raw")
+        self.assertEqual(choose(NOW - timedelta(days=30), NOW, NOW), "1h")
+        self.assertEqual(choose(NOW - timedelta(days=365), NOW, NOW), "1d")
+        # Raw ticks older than their retention are gone
+        self.assertEqual(
+            choose(NOW - timedelta(days=8), NOW - timedelta(days=8, hours=-1), NOW),
+            "1m",
+        )
+
+    async def test_get_history_queries_rollup_by_coin_and_range(self):
+        result = MagicMock()
+        result.all.return_value = [(NOW, 1.0, 2.0, 0.5, 1.5)]
+        session = AsyncMock(spec=AsyncSession)
+        session.execute.return_value = result
+
+        points: list[dict] = await self.service.get_history(
+            session, "bitcoin", NOW - timedelta(days=30), NOW, "1h"
+        )
+
+        sql: str = str(session.execute.call_args.args[0])
+        self.assertIn("FROM price_ohlc_1h", sql)
+        self.assertIn("price_ohlc_1h.coin_id = :coin_id_1", sql)
+        self.assertIn("ORDER BY price_ohlc_1h.bucket", sql)
+        self.assertEqual(points[0]["close"], 1.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+import asyncpg
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.services.price_ingestion_service import PriceIngestionService
+
+
+class TestPriceIngestionService(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.service = PriceIngestionService(interval=60)
+        self.service.api.get_prices = AsyncMock(
+            return_value={"bitcoin": {"usd": 65000.0, "last_updated_at": 1700000000}}
+        )
+        self.service.cache.set_coin_prices = AsyncMock(return_value=1)
+        self.service.cache.publish_prices = AsyncMock()
+        self.service.history.record_prices = AsyncMock()
+        self.service.alerts.cache.add_alerts = AsyncMock(return_value=1)
+        session = AsyncMock()
+        session.begin_nested = MagicMock()
+        session.begin_nested.return_value.__aenter__ = AsyncMock()
+        session.begin_nested.return_value.__aexit__ = AsyncMock(return_value=False)
+        database = MagicMock()
+        database.async_session.return_value.__aenter__ = AsyncMock(return_value=session)
+        database.async_session.return_value.__aexit__ = AsyncMock(return_value=False)
+        patcher = patch(
+            "src.services.price_ingestion_service.DatabaseConnection.get_shared",
+            return_value=database,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("src.services.price_ingestion_service.CoinService.update_prices")
+    @patch("src.services.price_ingestion_service.CoinService.get_price_targets")
+    async def test_ingest_prices_caches_and_stores(self, mock_targets, mock_update):
+        mock_targets.return_value = [("bitcoin", None), ("unpriced", None)]
+
+        stats: dict[str, float] = await self.service.ingest_prices()
+
+        self.service.api.get_prices.assert_awaited_once_with(["bitcoin", "unpriced"])
+        self.service.cache.set_coin_prices.assert_awaited_once()
+        rows: list[dict] = mock_update.await_args.args[1]
+        self.assertEqual([row["coin_id"] for row in rows], ["bitcoin"])
+        self.assertEqual(rows[0]["updated_at"].year, 2023)
+        self.assertEqual((stats["coins"], stats["priced"]), (2, 1))
+        self.assertIs(self.service.last_tick, stats)
+        ticks: list[tuple] = self.service.history.record_prices.await_args.args[1]
+        self.assertEqual([tick[0] for tick in ticks], ["bitcoin"])
+
+    @patch("src.services.price_ingestion_service.CoinService.update_prices")
+    @patch("src.services.price_ingestion_service.CoinService.get_price_targets")
+    async def test_unchanged_price_is_recorded_once(self, mock_targets, mock_update):
+        mock_targets.return_value = [("bitcoin", None)]
+
+        await self.service.ingest_prices()
+        stats: dict[str, float] = await self.service.ingest_prices()
+
+        self.assertEqual(stats["recorded"], 0)
+        self.assertEqual(self.service.cache.publish_prices.await_args.args[0], {})
+        self.assertEqual(self.service.history.record_prices.await_args.args[1], [])
+
+    @patch("src.services.price_ingestion_service.CoinService.update_prices")
+    @patch("src.services.price_ingestion_service.CoinService.get_price_targets")
+    async def test_ingest_prices_without_coins(self, mock_targets, mock_update):
+        mock_targets.return_value = []
+
+        stats: dict[str, float] = await self.service.ingest_prices()
+
+        self.service.api.get_prices.assert_not_awaited()
+        self.assertEqual(stats["priced"], 0)
+
+    @patch("src.services.price_ingestion_service.CoinService.update_prices")
+    @patch("src.services.price_ingestion_service.CoinService.get_price_targets")
+    async def test_crossed_target_price_is_published(self, mock_targets, mock_update):
+        mock_targets.return_value = [("bitcoin", 64000.0)]
+        await self.service.ingest_prices()
+        self.service.api.get_prices.return_value = {
+            "bitcoin": {"usd": 63000.0, "last_updated_at": 1700000060}
+        }
+
+        stats: dict[str, float] = await self.service.ingest_prices()
+
+        self.assertEqual(stats["alerts"], 1)
+        alerts: dict[str, dict] = self.service.alerts.cache.add_alerts.await_args.args[
+            0
+        ]
+        self.assertEqual(list(alerts), ["bitcoin:64000.0:below"])
+
+    @patch("src.services.price_ingestion_service.CoinService.update_prices")
+    @patch("src.services.price_ingestion_service.CoinService.get_price_targets")
+    async def test_failed_recording_keeps_prices_and_is_retried(
+        self, mock_targets, mock_update
+    ):
+        mock_targets.return_value = [("bitcoin", None)]
+        self.service.history.record_prices.side_effect = [
+            asyncpg.PostgresError("no partition"),
+            1,
+        ]
+
+        stats: dict[str, float] = await self.service.ingest_prices()
+        retried: dict[str, float] = await self.service.ingest_prices()
+
+        self.assertEqual(stats["recorded"], 0)
+        self.assertEqual(mock_update.await_count, 2)
+        self.assertEqual(retried["recorded"], 1)
+        self.assertEqual(
+            [tick[0] for tick in self.service.history.record_prices.await_args.args[1]],
+            ["bitcoin"],
+        )
+
+    async def test_periodic_task_stops(self):
+        self.service.ingest_prices = AsyncMock(
+            side_effect=lambda: self.service.stop_event.set()
+        )
+
+        await self.service.periodic_task()
+
+        self.service.ingest_prices.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
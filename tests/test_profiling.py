@@ -0,0 +1,90 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import AsyncMock, patch
+from src.profiling import RequestProfiler, StackSampler
+
+
+async def handler():
+    await query()
+
+
+async def query():
+    started: float = time.perf_counter()
+    while time.perf_counter() - started < 0.02:
+        pass
+    await asyncio.sleep(0.05)
+
+
+class TestStackSampler(unittest.IsolatedAsyncioTestCase):
+
+    async def test_samples_running_and_awaiting_stacks(self):
+        coro = handler()
+        sampler = StackSampler(coro, 0.002)
+
+        sampler.start()
+        await coro
+        sampler.stop()
+
+        stacks: list[str] = sampler.folded().splitlines()
+        self.assertTrue(stacks)
+        self.assertTrue(all(stack.startswith("handler (") for stack in stacks))
+        self.assertTrue(any(";query (" in stack for stack in stacks))
+        self.assertTrue(any("[awaiting " in stack for stack in stacks))
+
+
+class TestRequestProfiler(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        patcher = patch.dict(RequestProfiler.stats, {"profiled": 0, "samples": 0})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def app(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await asyncio.sleep(0.02)
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    def scope(self, headers: list[tuple[bytes, bytes]]) -> dict:
+        return {"type": "http", "method": "GET", "path": "/coins/", "headers": headers}
+
+    async def test_profiles_request_with_header(self):
+        sent: list[dict] = []
+        redis_cache = AsyncMock()
+        profiler = RequestProfiler(self.app, enabled=True, interval_ms=1)
+
+        with patch("src.profiling.RedisCache", return_value=redis_cache):
+            await profiler(
+                self.scope([(b"x-profile", b"1")]),
+                None,
+                AsyncMock(side_effect=sent.append),
+            )
+
+        profile_id: bytes = dict(sent[0]["headers"])[b"x-profile-id"]
+        args = redis_cache.set_profile.await_args.args
+        self.assertEqual(args[0], profile_id.decode())
+        self.assertIn("[awaiting ", args[1])
+        self.assertEqual(args[2]["path"], "/coins/")
+        self.assertEqual(args[2]["status"], 200)
+        self.assertEqual(RequestProfiler.stats["profiled"], 1)
+
+    async def test_passes_through_unselected_requests(self):
+        app = AsyncMock()
+        profiler = RequestProfiler(app, enabled=True)
+
+        await profiler(self.scope([]), None, None)
+
+        app.assert_awaited_once_with(self.scope([]), None, None)
+        self.assertEqual(RequestProfiler.stats["profiled"], 0)
+
+    async def test_header_ignored_when_disabled(self):
+        app = AsyncMock()
+        profiler = RequestProfiler(app, enabled=False)
+
+        await profiler(self.scope([(b"x-profile", b"1")]), None, None)
+
+        self.assertEqual(RequestProfiler.stats["profiled"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
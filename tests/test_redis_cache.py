@@ -0,0 +1,218 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+import orjson
+import redis
+from src.redis_cache.local_cache import LocalCache
+from src.redis_cache.redis_cache import RedisCache
+
+
+def mock_pipeline(results: list) -> MagicMock:
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=results)
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=False)
+    return pipe
+
+
+class TestRedisCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.cache = RedisCache()
+        self.cache.client = MagicMock()
+        self.cache.local_cache = LocalCache(max_entries=100, ttl=60)
+
+    def test_caches_share_connection_pool(self):
+        self.assertIs(
+            RedisCache().client.connection_pool, RedisCache().client.connection_pool
+        )
+
+    async def test_get_coin_from_cache_found(self):
+        self.cache.client.hgetall = AsyncMock(
+            return_value={"symbol": "btc", "name": "Bitcoin"}
+        )
+
+        result: dict[str, str] = await self.cache.get_coin_from_cache("bitcoin")
+
+        self.assertEqual(result, {"symbol": "btc", "name": "Bitcoin"})
+
+    async def test_get_coin_from_cache_redis_error(self):
+        self.cache.client.hgetall = AsyncMock(side_effect=redis.RedisError("down"))
+
+        result: dict[str, str] = await self.cache.get_coin_from_cache("bitcoin")
+
+        self.assertEqual(result, {})
+
+    async def test_get_coin_from_cache_served_locally_after_first_read(self):
+        self.cache.client.hgetall = AsyncMock(
+            return_value={"symbol": "btc", "name": "Bitcoin"}
+        )
+
+        await self.cache.get_coin_from_cache("bitcoin")
+        result: dict[str, str] = await self.cache.get_coin_from_cache("bitcoin")
+
+        self.assertEqual(result, {"symbol": "btc", "name": "Bitcoin"})
+        self.cache.client.hgetall.assert_awaited_once()
+        self.assertEqual(self.cache.local_cache.stats["hits"], 1)
+
+    async def test_set_coin_cache_invalidates_and_publishes(self):
+        pipe = mock_pipeline([1, 1])
+        self.cache.client.pipeline.return_value = pipe
+        self.cache.local_cache.put("bitcoin", {"symbol": "old"}, 0)
+
+        await self.cache.set_coin_cache("bitcoin", "btc", "Bitcoin")
+
+        self.assertIsNone(self.cache.local_cache.get("bitcoin"))
+        pipe.publish.assert_called_once_with(
+            self.cache.invalidation_channel, orjson.dumps(["bitcoin"])
+        )
+
+    def test_apply_invalidation_message(self):
+        self.cache.local_cache.put("bitcoin", {"symbol": "btc"}, 0)
+        self.cache.local_cache.put("ethereum", {"symbol": "eth"}, 0)
+
+        self.cache._apply_invalidation({"type": "message", "data": '["bitcoin"]'})
+
+        self.assertIsNone(self.cache.local_cache.get("bitcoin"))
+        self.assertIsNotNone(self.cache.local_cache.get("ethereum"))
+
+    def test_apply_invalidation_ignores_subscribe_confirmation(self):
+        self.cache.local_cache.put("bitcoin", {"symbol": "btc"}, 0)
+
+        self.cache._apply_invalidation({"type": "subscribe", "data": 1})
+
+        self.assertIsNotNone(self.cache.local_cache.get("bitcoin"))
+
+    async def test_get_coins_from_cache_skips_missing(self):
+        pipe = mock_pipeline([{"symbol": "btc", "name": "Bitcoin"}, {}])
+        self.cache.client.pipeline.return_value = pipe
+
+        result = await self.cache.get_coins_from_cache(["bitcoin", "unknown"])
+
+        self.assertEqual(result, {"bitcoin": {"symbol": "btc", "name": "Bitcoin"}})
+        self.assertEqual(pipe.hgetall.call_count, 2)
+        pipe.execute.assert_awaited_once()
+
+    async def test_set_coins_cache_skips_incomplete_coins(self):
+        pipe = mock_pipeline([1])
+        self.cache.client.pipeline.return_value = pipe
+
+        written: int = await self.cache.set_coins_cache(
+            [
+                {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"},
+                {"id": "broken", "symbol": "", "name": "Broken"},
+            ]
+        )
+
+        self.assertEqual(written, 1)
+        pipe.hset.assert_called_once_with(
+            "bitcoin", mapping={"symbol": "btc", "name": "Bitcoin"}
+        )
+
+    async def test_set_coins_cache_redis_error(self):
+        pipe = mock_pipeline([])
+        pipe.execute.side_effect = redis.RedisError("down")
+        self.cache.client.pipeline.return_value = pipe
+
+        written: int = await self.cache.set_coins_cache(
+            [{"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"}]
+        )
+
+        self.assertEqual(written, 0)
+
+    async def test_delete_coins_invalidates_and_publishes(self):
+        pipe = mock_pipeline([2, 1])
+        self.cache.client.pipeline.return_value = pipe
+        self.cache.local_cache.put("old-coin", {"symbol": "old"}, 0)
+
+        deleted: int = await self.cache.delete_coins(["old-coin", "gone"])
+
+        self.assertEqual(deleted, 2)
+        pipe.delete.assert_called_once_with("old-coin", "gone")
+        self.assertIsNone(self.cache.local_cache.get("old-coin"))
+
+    async def test_get_coin_list_fingerprints_redis_error(self):
+        pipe = mock_pipeline([])
+        pipe.execute.side_effect = redis.RedisError("down")
+        self.cache.client.pipeline.return_value = pipe
+
+        self.assertEqual(await self.cache.get_coin_list_fingerprints(), (None, {}))
+
+    async def test_get_coin_prices_skips_unpriced_coins(self):
+        self.cache.client.hmget = AsyncMock(
+            return_value=[orjson.dumps({"usd": 1.0}), None]
+        )
+
+        prices: dict[str, dict] = await self.cache.get_coin_prices(["tether", "new"])
+
+        self.assertEqual(prices, {"tether": {"usd": 1.0}})
+
+    async def test_publish_prices_skips_empty_tick(self):
+        self.cache.client.publish = AsyncMock()
+
+        await self.cache.publish_prices({})
+        await self.cache.publish_prices({"tether": {"usd": 1.0}})
+
+        self.cache.client.publish.assert_awaited_once_with(
+            self.cache.price_updates_channel, orjson.dumps({"tether": {"usd": 1.0}})
+        )
+
+    async def test_add_alerts_batches_script_calls(self):
+        self.cache.ALERTS_BATCH_SIZE = 2
+        self.cache._add_alerts_script = AsyncMock(side_effect=[2, 0])
+        alerts: dict[str, dict] = {f"coin-{i}:1.0:above": {"i": i} for i in range(3)}
+
+        added: int = await self.cache.add_alerts(alerts, 3600, 1000)
+
+        self.assertEqual(added, 2)
+        first_call = self.cache._add_alerts_script.await_args_list[0]
+        self.assertEqual(
+            first_call.kwargs["keys"],
+            [
+                RedisCache.ALERTS_STREAM_KEY,
+                "alerts:sent:coin-0:1.0:above",
+                "alerts:sent:coin-1:1.0:above",
+            ],
+        )
+        self.assertEqual(first_call.kwargs["args"][2], orjson.dumps({"i": 0}))
+
+    async def test_add_alerts_redis_error(self):
+        self.cache._add_alerts_script = AsyncMock(side_effect=redis.RedisError("down"))
+
+        self.assertEqual(await self.cache.add_alerts({"a": {}}, 3600, 1000), 0)
+
+    async def test_set_coin_list_snapshot_writes_digest_with_snapshot(self):
+        pipe = mock_pipeline([True, True])
+        self.cache.client.pipeline.return_value = pipe
+
+        await self.cache.set_coin_list_snapshot("abc", b"[]")
+
+        self.cache.client.pipeline.assert_called_once_with(transaction=True)
+        pipe.set.assert_any_call(RedisCache.COIN_LIST_SNAPSHOT_KEY, b"[]")
+        pipe.set.assert_any_call(RedisCache.COIN_LIST_SNAPSHOT_DIGEST_KEY, "abc")
+
+    async def test_set_profile_records_it_among_latest(self):
+        pipe = mock_pipeline([True, 1, True, True])
+        self.cache.client.pipeline.return_value = pipe
+
+        await self.cache.set_profile("abc", "main 1\n", {"id": "abc"}, 60)
+
+        pipe.set.assert_called_once_with("profiles:abc", "main 1\n", ex=60)
+        pipe.ltrim.assert_called_once_with(
+            RedisCache.PROFILES_RECENT_KEY, 0, RedisCache.PROFILES_RECENT_MAX - 1
+        )
+
+    async def test_list_profiles_skips_expired(self):
+        self.cache.client.lrange = AsyncMock(
+            return_value=[
+                orjson.dumps({"id": "new", "expires_at": 4102444800}).decode(),
+                orjson.dumps({"id": "old", "expires_at": 0}).decode(),
+            ]
+        )
+
+        profiles: list[dict] = await self.cache.list_profiles()
+
+        self.assertEqual([profile["id"] for profile in profiles], ["new"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.coingecko.request_scheduler import RequestScheduler
+
+
+class TestRequestScheduler(unittest.IsolatedAsyncioTestCase):
+
+    async def test_interactive_requests_go_first(self):
+        scheduler = RequestScheduler()
+        scheduler.redis_cache = MagicMock()
+        # The first token is taken while all requests are queued
+        scheduler.redis_cache.take_token = AsyncMock(side_effect=[10, 0, 0, 0])
+        order: list[str] = []
+
+        async def request(name: str, priority: int) -> None:
+            await scheduler.acquire(priority)
+            order.append(name)
+
+        with patch("src.coingecko.request_scheduler.asyncio.sleep"):
+            await asyncio.gather(
+                request("refresh-1", RequestScheduler.BACKGROUND),
+                request("refresh-2", RequestScheduler.BACKGROUND),
+                request("lookup", RequestScheduler.INTERACTIVE),
+            )
+
+        self.assertEqual(order, ["lookup", "refresh-1", "refresh-2"])
+        self.assertEqual(scheduler.stats["interactive"]["granted"], 1)
+        self.assertEqual(scheduler.stats["background"]["granted"], 2)
+        self.assertEqual(scheduler.stats["throttled"], 1)
+
+    @patch("src.coingecko.request_scheduler.asyncio.sleep")
+    async def test_waits_for_the_shared_bucket(self, mock_sleep):
+        scheduler = RequestScheduler()
+        scheduler.redis_cache = MagicMock()
+        scheduler.redis_cache.take_token = AsyncMock(side_effect=[1500, 0])
+
+        await scheduler.acquire()
+
+        mock_sleep.assert_awaited_once_with(1.5)
+
+    async def test_rate_limit_blocks_locally_and_in_redis(self):
+        scheduler = RequestScheduler()
+        scheduler.redis_cache = MagicMock()
+        scheduler.redis_cache.block_bucket = AsyncMock()
+
+        await scheduler.rate_limit_hit(2)
+
+        scheduler.redis_cache.block_bucket.assert_awaited_once_with(
+            RequestScheduler.BUCKET_KEY, 2000
+        )
+        self.assertGreater(await scheduler._take_token(), 1.9)
+
+    async def test_cancelled_waiter_is_skipped(self):
+        scheduler = RequestScheduler()
+        waiter = asyncio.create_task(scheduler.acquire())
+        waiter.cancel()
+
+        await scheduler.acquire()
+
+        self.assertEqual(scheduler.stats["interactive"]["queued"], 0)
+
+    def test_retry_delay_honors_retry_after(self):
+        scheduler = RequestScheduler(backoff_base=1)
+
+        self.assertTrue(5 <= scheduler.retry_delay(0, "5") <= 6)
+        self.assertTrue(0 <= scheduler.retry_delay(3) <= 8)
+        self.assertEqual(scheduler.retries, 2)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(RequestScheduler.parse_retry_after("120"), 120)
+        self.assertEqual(
+            RequestScheduler.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0
+        )
+        self.assertIsNone(RequestScheduler.parse_retry_after("soon"))
+        self.assertIsNone(RequestScheduler.parse_retry_after(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
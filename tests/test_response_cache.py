@@ -0,0 +1,123 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+import fakeredis
+import redis
+from src.redis_cache.response_cache import ResponseCache
+
+
+def mock_pipeline() -> MagicMock:
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[])
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=False)
+    return pipe
+
+
+class TestResponseCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.redis_cache = MagicMock()
+        self.cache = ResponseCache(self.redis_cache, ttl=30)
+
+    @staticmethod
+    def fake_redis_cache() -> MagicMock:
+        redis_cache = MagicMock()
+        redis_cache.client = fakeredis.FakeAsyncRedis(decode_responses=True)
+        return redis_cache
+
+    async def test_set_and_get_coin_round_trip(self):
+        cache = ResponseCache(self.fake_redis_cache(), ttl=30)
+
+        cached, generation = await cache.get_coin("bitcoin")
+        etag: str = await cache.set_coin("bitcoin", '{"id":"bitcoin"}', generation)
+
+        self.assertIsNone(cached)
+        self.assertEqual(
+            await cache.get_coin("bitcoin"),
+            ((etag, '{"id":"bitcoin"}'), generation),
+        )
+
+    async def test_coin_written_after_a_miss_is_not_cached_stale(self):
+        cache = ResponseCache(self.fake_redis_cache(), ttl=30)
+
+        _, generation = await cache.get_coin("bitcoin")
+        await cache.invalidate_coins(["bitcoin"])
+        await cache.set_coin(
+            "bitcoin", '{"id":"bitcoin","target_price":1.0}', generation
+        )
+
+        cached, _ = await cache.get_coin("bitcoin")
+        self.assertIsNone(cached)
+
+    async def test_get_coin_redis_error_is_a_miss(self):
+        self.cache._get_coin_script = AsyncMock(side_effect=redis.RedisError("down"))
+        self.cache._set_coin_script = AsyncMock()
+
+        cached, generation = await self.cache.get_coin("bitcoin")
+        await self.cache.set_coin("bitcoin", "{}", generation)
+
+        self.assertEqual((cached, generation), (None, None))
+        self.cache._set_coin_script.assert_not_awaited()
+
+    async def test_invalidate_drops_coins_and_lists(self):
+        pipe = mock_pipeline()
+        self.redis_cache.client.pipeline.return_value = pipe
+
+        await self.cache.invalidate_coins(["bitcoin"])
+
+        pipe.incr.assert_called_once_with(ResponseCache.GENERATION_KEY)
+        pipe.delete.assert_called_once_with("response-cache:coin:bitcoin")
+
+    async def test_get_list_returns_page_with_its_generation(self):
+        self.cache._get_list_script = AsyncMock(return_value=["3", '"e"\n[]'])
+
+        cached, generation = await self.cache.get_list("query")
+
+        self.assertEqual(cached, ('"e"', "[]"))
+        self.assertEqual(generation, "3")
+        self.cache._get_list_script.assert_awaited_once_with(
+            keys=[ResponseCache.GENERATION_KEY],
+            args=[ResponseCache.LIST_KEY_PREFIX, "query"],
+        )
+
+    async def test_set_list_under_the_generation_read(self):
+        self.cache._set_list_script = AsyncMock(return_value=0)
+
+        etag: str = await self.cache.set_list("query", "[]", "3")
+
+        args: list = self.cache._set_list_script.await_args.kwargs["args"]
+        self.assertEqual(args[:3], ["3", ResponseCache.LIST_KEY_PREFIX, "query"])
+        self.assertEqual(args[4], 30)
+        self.assertEqual(etag, ResponseCache.make_etag("[]"))
+
+    async def test_set_list_skipped_when_redis_failed_on_read(self):
+        self.cache._get_list_script = AsyncMock(side_effect=redis.RedisError("down"))
+        self.cache._set_list_script = AsyncMock()
+
+        cached, generation = await self.cache.get_list("query")
+        await self.cache.set_list("query", "[]", generation)
+
+        self.assertIsNone(cached)
+        self.cache._set_list_script.assert_not_awaited()
+
+    def test_list_query_keeps_none_apart_from_strings(self):
+        self.assertNotEqual(
+            ResponseCache.list_query(limit=100, symbol=None),
+            ResponseCache.list_query(limit=100, symbol="None"),
+        )
+        self.assertNotEqual(
+            ResponseCache.list_query(symbol="a|b", name_prefix=None),
+            ResponseCache.list_query(symbol="a", name_prefix="b"),
+        )
+        self.assertEqual(
+            ResponseCache.list_query(limit=1, symbol="btc"),
+            ResponseCache.list_query(symbol="btc", limit=1),
+        )
+
+    def test_etag_depends_on_body(self):
+        self.assertEqual(ResponseCache.make_etag("a"), ResponseCache.make_etag("a"))
+        self.assertNotEqual(ResponseCache.make_etag("a"), ResponseCache.make_etag("b"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+from src.services.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+
+    async def test_concurrent_calls_share_one_execution(self):
+        single_flight = SingleFlight()
+        calls: int = 0
+
+        async def fetch() -> dict:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"symbol": "btc"}
+
+        results = await asyncio.gather(
+            *(single_flight.do("bitcoin", fetch) for _ in range(5))
+        )
+
+        self.assertEqual(calls, 1)
+        self.assertEqual(results, [{"symbol": "btc"}] * 5)
+        self.assertEqual(single_flight.stats["coalesced_local"], 4)
+
+    async def test_concurrent_calls_share_error(self):
+        single_flight = SingleFlight()
+
+        async def fetch() -> dict:
+            await asyncio.sleep(0.01)
+            raise ValueError("not found")
+
+        results = await asyncio.gather(
+            *(single_flight.do("unknown", fetch) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(single_flight.stats["executions"], 1)
+
+    async def test_sequential_calls_execute_again(self):
+        single_flight = SingleFlight()
+        fetch = AsyncMock(return_value={"symbol": "btc"})
+
+        await single_flight.do("bitcoin", fetch)
+        await single_flight.do("bitcoin", fetch)
+
+        self.assertEqual(fetch.await_count, 2)
+
+    async def test_lock_owner_fetches_and_releases_lock(self):
+        redis_cache = MagicMock()
+        redis_cache.acquire_lock = AsyncMock(return_value=True)
+        redis_cache.release_lock = AsyncMock()
+        single_flight = SingleFlight(redis_cache)
+        fetch = AsyncMock(return_value={"symbol": "btc"})
+
+        result: dict = await single_flight.do("bitcoin", fetch, AsyncMock())
+
+        self.assertEqual(result, {"symbol": "btc"})
+        redis_cache.release_lock.assert_awaited_once()
+
+    async def test_waits_for_result_of_other_worker(self):
+        redis_cache = MagicMock()
+        redis_cache.acquire_lock = AsyncMock(return_value=False)
+        redis_cache.is_locked = AsyncMock(return_value=True)
+        single_flight = SingleFlight(redis_cache, poll_interval=0)
+        fetch = AsyncMock()
+        read_shared = AsyncMock(side_effect=[{}, {"symbol": "btc"}])
+
+        result: dict = await single_flight.do("bitcoin", fetch, read_shared)
+
+        self.assertEqual(result, {"symbol": "btc"})
+        fetch.assert_not_awaited()
+        self.assertEqual(single_flight.stats["coalesced_remote"], 1)
+
+    async def test_fetches_itself_when_other_worker_publishes_nothing(self):
+        redis_cache = MagicMock()
+        redis_cache.acquire_lock = AsyncMock(return_value=False)
+        redis_cache.is_locked = AsyncMock(return_value=False)
+        single_flight = SingleFlight(redis_cache, poll_interval=0)
+        fetch = AsyncMock(return_value={"symbol": "btc"})
+
+        result: dict = await single_flight.do(
+            "bitcoin", fetch, AsyncMock(return_value={})
+        )
+
+        self.assertEqual(result, {"symbol": "btc"})
+        fetch.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
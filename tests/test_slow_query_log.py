@@ -0,0 +1,79 @@
+import types
+import unittest
+from unittest.mock import patch
+from sqlalchemy import create_engine, text
+from src.database_utils.slow_query_log import SlowQueryLog
+
+
+class TestSlowQueryLog(unittest.TestCase):
+
+    def test_normalize_replaces_literals_and_parameters(self):
+        self.assertEqual(
+            SlowQueryLog.normalize(
+                "SELECT coins.id FROM coins\n  WHERE coins.symbol = 'btc' "
+                "AND coins.id = $1::VARCHAR LIMIT 10"
+            ),
+            "SELECT coins.id FROM coins WHERE coins.symbol = ? "
+            "AND coins.id = ?::VARCHAR LIMIT ?",
+        )
+
+    def test_list_lengths_share_a_fingerprint(self):
+        one: str = SlowQueryLog.normalize(
+            "SELECT coins.id FROM coins WHERE coins.id IN ($1::VARCHAR)"
+        )
+        three: str = SlowQueryLog.normalize(
+            "SELECT coins.id FROM coins "
+            "WHERE coins.id IN ($1::VARCHAR, $2::VARCHAR, $3::VARCHAR)"
+        )
+        rows: str = SlowQueryLog.normalize(
+            "INSERT INTO coins (id, symbol) VALUES ($1, $2), ($3, $4), ($5, $6)"
+        )
+
+        self.assertEqual(one, three)
+        self.assertEqual(one, "SELECT coins.id FROM coins WHERE coins.id IN (...)")
+        self.assertEqual(rows, "INSERT INTO coins (id, symbol) VALUES (...), ...")
+
+    @patch("src.database_utils.slow_query_log.logger")
+    def test_records_only_statements_above_threshold(self, mock_logger):
+        log = SlowQueryLog(threshold_ms=100)
+
+        log.record("SELECT 1", 0.05)
+        log.record("SELECT * FROM coins WHERE id = 'bitcoin'", 0.2)
+        log.record("SELECT * FROM coins WHERE id = 'ethereum'", 0.4)
+
+        [query] = log.top()
+        self.assertEqual(query["statement"], "SELECT * FROM coins WHERE id = ?")
+        self.assertEqual(query["count"], 2)
+        self.assertAlmostEqual(query["max_ms"], 400)
+        self.assertAlmostEqual(query["mean_ms"], 300)
+        self.assertEqual(mock_logger.warning.call_count, 2)
+
+    @patch("src.database_utils.slow_query_log.logger")
+    def test_evicts_least_recently_seen_fingerprint(self, mock_logger):
+        log = SlowQueryLog(threshold_ms=0, max_fingerprints=2)
+
+        log.record("SELECT a FROM t", 1)
+        log.record("SELECT b FROM t", 1)
+        log.record("SELECT a FROM t", 1)
+        log.record("SELECT c FROM t", 1)
+
+        self.assertEqual(
+            {query["statement"] for query in log.top()},
+            {"SELECT a FROM t", "SELECT c FROM t"},
+        )
+        self.assertEqual(log.stats["evicted"], 1)
+
+    @patch("src.database_utils.slow_query_log.logger")
+    def test_instrument_times_engine_statements(self, mock_logger):
+        sync_engine = create_engine("sqlite://")
+        log = SlowQueryLog(threshold_ms=0)
+        log.instrument(types.SimpleNamespace(sync_engine=sync_engine))
+
+        with sync_engine.connect() as connection:
+            connection.execute(text("SELECT 42"))
+
+        self.assertEqual(log.top()[0]["statement"], "SELECT ?")
+
+
+if __name__ == "__main__":
+    unittest.main()